@@ -0,0 +1,25 @@
+"""
+Micro-benchmarks dos caminhos quentes de utils e do ranking de busca.
+
+Uso (a partir de backend/):
+    python -m app.benchmarks                    # compara com baseline.json
+    python -m app.benchmarks --update-baseline  # regrava o baseline
+    python -m app.benchmarks --only ranking --quick
+
+Cada caso mede ops/s e o pico de memória alocada por operação. Para que o
+baseline versionado sirva em máquinas diferentes, a vazão é comparada em
+relação a uma calibração (laço Python fixo medido na mesma execução).
+"""
+from .cases import CASES, Case
+from .runner import Regression, Result, compare, load_baseline, run_cases, save_baseline
+
+__all__ = [
+    "CASES",
+    "Case",
+    "Regression",
+    "Result",
+    "compare",
+    "load_baseline",
+    "run_cases",
+    "save_baseline",
+]
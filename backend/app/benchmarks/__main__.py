@@ -0,0 +1,52 @@
+import argparse
+import sys
+
+from .cases import CASES
+from .runner import DEFAULT_THRESHOLD, Result, compare, load_baseline, run_cases, save_baseline
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="python -m app.benchmarks", description="Micro-benchmarks com baseline")
+    parser.add_argument("--only", help="roda só casos cujo nome contém o texto")
+    parser.add_argument("--quick", action="store_true", help="pula os casos lentos (dados grandes)")
+    parser.add_argument("--rounds", type=int, default=3, help="rodadas por caso (fica a melhor)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="regressão tolerada (fração, padrão %(default)s)")
+    parser.add_argument("--update-baseline", action="store_true", help="grava os resultados como baseline")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    cases = [
+        case for case in CASES
+        if (not args.only or args.only in case.name) and not (args.quick and case.slow)
+    ]
+    baseline = load_baseline()
+
+    def report(result: Result) -> None:
+        expected = baseline.get(result.name)
+        change = ""
+        if expected:
+            change = f"{(result.relative / expected['relative'] - 1) * 100:+7.1f}%"
+        print(
+            f"  {result.name:<32} {result.ops_per_sec:>14,.1f} ops/s "
+            f"{result.alloc_peak_bytes / 1024:>10,.1f} KiB {change}"
+        )
+
+    results = run_cases(cases, rounds=args.rounds, report=report)
+
+    if args.update_baseline:
+        save_baseline(results)
+        print(f"baseline atualizado ({len(results)} casos)")
+        return 0
+
+    thresholds = {case.name: case.threshold for case in cases if case.threshold is not None}
+    regressions = compare(results, baseline, args.threshold, thresholds)
+    for regression in regressions:
+        print(f"REGRESSÃO {regression.describe()}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
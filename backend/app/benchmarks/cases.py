@@ -0,0 +1,128 @@
+"""
+Casos do benchmark: cada um monta seus dados em `setup` e devolve a
+operação medida (sem argumentos).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Callable, List, Optional
+
+from ..middleware.timing import TimingMiddleware
+from ..services.metrics import MetricsRegistry, get_metrics
+from ..utils.geohash import encode_geohash, haversine_distance
+from ..utils.normalization import generate_ngrams, normalize_text
+from ..utils.search import calculate_search_score, rank_items
+
+TITLE = "Garrafa Térmica Stanley Verde — encontrada no RU, próxima à saída!"
+QUERY = "garrafa termica azul"
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    # Casos lentos repetem menos para caber no tempo da suíte
+    repeat: int = 5
+    # Tolerância própria (fração); None usa a da execução
+    threshold: Optional[float] = None
+    # Fora do modo --quick (dados grandes)
+    slow: bool = False
+
+
+@lru_cache(maxsize=None)
+def _candidates(count: int) -> List[dict]:
+    """Itens sintéticos do gerador determinístico (mesma semente sempre)."""
+    from ..scripts.generate_dataset import CatalogGenerator, DatasetSpec
+
+    return list(CatalogGenerator(DatasetSpec(items=count, seed=42)).items())
+
+
+def _normalize():
+    return lambda: normalize_text(TITLE)
+
+
+def _ngrams():
+    return lambda: generate_ngrams(TITLE)
+
+
+def _score():
+    from ..scripts.bulk_loader import prepare_item
+
+    item = prepare_item({
+        "title": TITLE,
+        "description": "Garrafa com adesivos",
+        "tags": ["garrafa", "stanley", "termica", "verde"],
+        "campusId": "campus-darcy-ribeiro",
+        "buildingId": "ru",
+        "geo": {"lat": -15.7655, "lng": -47.8705},
+        "createdAt": datetime.utcnow() - timedelta(days=10),
+    })
+    query_ngrams = set(generate_ngrams(QUERY))
+    return lambda: calculate_search_score(
+        item, query_ngrams, user_campus="campus-darcy-ribeiro", user_building="ru",
+        user_lat=-15.7640, user_lng=-47.8690,
+    )
+
+
+def _geohash():
+    return lambda: encode_geohash(-15.7655, -47.8705)
+
+
+def _haversine():
+    return lambda: haversine_distance(-15.7640, -47.8690, -16.0330, -48.0450)
+
+
+def _ranking(count: int):
+    def setup():
+        candidates = _candidates(count)
+        return lambda: rank_items(candidates, QUERY)
+    return setup
+
+
+def _run_sync(coroutine) -> None:
+    # A cadeia ASGI do caso nunca suspende: um send() a executa inteira
+    try:
+        coroutine.send(None)
+    except StopIteration:
+        return
+    raise RuntimeError("ASGI app suspended")
+
+
+def _timing_middleware():
+    """Custo de uma requisição pelo TimingMiddleware até um app que só responde."""
+    async def endpoint(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    registry = MetricsRegistry()
+    middleware = TimingMiddleware(endpoint)
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/items/abc",
+        "app": SimpleNamespace(dependency_overrides={get_metrics: lambda: registry}),
+        "route": SimpleNamespace(path_format="/items/{item_id}"),
+    }
+    return lambda: _run_sync(middleware(scope, receive, send))
+
+
+CASES: List[Case] = [
+    Case("utils.normalize_text", _normalize),
+    Case("utils.generate_ngrams", _ngrams),
+    Case("utils.calculate_search_score", _score),
+    Case("utils.encode_geohash", _geohash),
+    Case("utils.haversine_distance", _haversine),
+    Case("middleware.timing", _timing_middleware),
+    Case("ranking.1k", _ranking(1_000)),
+    Case("ranking.10k", _ranking(10_000), repeat=3),
+    Case("ranking.100k", _ranking(100_000), repeat=3, slow=True),
+]
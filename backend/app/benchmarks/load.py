@@ -0,0 +1,543 @@
+"""
+Teste de carga em processo: dirige o app de create_app() via ASGI contra o
+store em memória ou SQLite, sem servidor nem rede.
+
+O catálogo vem do gerador determinístico; cada requisição é um cenário
+(busca, detalhe, criação, mensagem, relatório) sorteado pelos pesos da
+mistura. Dois modos:
+- concorrência fixa (laço fechado): N clientes, cada um dispara a próxima
+  requisição assim que a anterior responde;
+- taxa fixa (laço aberto): chegadas em intervalos regulares; a latência conta
+  do horário agendado, então fila no servidor aparece nos percentis.
+
+O relatório JSON traz p50/p95/p99, vazão e idas ao store por requisição,
+por cenário, para comparar execuções entre commits.
+
+Uso (a partir de backend/):
+    python -m app.benchmarks.load --items 5000 --concurrency 16 --requests 2000
+    python -m app.benchmarks.load --backend sqlite --rate 200 --duration 10 --out carga.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import httpx
+from fastapi import Header
+
+from ..data import DocumentStore, InMemoryStore, Repository, get_repository
+from ..data.base import Filter, Write
+from ..dependencies.auth import AuthenticatedUser, get_current_user
+from ..main import create_app
+from ..services.item_cache import ItemCache, get_item_cache
+from ..services.metrics import MetricsRegistry, get_metrics
+from ..services.pubsub import PubSubHub, get_hub
+from ..services.rate_limit import InMemoryRateLimiter, RateLimitDecision, RateLimitRule, get_rate_limiter
+from ..services.thread_cache import ThreadParticipantsCache, get_thread_cache
+from ..services.thread_index import ThreadLookupIndex, get_thread_index
+
+Doc = Dict[str, Any]
+
+DEFAULT_MIX = {"search": 50, "detail": 30, "create": 5, "message": 10, "report": 5}
+
+# Itens usados como modelo para criações (e fonte dos termos de busca)
+TEMPLATE_ITEMS = 200
+
+STAFF_UID = "load-staff"
+
+
+# --------------------------------------------------------------------------
+# Contagem de idas ao store
+# --------------------------------------------------------------------------
+
+_store_calls: ContextVar[Optional[Counter]] = ContextVar("load_store_calls", default=None)
+
+
+class CountingStore(DocumentStore):
+    """
+    Repassa ao store real contando as chamadas da requisição corrente.
+    O app roda na mesma task do cliente (ASGITransport), então a contagem
+    segue o contexto da requisição, inclusive nas tasks do DataLoader.
+    """
+
+    def __init__(self, inner: DocumentStore):
+        self.inner = inner
+
+    @staticmethod
+    def _count(kind: str) -> None:
+        calls = _store_calls.get()
+        if calls is not None:
+            calls[kind] += 1
+
+    def new_id(self) -> str:
+        return self.inner.new_id()
+
+    async def get(self, collection: str, doc_id: str) -> Optional[Doc]:
+        self._count("reads")
+        return await self.inner.get(collection, doc_id)
+
+    async def get_many(self, collection: str, doc_ids: Sequence[str]) -> Dict[str, Doc]:
+        self._count("reads")
+        return await self.inner.get_many(collection, doc_ids)
+
+    async def query(
+        self,
+        collection: str,
+        where: Iterable[Filter] = (),
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        select: Optional[Sequence[str]] = None,
+    ) -> List[Doc]:
+        self._count("queries")
+        return await self.inner.query(collection, where, order_by, descending, limit, select)
+
+    async def commit(self, writes: List[Write]) -> None:
+        self._count("commits")
+        await self.inner.commit(writes)
+
+    async def set_many(self, collection: str, docs: Dict[str, Doc]) -> None:
+        self._count("commits")
+        await self.inner.set_many(collection, docs)
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+
+class _Unlimited:
+    """Rate limiter que sempre libera: a carga mede o app, não os limites."""
+
+    async def hit(self, key: str, rule: RateLimitRule) -> RateLimitDecision:
+        return RateLimitDecision(allowed=True, remaining=rule.limit)
+
+
+async def _load_user(
+    x_load_user: str = Header("load-user"),
+    x_load_role: str = Header("user"),
+) -> AuthenticatedUser:
+    return AuthenticatedUser(uid=x_load_user, email=f"{x_load_user}@undf.edu.br", role=x_load_role)
+
+
+# --------------------------------------------------------------------------
+# Cenários
+# --------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Call:
+    method: str
+    path: str
+    uid: str
+    role: str = "user"
+    params: Optional[Dict[str, str]] = None
+    json: Optional[Doc] = None
+
+
+@dataclass
+class Fixtures:
+    """O que os cenários sorteiam: ids semeados e modelos de criação."""
+    item_ids: List[str]
+    threads: List[Tuple[str, List[str]]]
+    campus_ids: List[str]
+    templates: List[Doc]
+    terms: List[str]
+    users: int
+
+    @classmethod
+    def from_generator(cls, generator) -> "Fixtures":
+        item_ids, campus_ids, templates, terms = [], set(), [], set()
+        for doc in generator.items():
+            item_ids.append(doc["id"])
+            campus_ids.add(doc["campusId"])
+            if len(templates) < TEMPLATE_ITEMS:
+                templates.append(_create_payload(doc))
+                terms.update(doc["tags"])
+        threads = [(doc["id"], doc["participants"]) for doc in generator.threads()]
+        return cls(
+            item_ids, threads, sorted(campus_ids), templates, sorted(terms), generator.spec.user_count
+        )
+
+
+def _create_payload(doc: Doc) -> Doc:
+    payload = {
+        key: doc[key]
+        for key in ("type", "title", "description", "category", "tags", "campusId", "buildingId", "spot")
+        if doc.get(key) is not None
+    }
+    if doc.get("geo"):
+        payload["geo"] = {"lat": doc["geo"]["lat"], "lng": doc["geo"]["lng"]}
+    return payload
+
+
+class Workload:
+    """Sorteia as chamadas da mistura (determinístico pela semente)."""
+
+    def __init__(self, fixtures: Fixtures, mix: Dict[str, float], seed: int = 42):
+        unknown = set(mix) - set(SCENARIOS)
+        if unknown:
+            raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        if "message" in mix and not fixtures.threads:
+            raise ValueError("Scenario 'message' needs seeded threads")
+        self.fixtures = fixtures
+        self.names = [name for name, weight in mix.items() if weight > 0]
+        self._cumulative = list(accumulate(mix[name] for name in self.names))
+        self.rng = random.Random(seed)
+        self._sequence = 0
+
+    def next(self) -> Tuple[str, Call]:
+        name = self.rng.choices(self.names, cum_weights=self._cumulative)[0]
+        return name, SCENARIOS[name](self)
+
+    def _search(self) -> Call:
+        params = {"q": self.rng.choice(self.fixtures.terms), "limit": "20"}
+        if self.rng.random() < 0.5:
+            params["campusId"] = self.rng.choice(self.fixtures.campus_ids)
+        return Call("GET", "/items", self._user(), params=params)
+
+    def _detail(self) -> Call:
+        return Call("GET", f"/items/{self.rng.choice(self.fixtures.item_ids)}", self._user())
+
+    def _create(self) -> Call:
+        return Call("POST", "/items", self._user(), json=self.rng.choice(self.fixtures.templates))
+
+    def _message(self) -> Call:
+        thread_id, participants = self.rng.choice(self.fixtures.threads)
+        self._sequence += 1
+        return Call(
+            "POST", f"/threads/{thread_id}/messages", self.rng.choice(participants),
+            json={"content": f"Mensagem de carga #{self._sequence}"},
+        )
+
+    def _report(self) -> Call:
+        params = {"campusId": self.rng.choice(self.fixtures.campus_ids)} if self.rng.random() < 0.5 else None
+        return Call("GET", "/staff/reports/daily", STAFF_UID, role="staff", params=params)
+
+    def _user(self) -> str:
+        return f"user-{self.rng.randrange(self.fixtures.users):06d}"
+
+
+SCENARIOS = {
+    "search": Workload._search,
+    "detail": Workload._detail,
+    "create": Workload._create,
+    "message": Workload._message,
+    "report": Workload._report,
+}
+
+
+# --------------------------------------------------------------------------
+# Execução
+# --------------------------------------------------------------------------
+
+@dataclass
+class Sample:
+    scenario: str
+    status: int
+    latency: float
+    store_calls: Dict[str, int]
+
+
+@asynccontextmanager
+async def serve(store: DocumentStore, rate_limit: bool = False) -> AsyncIterator[httpx.AsyncClient]:
+    """App novo (com lifespan) e um cliente ASGI; serviços isolados por execução."""
+    app = create_app()
+    repo = Repository(CountingStore(store))
+    hub = PubSubHub()
+    cache = ThreadParticipantsCache()
+    index = ThreadLookupIndex()
+    limiter = InMemoryRateLimiter() if rate_limit else _Unlimited()
+    metrics = MetricsRegistry()
+    item_cache = ItemCache()
+    app.dependency_overrides.update({
+        get_current_user: _load_user,
+        get_repository: lambda: repo,
+        get_hub: lambda: hub,
+        get_thread_cache: lambda: cache,
+        get_thread_index: lambda: index,
+        get_rate_limiter: lambda: limiter,
+        get_metrics: lambda: metrics,
+        get_item_cache: lambda: item_cache,
+    })
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+            yield client
+
+
+async def send(client: httpx.AsyncClient, scenario: str, call: Call, scheduled: Optional[float] = None) -> Sample:
+    """
+    Executa uma chamada medindo latência e idas ao store. No laço aberto a
+    latência conta de `scheduled` (chegada), não do envio.
+    """
+    calls: Counter = Counter()
+    token = _store_calls.set(calls)
+    start = time.perf_counter() if scheduled is None else scheduled
+    try:
+        response = await client.request(
+            call.method, call.path, params=call.params, json=call.json,
+            headers={"X-Load-User": call.uid, "X-Load-Role": call.role},
+        )
+        status = response.status_code
+    except Exception:
+        status = 599
+    finally:
+        _store_calls.reset(token)
+    return Sample(scenario, status, time.perf_counter() - start, dict(calls))
+
+
+async def run_closed(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    concurrency: int,
+    requests: Optional[int] = None,
+    duration: Optional[float] = None,
+) -> List[Sample]:
+    """Concorrência fixa: `concurrency` clientes em laço até o limite."""
+    samples: List[Sample] = []
+    deadline = time.perf_counter() + duration if duration else None
+    remaining = [requests]
+
+    def more() -> bool:
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        if remaining[0] is not None:
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+        return True
+
+    async def client_loop() -> None:
+        while more():
+            samples.append(await send(client, *workload.next()))
+
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    return samples
+
+
+async def run_open(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    rate: float,
+    requests: Optional[int] = None,
+    duration: Optional[float] = None,
+) -> List[Sample]:
+    """Taxa fixa: uma chegada a cada 1/rate segundos, sem esperar respostas."""
+    if requests is None:
+        requests = max(1, int(rate * duration))
+    start = time.perf_counter()
+    tasks = []
+    for n in range(requests):
+        scheduled = start + n / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(send(client, *workload.next(), scheduled=scheduled)))
+    return list(await asyncio.gather(*tasks))
+
+
+# --------------------------------------------------------------------------
+# Relatório
+# --------------------------------------------------------------------------
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Percentil por posição (nearest-rank) de valores já ordenados."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+def summarize(samples: Sequence[Sample], elapsed: float) -> Doc:
+    """Latência (ms), vazão, erros e idas ao store: total e por cenário."""
+    by_scenario: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_scenario[sample.scenario].append(sample)
+    return {
+        "total": _stats(samples, elapsed),
+        "scenarios": {name: _stats(group, elapsed) for name, group in sorted(by_scenario.items())},
+    }
+
+
+def _stats(samples: Sequence[Sample], elapsed: float) -> Doc:
+    latencies = sorted(sample.latency * 1000 for sample in samples)
+    errors = Counter(str(sample.status) for sample in samples if sample.status >= 400)
+    calls: Counter = Counter()
+    for sample in samples:
+        calls.update(sample.store_calls)
+    count = len(samples) or 1
+    return {
+        "requests": len(samples),
+        "errors": dict(sorted(errors.items())),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+            "mean": round(sum(latencies) / count, 3),
+        },
+        "store_calls_per_request": {
+            "total": round(sum(calls.values()) / count, 3),
+            **{kind: round(calls[kind] / count, 3) for kind in ("reads", "queries", "commits")},
+        },
+    }
+
+
+# --------------------------------------------------------------------------
+# Orquestração
+# --------------------------------------------------------------------------
+
+@dataclass
+class LoadConfig:
+    backend: str = "memory"
+    sqlite_path: Optional[str] = None
+    items: int = 2_000
+    seed: int = 42
+    mix: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    concurrency: int = 8
+    # Com rate, o laço é aberto e concurrency é ignorada
+    rate: Optional[float] = None
+    requests: Optional[int] = 1_000
+    duration: Optional[float] = None
+    warmup: int = 50
+    rate_limit: bool = False
+
+
+def open_store(backend: str, sqlite_path: str) -> DocumentStore:
+    if backend == "memory":
+        return InMemoryStore()
+    if backend == "sqlite":
+        from ..data.sqlite import SQLiteStore
+        return SQLiteStore(sqlite_path)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+async def seed_store(store: DocumentStore, config: LoadConfig):
+    """Semeia o catálogo sintético (datas relativas a agora, para o relatório)."""
+    from ..scripts.generate_dataset import CatalogGenerator, DatasetSpec, load_into
+
+    generator = CatalogGenerator(DatasetSpec(items=config.items, seed=config.seed, now=datetime.utcnow()))
+    await load_into(store, generator)
+    return Fixtures.from_generator(generator)
+
+
+async def run(config: LoadConfig) -> Doc:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = open_store(config.backend, config.sqlite_path or str(Path(tmp) / "load.db"))
+        try:
+            fixtures = await seed_store(store, config)
+            workload = Workload(fixtures, config.mix, config.seed)
+            async with serve(store, rate_limit=config.rate_limit) as client:
+                for _ in range(config.warmup):
+                    await send(client, *workload.next())
+                started = time.perf_counter()
+                if config.rate:
+                    samples = await run_open(client, workload, config.rate, config.requests, config.duration)
+                else:
+                    samples = await run_closed(
+                        client, workload, config.concurrency, config.requests, config.duration
+                    )
+                elapsed = time.perf_counter() - started
+        finally:
+            await store.close()
+    return {
+        "config": asdict(config),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "revision": _git_revision(),
+        "elapsed_s": round(elapsed, 3),
+        **summarize(samples, elapsed),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent,
+            capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Converte "search=60,detail=30,create=10" em pesos."""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        try:
+            mix[name.strip()] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"peso inválido em {part!r}")
+    return mix
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.benchmarks.load", description="Teste de carga via ASGI")
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--sqlite-path", help="arquivo SQLite (padrão: temporário)")
+    parser.add_argument("--items", type=int, default=2_000, help="tamanho do catálogo semeado")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mix", type=parse_mix, default=dict(DEFAULT_MIX),
+                        help="pesos por cenário, ex.: search=50,detail=30,create=5,message=10,report=5")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--concurrency", type=int, default=8, help="clientes simultâneos (laço fechado)")
+    mode.add_argument("--rate", type=float, help="chegadas por segundo (laço aberto)")
+    parser.add_argument("--requests", type=int, help="requisições medidas (padrão 1000 sem --duration)")
+    parser.add_argument("--duration", type=float, help="segundos de medição")
+    parser.add_argument("--warmup", type=int, default=50, help="requisições descartadas antes de medir")
+    parser.add_argument("--rate-limit", action="store_true", help="mantém o rate limit das rotas")
+    parser.add_argument("--out", type=Path, help="grava o relatório JSON neste arquivo")
+    return parser.parse_args(argv)
+
+
+def config_from_args(args: argparse.Namespace) -> LoadConfig:
+    return LoadConfig(
+        backend=args.backend,
+        sqlite_path=args.sqlite_path,
+        items=args.items,
+        seed=args.seed,
+        mix=args.mix,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        requests=args.requests if args.requests or args.duration else 1_000,
+        duration=args.duration,
+        warmup=args.warmup,
+        rate_limit=args.rate_limit,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run(config_from_args(args)))
+    for name, stats in [("total", report["total"]), *report["scenarios"].items()]:
+        latency = stats["latency_ms"]
+        errors = sum(stats["errors"].values())
+        print(
+            f"  {name:<8} {stats['requests']:>7} req {stats['throughput_rps']:>9,.1f} req/s  "
+            f"p50 {latency['p50']:>8.2f}  p95 {latency['p95']:>8.2f}  p99 {latency['p99']:>8.2f} ms  "
+            f"store {stats['store_calls_per_request']['total']:>5.2f}/req  erros {errors}"
+        )
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+        print(f"relatório gravado em {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
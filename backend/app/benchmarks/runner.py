@@ -0,0 +1,177 @@
+"""
+Medição, baseline e detecção de regressões.
+"""
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .cases import Case
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+# Regressão tolerada por padrão (fração da vazão relativa ou da memória)
+DEFAULT_THRESHOLD = 0.25
+
+# Diferenças de pico de memória abaixo disso são ruído do alocador
+MIN_ALLOC_DELTA = 1024
+
+
+@dataclass
+class Result:
+    name: str
+    ops_per_sec: float
+    # ops/s dividido pelas ops/s da calibração: comparável entre máquinas
+    relative: float
+    alloc_peak_bytes: int
+
+
+@dataclass
+class Regression:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+    threshold: float
+
+    def describe(self) -> str:
+        change = (self.current - self.baseline) / self.baseline * 100 if self.baseline else float("inf")
+        return (
+            f"{self.name}: {self.metric} {self.baseline:.4g} -> {self.current:.4g} "
+            f"({change:+.1f}%, limite {self.threshold * 100:.0f}%)"
+        )
+
+
+def _calibration() -> int:
+    # Carga Python fixa (laços, dict e strings), a mesma em toda execução
+    table = {}
+    for n in range(200):
+        table[str(n)] = n * n
+    return sum(len(key) + value for key, value in table.items())
+
+
+def measure_ops(fn: Callable[[], object], repeat: int = 5, min_time: float = 0.1) -> float:
+    """Melhor vazão (ops/s) entre `repeat` rodadas de pelo menos `min_time`."""
+    number = 1
+    while True:
+        elapsed = _timed(fn, number)
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        best = min(best, _timed(fn, number))
+    return number / best
+
+
+def _timed(fn: Callable[[], object], number: int) -> float:
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        return time.perf_counter() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def measure_alloc(fn: Callable[[], object]) -> int:
+    """Pico de memória alocada (bytes) durante uma única operação."""
+    fn()  # aquece caches e imports preguiçosos
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return max(0, peak - base)
+
+
+def run_cases(
+    cases: Iterable[Case],
+    rounds: int = 3,
+    min_time: float = 0.1,
+    report: Optional[Callable[[Result], None]] = None,
+) -> Dict[str, Result]:
+    """
+    Mede cada caso em `rounds` rodadas, cada uma com a sua calibração
+    logo antes (acompanha variações de clock), e fica com a melhor.
+    """
+    results = {}
+    for case in cases:
+        fn = case.setup()
+        best_ops, best_relative = 0.0, 0.0
+        for _ in range(rounds):
+            calibration = measure_ops(_calibration, repeat=3, min_time=min_time)
+            ops = measure_ops(fn, repeat=case.repeat, min_time=min_time)
+            if ops / calibration > best_relative:
+                best_ops, best_relative = ops, ops / calibration
+        result = Result(case.name, best_ops, best_relative, measure_alloc(fn))
+        results[case.name] = result
+        if report:
+            report(result)
+    return results
+
+
+def compare(
+    results: Dict[str, Result],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD,
+    thresholds: Optional[Dict[str, float]] = None,
+) -> List[Regression]:
+    """
+    Regressões em relação ao baseline: vazão relativa abaixo de
+    (1 - limite) ou pico de memória acima de (1 + limite). Casos sem
+    baseline são ignorados.
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        limit = (thresholds or {}).get(name, threshold)
+        if result.relative < expected["relative"] * (1 - limit):
+            regressions.append(Regression(name, "relative", expected["relative"], result.relative, limit))
+        grown = result.alloc_peak_bytes - expected["alloc_peak_bytes"]
+        if grown > MIN_ALLOC_DELTA and result.alloc_peak_bytes > expected["alloc_peak_bytes"] * (1 + limit):
+            regressions.append(Regression(
+                name, "alloc_peak_bytes", expected["alloc_peak_bytes"], result.alloc_peak_bytes, limit
+            ))
+    return regressions
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, Dict[str, float]]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())["cases"]
+
+
+def save_baseline(results: Dict[str, Result], path: Path = BASELINE_PATH) -> None:
+    cases = {}
+    if path.exists():
+        # Atualizar um subconjunto (--only) preserva os demais casos
+        cases = json.loads(path.read_text())["cases"]
+    cases.update({name: _rounded(result) for name, result in results.items()})
+    path.write_text(json.dumps({
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cases": dict(sorted(cases.items())),
+    }, indent=2) + "\n")
+
+
+def _rounded(result: Result) -> Dict[str, float]:
+    data = asdict(result)
+    data.pop("name")
+    data["ops_per_sec"] = float(f"{data['ops_per_sec']:.6g}")
+    data["relative"] = float(f"{data['relative']:.6g}")
+    return data
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+from ..settings import get_settings
+from .base import (
+    CommitTooLarge,
+    DocumentNotFound,
+    DocumentStore,
+    Increment,
+    PartialCommit,
+    PreconditionFailed,
+    WriteBatch,
+)
+from .memory import InMemoryStore
+from .repositories import (
+    AlertRepository,
+    InboxRepository,
+    ItemRepository,
+    MessageRepository,
+    ReportRepository,
+    Repository,
+    ThreadRepository,
+)
+
+
+@lru_cache
+def get_store() -> DocumentStore:
+    """Seleciona o backend de armazenamento pela configuração `storage_backend`."""
+    settings = get_settings()
+    backend = settings.storage_backend.lower()
+    if backend == "memory":
+        return InMemoryStore()
+    if backend == "firestore":
+        from .firestore import FirestoreStore
+        return FirestoreStore(max_workers=settings.store_max_workers)
+    if backend == "sqlite":
+        from .sqlite import SQLiteStore
+        return SQLiteStore(settings.sqlite_path, pool_size=settings.sqlite_pool_size)
+    raise ValueError(f"Unknown storage backend: {settings.storage_backend}")
+
+
+@lru_cache
+def get_repository() -> Repository:
+    return Repository(get_store())
+
+
+__all__ = [
+    "AlertRepository",
+    "CommitTooLarge",
+    "DocumentNotFound",
+    "DocumentStore",
+    "InMemoryStore",
+    "InboxRepository",
+    "Increment",
+    "ItemRepository",
+    "MessageRepository",
+    "PartialCommit",
+    "PreconditionFailed",
+    "ReportRepository",
+    "Repository",
+    "ThreadRepository",
+    "WriteBatch",
+    "get_repository",
+    "get_store",
+]
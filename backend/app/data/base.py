@@ -0,0 +1,199 @@
+"""
+Interface assíncrona de armazenamento de documentos.
+
+Coleções são caminhos no estilo Firestore ("items", "threads/{id}/messages",
+"users/{uid}/inbox"). Documentos são dicts simples; leituras devolvem o dict
+com o campo "id" preenchido.
+"""
+from __future__ import annotations
+
+import abc
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+Filter = Tuple[str, str, Any]
+
+FILTER_OPS = {"==", "!=", "<", "<=", ">", ">=", "in", "array_contains"}
+
+# Maior commit atômico aceito por todos os backends (limite do Firestore)
+MAX_COMMIT_WRITES = 500
+
+
+class DocumentNotFound(LookupError):
+    """Update em documento inexistente."""
+
+
+class PreconditionFailed(Exception):
+    """Escrita condicional cujo documento não satisfaz a pré-condição."""
+
+
+class PartialCommit(Exception):
+    """
+    Gravação em vários commits que falhou no meio: `committed` tem os ids
+    já gravados (os commits anteriores à falha, que não são desfeitos).
+    """
+
+    def __init__(self, committed: List[str], message: str = ""):
+        super().__init__(message or f"{len(committed)} documents committed before the failure")
+        self.committed = committed
+
+
+class CommitTooLarge(ValueError):
+    """Commit com mais escritas do que um commit atômico comporta."""
+
+
+def check_commit_size(writes: List["Write"]) -> None:
+    if len(writes) > MAX_COMMIT_WRITES:
+        raise CommitTooLarge(f"{len(writes)} writes in one commit (max {MAX_COMMIT_WRITES})")
+
+
+@dataclass(frozen=True)
+class Increment:
+    """Incremento atômico de um campo numérico (como firestore.Increment)."""
+    amount: int = 1
+
+
+@dataclass
+class Write:
+    kind: str  # "set" | "update" | "delete"
+    collection: str
+    doc_id: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    merge: bool = False
+    # Campos que o documento atual precisa ter (ex.: {"version": 3})
+    precondition: Optional[Dict[str, Any]] = None
+
+
+class WriteBatch:
+    """Acumula escritas e as aplica atomicamente em um único commit."""
+
+    def __init__(self, store: "DocumentStore"):
+        self._store = store
+        self.writes: List[Write] = []
+
+    def set(self, collection: str, doc_id: str, data: Dict[str, Any], merge: bool = False) -> None:
+        self.writes.append(Write("set", collection, doc_id, data, merge))
+
+    def update(
+        self,
+        collection: str,
+        doc_id: str,
+        data: Dict[str, Any],
+        precondition: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.writes.append(Write("update", collection, doc_id, data, precondition=precondition))
+
+    def delete(self, collection: str, doc_id: str, precondition: Optional[Dict[str, Any]] = None) -> None:
+        self.writes.append(Write("delete", collection, doc_id, precondition=precondition))
+
+    async def commit(self) -> None:
+        if self.writes:
+            writes, self.writes = self.writes, []
+            await self._store.commit(writes)
+
+
+class DocumentStore(abc.ABC):
+    @abc.abstractmethod
+    def new_id(self) -> str:
+        ...
+
+    @abc.abstractmethod
+    async def get(self, collection: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abc.abstractmethod
+    async def get_many(self, collection: str, doc_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Leitura em lote; ids inexistentes ficam de fora do resultado."""
+
+    @abc.abstractmethod
+    async def query(
+        self,
+        collection: str,
+        where: Iterable[Filter] = (),
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        select: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        select limita os campos de primeiro nível devolvidos (além de "id");
+        campos ausentes no documento ficam de fora do resultado.
+        """
+
+    @abc.abstractmethod
+    async def commit(self, writes: List[Write]) -> None:
+        """
+        Aplica as escritas atomicamente (tudo ou nada). Commits acima de
+        MAX_COMMIT_WRITES levantam CommitTooLarge em vez de serem divididos.
+        """
+
+    async def close(self) -> None:
+        pass
+
+    async def stats(self) -> Dict[str, Any]:
+        """Contagens e estado do backend para o registro de estatísticas."""
+        return {"backend": type(self).__name__}
+
+    def batch(self) -> WriteBatch:
+        return WriteBatch(self)
+
+    async def add(self, collection: str, data: Dict[str, Any]) -> str:
+        doc_id = self.new_id()
+        await self.set(collection, doc_id, {**data, "id": doc_id})
+        return doc_id
+
+    async def set(self, collection: str, doc_id: str, data: Dict[str, Any], merge: bool = False) -> None:
+        await self.commit([Write("set", collection, doc_id, data, merge)])
+
+    async def update(
+        self,
+        collection: str,
+        doc_id: str,
+        data: Dict[str, Any],
+        precondition: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        await self.commit([Write("update", collection, doc_id, data, precondition=precondition)])
+
+    async def delete(self, collection: str, doc_id: str) -> None:
+        await self.commit([Write("delete", collection, doc_id)])
+
+    async def set_many(self, collection: str, docs: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Gravação em massa (carga inicial), em commits de até MAX_COMMIT_WRITES:
+        cada lote é atômico, o conjunto não.
+        """
+        writes = [Write("set", collection, doc_id, data) for doc_id, data in docs.items()]
+        for start in range(0, len(writes), MAX_COMMIT_WRITES):
+            await self.commit(writes[start:start + MAX_COMMIT_WRITES])
+
+
+def apply_write(current: Optional[Dict[str, Any]], write: Write) -> Optional[Dict[str, Any]]:
+    """Calcula o novo estado de um documento; usado pelos stores locais."""
+    if write.kind == "update" and current is None:
+        raise DocumentNotFound(f"{write.collection}/{write.doc_id}")
+    if not precondition_holds(current, write.precondition):
+        raise PreconditionFailed(f"{write.collection}/{write.doc_id}")
+    if write.kind == "delete":
+        return None
+
+    base = dict(current) if current is not None and (write.merge or write.kind == "update") else {}
+    for key, value in write.data.items():
+        if isinstance(value, Increment):
+            value = (base.get(key) or 0) + value.amount
+        base[key] = value
+    return base
+
+
+def project(doc: Dict[str, Any], select: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """Recorte de um documento pelos campos de primeiro nível pedidos."""
+    if select is None:
+        return doc
+    return {key: doc[key] for key in select if key in doc}
+
+
+def precondition_holds(current: Optional[Dict[str, Any]], precondition: Optional[Dict[str, Any]]) -> bool:
+    if not precondition:
+        return True
+    if current is None:
+        return False
+    return all(current.get(key) == value for key, value in precondition.items())
@@ -0,0 +1,149 @@
+"""
+Store sobre o cliente síncrono do Firestore.
+
+Cada chamada bloqueante roda em um pool de threads limitado, liberando o
+event loop para as demais requisições enquanto espera o I/O.
+"""
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from ..firebase import batched_writes, get_firestore_client
+from .base import (
+    DocumentNotFound,
+    DocumentStore,
+    Filter,
+    Increment,
+    PreconditionFailed,
+    Write,
+    check_commit_size,
+    precondition_holds,
+)
+
+
+class FirestoreStore(DocumentStore):
+    def __init__(self, client=None, max_workers: int = 8):
+        self._client = client
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="firestore")
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_firestore_client()
+        return self._client
+
+    async def _run(self, fn: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    def new_id(self) -> str:
+        return self.client.collection("_ids").document().id
+
+    async def get(self, collection: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        doc = await self._run(self.client.collection(collection).document(doc_id).get)
+        return _to_dict(doc) if doc.exists else None
+
+    async def get_many(self, collection: str, doc_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        if not doc_ids:
+            return {}
+        refs = [self.client.collection(collection).document(doc_id) for doc_id in doc_ids]
+        docs = await self._run(lambda: list(self.client.get_all(refs)))
+        return {doc.id: _to_dict(doc) for doc in docs if doc.exists}
+
+    async def query(
+        self,
+        collection: str,
+        where: Iterable[Filter] = (),
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        select: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        query = self.client.collection(collection)
+        if select is not None:
+            # Projeção no servidor: campos omitidos não trafegam
+            query = query.select([name for name in select if name != "id"])
+        for field, op, value in where:
+            query = query.where(field, op, value)
+        if order_by:
+            query = query.order_by(order_by, direction="DESCENDING" if descending else "ASCENDING")
+        if limit is not None:
+            query = query.limit(limit)
+        return await self._run(lambda: [_to_dict(doc) for doc in query.stream()])
+
+    async def commit(self, writes: List[Write]) -> None:
+        # Dentro do limite, batched_writes faz um único commit atômico
+        check_commit_size(writes)
+        if any(write.precondition for write in writes):
+            await self._run(self._commit_transactional, writes)
+        else:
+            await self._run(self._commit_sync, writes)
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def _commit_sync(self, writes: List[Write]) -> None:
+        from google.api_core.exceptions import NotFound
+
+        db = self.client
+        try:
+            with batched_writes(db) as batch:
+                for write in writes:
+                    ref = db.collection(write.collection).document(write.doc_id)
+                    if write.kind == "delete":
+                        batch.delete(ref)
+                    elif write.kind == "update":
+                        batch.update(ref, _to_firestore(write.data))
+                    else:
+                        batch.set(ref, _to_firestore(write.data), merge=write.merge)
+        except NotFound as exc:
+            raise DocumentNotFound(str(exc)) from exc
+
+    def _commit_transactional(self, writes: List[Write]) -> None:
+        """Escritas condicionais: lê e verifica as pré-condições na transação."""
+        from google.api_core.exceptions import NotFound
+        from google.cloud import firestore
+
+        db = self.client
+
+        @firestore.transactional
+        def run(transaction):
+            refs = [db.collection(write.collection).document(write.doc_id) for write in writes]
+            for write, ref in zip(writes, refs):
+                if write.precondition:
+                    snapshot = ref.get(transaction=transaction)
+                    current = snapshot.to_dict() if snapshot.exists else None
+                    if not precondition_holds(current, write.precondition):
+                        raise PreconditionFailed(f"{write.collection}/{write.doc_id}")
+            for write, ref in zip(writes, refs):
+                if write.kind == "delete":
+                    transaction.delete(ref)
+                elif write.kind == "update":
+                    transaction.update(ref, _to_firestore(write.data))
+                else:
+                    transaction.set(ref, _to_firestore(write.data), merge=write.merge)
+
+        try:
+            run(db.transaction())
+        except NotFound as exc:
+            raise DocumentNotFound(str(exc)) from exc
+
+
+def _to_dict(doc) -> Dict[str, Any]:
+    data = doc.to_dict()
+    data["id"] = doc.id
+    return data
+
+
+def _to_firestore(data: Dict[str, Any]) -> Dict[str, Any]:
+    if not any(isinstance(value, Increment) for value in data.values()):
+        return data
+    from google.cloud.firestore import Increment as FirestoreIncrement
+
+    return {
+        key: FirestoreIncrement(value.amount) if isinstance(value, Increment) else value
+        for key, value in data.items()
+    }
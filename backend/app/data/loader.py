@@ -0,0 +1,210 @@
+"""
+DataLoader por requisição: agrupa e deduplica leituras pontuais.
+
+Leituras feitas na mesma volta do event loop (ex.: asyncio.gather) viram
+um único get_many por coleção; leituras repetidas do mesmo documento são
+respondidas pelo memo da requisição. Escritas atualizam o memo com o
+estado resultante (quando o documento já era conhecido) ou o limpam, então
+uma leitura após update vê o estado novo sem voltar ao store.
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .base import DocumentStore, Filter, Write, apply_write
+
+Doc = Dict[str, Any]
+Key = Tuple[str, str]
+
+MAX_BATCH_SIZE = 500
+
+
+@dataclass
+class StoreUsage:
+    """Uso do store por uma requisição (contadores vivos)."""
+    # Documentos pedidos ao store em leituras pontuais (após memo e dedup)
+    reads: int = 0
+    # Documentos escritos (sets, updates e deletes confirmados)
+    writes: int = 0
+    queries: int = 0
+    # Documentos devolvidos pelas queries
+    docs_streamed: int = 0
+    round_trips: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class DataLoader:
+    def __init__(
+        self,
+        store: DocumentStore,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        usage: Optional[StoreUsage] = None,
+    ):
+        self.store = store
+        self.max_batch_size = max_batch_size
+        self.usage = usage or StoreUsage()
+        self.loads = 0
+        self.memo_hits = 0
+        self._memo: Dict[Key, "asyncio.Future[Optional[Doc]]"] = {}
+        self._pending: Dict[str, List[str]] = {}
+        self._scheduled = False
+        # O event loop só guarda referências fracas às tasks
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    async def load(self, collection: str, doc_id: str) -> Optional[Doc]:
+        """Devolve uma cópia rasa do documento (None se não existir)."""
+        self.loads += 1
+        key = (collection, doc_id)
+        future = self._memo.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._memo[key] = loop.create_future()
+            self._pending.setdefault(collection, []).append(doc_id)
+            if not self._scheduled:
+                self._scheduled = True
+                loop.call_soon(self._dispatch)
+        else:
+            self.memo_hits += 1
+        doc = await asyncio.shield(future)
+        return dict(doc) if doc is not None else None
+
+    async def load_many(self, collection: str, doc_ids: Iterable[str]) -> Dict[str, Doc]:
+        doc_ids = list(dict.fromkeys(doc_ids))
+        docs = await asyncio.gather(*(self.load(collection, doc_id) for doc_id in doc_ids))
+        return {doc_id: doc for doc_id, doc in zip(doc_ids, docs) if doc is not None}
+
+    def prime(self, collection: str, doc_id: str, doc: Optional[Doc]) -> None:
+        """Registra no memo um documento já conhecido (ex.: vindo de uma query)."""
+        key = (collection, doc_id)
+        current = self._memo.get(key)
+        if current is not None and not current.done():
+            return
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(doc)
+        self._memo[key] = future
+
+    def clear(self, collection: str, doc_id: str) -> None:
+        self._memo.pop((collection, doc_id), None)
+
+    def apply(self, write: Write) -> None:
+        """Reflete uma escrita confirmada no memo."""
+        key = (write.collection, write.doc_id)
+        future = self._memo.get(key)
+        if write.kind == "set" and not write.merge:
+            current = None
+        elif future is not None and future.done() and future.exception() is None:
+            current = future.result()
+        else:
+            self.clear(*key)
+            return
+        if write.kind == "update" and current is None:
+            self.clear(*key)
+            return
+        # A pré-condição já foi verificada pelo store no commit
+        doc = apply_write(current, replace(write, precondition=None))
+        if doc is not None:
+            doc["id"] = write.doc_id
+        self._memo.pop(key, None)
+        self.prime(write.collection, write.doc_id, doc)
+
+    def _dispatch(self) -> None:
+        self._scheduled = False
+        pending, self._pending = self._pending, {}
+        for collection, doc_ids in pending.items():
+            for start in range(0, len(doc_ids), self.max_batch_size):
+                chunk = doc_ids[start:start + self.max_batch_size]
+                task = asyncio.ensure_future(self._fetch(collection, chunk))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    @property
+    def round_trips(self) -> int:
+        return self.usage.round_trips
+
+    async def _fetch(self, collection: str, doc_ids: List[str]) -> None:
+        self.usage.round_trips += 1
+        self.usage.reads += len(doc_ids)
+        try:
+            docs = await self.store.get_many(collection, doc_ids)
+        except BaseException as exc:
+            for doc_id in doc_ids:
+                future = self._memo.pop((collection, doc_id), None)
+                if future is not None and not future.done():
+                    if isinstance(exc, asyncio.CancelledError):
+                        future.cancel()
+                    else:
+                        future.set_exception(exc)
+            if isinstance(exc, Exception):
+                return
+            raise
+        for doc_id in doc_ids:
+            future = self._memo.get((collection, doc_id))
+            if future is not None and not future.done():
+                future.set_result(docs.get(doc_id))
+
+
+class LoadingStore(DocumentStore):
+    """
+    Store de uma requisição: leituras pontuais passam pelo DataLoader,
+    queries alimentam o memo e toda ida ao store é contada em `usage`.
+    """
+
+    def __init__(self, store: DocumentStore):
+        self.inner = store
+        self.usage = StoreUsage()
+        self.loader = DataLoader(store, usage=self.usage)
+
+    @property
+    def round_trips(self) -> int:
+        return self.usage.round_trips
+
+    def new_id(self) -> str:
+        return self.inner.new_id()
+
+    async def get(self, collection: str, doc_id: str) -> Optional[Doc]:
+        return await self.loader.load(collection, doc_id)
+
+    async def get_many(self, collection: str, doc_ids: Sequence[str]) -> Dict[str, Doc]:
+        return await self.loader.load_many(collection, doc_ids)
+
+    async def query(
+        self,
+        collection: str,
+        where: Iterable[Filter] = (),
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        select: Optional[Sequence[str]] = None,
+    ) -> List[Doc]:
+        self.usage.round_trips += 1
+        self.usage.queries += 1
+        docs = await self.inner.query(collection, where, order_by, descending, limit, select)
+        self.usage.docs_streamed += len(docs)
+        if select is None:
+            # Projeções não entram no memo: um get() precisa do documento inteiro
+            for doc in docs:
+                self.loader.prime(collection, doc["id"], dict(doc))
+        return docs
+
+    async def commit(self, writes: List[Write]) -> None:
+        self.usage.round_trips += 1
+        try:
+            await self.inner.commit(writes)
+        except Exception:
+            for write in writes:
+                self.loader.clear(write.collection, write.doc_id)
+            raise
+        self.usage.writes += len(writes)
+        for write in writes:
+            self.loader.apply(write)
+
+    async def set_many(self, collection: str, docs: Dict[str, Doc]) -> None:
+        self.usage.round_trips += 1
+        for doc_id in docs:
+            self.loader.clear(collection, doc_id)
+        await self.inner.set_many(collection, docs)
+        self.usage.writes += len(docs)
@@ -0,0 +1,133 @@
+"""
+Store de documentos em memória, totalmente assíncrono.
+
+Nenhuma operação aguarda I/O entre ler e escrever, então cada chamada é
+atômica em relação às demais corrotinas do event loop.
+"""
+from __future__ import annotations
+
+import heapq
+import uuid
+from collections import defaultdict
+from dataclasses import replace
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .base import DocumentStore, Filter, Write, apply_write, check_commit_size, project
+
+
+def _clone(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _clone(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clone(v) for v in value]
+    return value
+
+
+def _matches(doc: Dict[str, Any], where: Iterable[Filter]) -> bool:
+    for field, op, value in where:
+        current = doc.get(field)
+        if op == "==":
+            ok = current == value
+        elif op == "!=":
+            ok = current != value
+        elif op == "in":
+            ok = current in value
+        elif op == "array_contains":
+            ok = isinstance(current, list) and value in current
+        elif current is None:
+            ok = False
+        elif op == "<":
+            ok = current < value
+        elif op == "<=":
+            ok = current <= value
+        elif op == ">":
+            ok = current > value
+        elif op == ">=":
+            ok = current >= value
+        else:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        if not ok:
+            return False
+    return True
+
+
+class InMemoryStore(DocumentStore):
+    def __init__(self):
+        self._collections: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+
+    def new_id(self) -> str:
+        return uuid.uuid4().hex[:20]
+
+    async def get(self, collection: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        doc = self._collections[collection].get(doc_id)
+        return self._read(doc_id, doc) if doc is not None else None
+
+    async def get_many(self, collection: str, doc_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        docs = self._collections[collection]
+        return {doc_id: self._read(doc_id, docs[doc_id]) for doc_id in doc_ids if doc_id in docs}
+
+    async def query(
+        self,
+        collection: str,
+        where: Iterable[Filter] = (),
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        select: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        where = list(where)
+        matched = [
+            (doc_id, doc) for doc_id, doc in self._collections[collection].items()
+            if _matches(doc, where)
+        ]
+
+        if order_by:
+            # Documentos sem o campo ficam de fora, como no Firestore
+            matched = [(doc_id, doc) for doc_id, doc in matched if doc.get(order_by) is not None]
+            key = lambda pair: pair[1][order_by]  # noqa: E731
+            if limit is not None:
+                pick = heapq.nlargest if descending else heapq.nsmallest
+                matched = pick(limit, matched, key=key)
+            else:
+                matched.sort(key=key, reverse=descending)
+        elif limit is not None:
+            matched = matched[:limit]
+
+        # Projeta antes de copiar: campos omitidos não são clonados
+        return [self._read(doc_id, project(doc, select)) for doc_id, doc in matched]
+
+    async def commit(self, writes: List[Write]) -> None:
+        check_commit_size(writes)
+        # Calcula todos os novos estados antes de aplicar: tudo ou nada
+        staged: Dict[tuple, Optional[Dict[str, Any]]] = {}
+        for write in writes:
+            key = (write.collection, write.doc_id)
+            current = staged[key] if key in staged else self._collections[write.collection].get(write.doc_id)
+            staged[key] = apply_write(current, _clone_write(write))
+
+        for (collection, doc_id), doc in staged.items():
+            if doc is None:
+                self._collections[collection].pop(doc_id, None)
+            else:
+                self._collections[collection][doc_id] = doc
+
+    def count(self, collection: str) -> int:
+        return len(self._collections.get(collection, ()))
+
+    async def stats(self) -> Dict[str, Any]:
+        # Subcoleções somadas por padrão ("threads/*/messages")
+        documents: Dict[str, int] = defaultdict(int)
+        for collection, docs in list(self._collections.items()):
+            parts = collection.split("/")
+            documents[collection if len(parts) == 1 else f"{parts[0]}/*/{parts[2]}"] += len(docs)
+        return {"backend": type(self).__name__, "documents": dict(documents)}
+
+    @staticmethod
+    def _read(doc_id: str, doc: Dict[str, Any]) -> Dict[str, Any]:
+        data = _clone(doc)
+        data["id"] = doc_id
+        return data
+
+
+def _clone_write(write: Write) -> Write:
+    return replace(write, data=_clone(write.data))
@@ -0,0 +1,130 @@
+"""
+Agregados de relatório mantidos na escrita.
+
+Cada item conta no bucket (hora de criação, campus, categoria, tipo):
+criados, resolvidos e
+soma/contagem do tempo de resolução (em microssegundos, inteiro, para que a
+soma incremental bata exatamente com um recálculo). Criar ou alterar um item
+gera incrementos com a diferença entre a contribuição antiga e a nova, no
+mesmo commit da escrita do item.
+
+`recompute` refaz os buckets a partir dos itens: é a base do job de
+reconciliação (scripts/reconcile_reports.py).
+"""
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from urllib.parse import quote
+
+from .base import Increment, Write
+
+Doc = Dict[str, Any]
+
+REPORT_COLLECTION = "report_hours"
+REPORT_COUNTERS = ("created", "resolved", "resolutionMicros", "resolutionCount")
+# Dimensões de um bucket, na ordem do id
+REPORT_DIMENSIONS = ("campusId", "category", "type")
+# ItemStatus.RESOLVED; a camada de dados não importa os modelos
+RESOLVED = "RESOLVED"
+
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def hour_of(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def bucket_id(hour: datetime, dimensions: Dict[str, str]) -> str:
+    # quote escapa "|" e "/" (que o Firestore não aceita em ids)
+    return "|".join([f"{hour:%Y%m%d%H}", *(quote(dimensions[name], safe="") for name in REPORT_DIMENSIONS)])
+
+
+def item_dimensions(doc: Doc) -> Dict[str, str]:
+    # Enums (ItemType) entram pelo valor
+    return {name: getattr(doc.get(name), "value", doc.get(name)) or "" for name in REPORT_DIMENSIONS}
+
+
+def item_contribution(doc: Optional[Doc]) -> Optional[Tuple[str, Doc, Dict[str, int]]]:
+    """Bucket e contadores com que um item entra no relatório (None: não entra)."""
+    if not doc or not doc.get("createdAt"):
+        return None
+    created_at = doc["createdAt"]
+    counts = dict.fromkeys(REPORT_COUNTERS, 0)
+    counts["created"] = 1
+    if doc.get("status") == RESOLVED:
+        counts["resolved"] = 1
+        if doc.get("resolvedAt"):
+            counts["resolutionMicros"] = (doc["resolvedAt"] - created_at) // _MICROSECOND
+            counts["resolutionCount"] = 1
+    hour = hour_of(created_at)
+    dimensions = item_dimensions(doc)
+    return bucket_id(hour, dimensions), {"hour": hour, **dimensions}, counts
+
+
+def report_writes(changes: Iterable[Tuple[Optional[Doc], Optional[Doc]]]) -> List[Write]:
+    """
+    Incrementos para um conjunto de mudanças (antes, depois); None é item
+    inexistente. Mudanças no mesmo bucket viram uma única escrita.
+    """
+    deltas: Dict[str, Tuple[Doc, Counter]] = {}
+    for before, after in changes:
+        for doc, sign in ((before, -1), (after, 1)):
+            contribution = item_contribution(doc)
+            if contribution is None:
+                continue
+            key, fields, counts = contribution
+            delta = deltas.setdefault(key, (fields, Counter()))[1]
+            for name, value in counts.items():
+                delta[name] += sign * value
+
+    writes = []
+    for key, (fields, delta) in deltas.items():
+        increments = {name: Increment(value) for name, value in delta.items() if value}
+        if increments:
+            writes.append(Write("set", REPORT_COLLECTION, key, {**fields, **increments}, merge=True))
+    return writes
+
+
+def recompute(items: Iterable[Doc]) -> Dict[str, Doc]:
+    """Buckets completos recalculados a partir dos itens (reconciliação)."""
+    buckets: Dict[str, Doc] = {}
+    for doc in items:
+        contribution = item_contribution(doc)
+        if contribution is None:
+            continue
+        key, fields, counts = contribution
+        bucket = buckets.setdefault(key, {**fields, **dict.fromkeys(REPORT_COUNTERS, 0)})
+        for name, value in counts.items():
+            bucket[name] += value
+    return buckets
+
+
+@dataclass
+class ReportTotals:
+    created: int = 0
+    resolved: int = 0
+    resolution_micros: int = 0
+    resolution_count: int = 0
+
+    def add(self, bucket: Doc) -> None:
+        self.created += bucket.get("created", 0)
+        self.resolved += bucket.get("resolved", 0)
+        self.resolution_micros += bucket.get("resolutionMicros", 0)
+        self.resolution_count += bucket.get("resolutionCount", 0)
+
+    @classmethod
+    def from_buckets(cls, buckets: Iterable[Doc]) -> "ReportTotals":
+        totals = cls()
+        for bucket in buckets:
+            totals.add(bucket)
+        return totals
+
+    @property
+    def avg_resolution_hours(self) -> float:
+        if not self.resolution_count:
+            return 0
+        return self.resolution_micros / self.resolution_count / 3_600_000_000
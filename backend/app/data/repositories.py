@@ -0,0 +1,471 @@
+"""
+Repositórios assíncronos por entidade, sobre um DocumentStore.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .base import MAX_COMMIT_WRITES, DocumentStore, Increment, PartialCommit, PreconditionFailed, Write
+from .reports import REPORT_COLLECTION, REPORT_COUNTERS, REPORT_DIMENSIONS, bucket_id, hour_of, recompute, report_writes
+from .rollups import (
+    DAY_COLLECTION,
+    MONTH_COLLECTION,
+    RangeAccumulator,
+    Rollup,
+    day_of,
+    month_of,
+    rollup_id,
+)
+
+Doc = Dict[str, Any]
+
+
+def _inbox_collection(uid: str) -> str:
+    return f"users/{uid}/inbox"
+
+
+def _messages_collection(thread_id: str) -> str:
+    return f"threads/{thread_id}/messages"
+
+
+class ItemRepository:
+    collection = "items"
+
+    def __init__(self, store: DocumentStore):
+        self.store = store
+
+    def new_id(self) -> str:
+        return self.store.new_id()
+
+    async def create(self, item_id: str, data: Doc) -> None:
+        """Grava o item e os agregados de relatório no mesmo commit."""
+        await self.store.commit([Write("set", self.collection, item_id, data), *report_writes([(None, data)])])
+
+    async def create_many(self, items: Dict[str, Doc]) -> None:
+        """
+        Cadastro em lote: cada commit leva até metade de MAX_COMMIT_WRITES
+        itens e os agregados deles (no máximo um bucket por item). Uma falha
+        depois do primeiro commit levanta PartialCommit com os ids gravados.
+        """
+        docs = list(items.items())
+        step = MAX_COMMIT_WRITES // 2
+        committed: List[str] = []
+        for start in range(0, len(docs), step):
+            chunk = docs[start:start + step]
+            writes = [Write("set", self.collection, item_id, data) for item_id, data in chunk]
+            writes += report_writes((None, data) for _, data in chunk)
+            try:
+                await self.store.commit(writes)
+            except Exception as exc:
+                if not committed:
+                    raise
+                raise PartialCommit(committed) from exc
+            committed += [item_id for item_id, _ in chunk]
+
+    async def get(self, item_id: str) -> Optional[Doc]:
+        return await self.store.get(self.collection, item_id)
+
+    async def get_many(self, item_ids: Iterable[str]) -> Dict[str, Doc]:
+        return await self.store.get_many(self.collection, list(item_ids))
+
+    async def update(
+        self,
+        item_id: str,
+        changes: Doc,
+        precondition: Optional[Doc] = None,
+        current: Optional[Doc] = None,
+    ) -> None:
+        """
+        `current` é o documento que a pré-condição garante: com ele, a
+        diferença nos agregados de relatório vai no mesmo commit.
+        """
+        writes = [Write("update", self.collection, item_id, changes, precondition=precondition)]
+        if current is not None:
+            writes += report_writes([(current, {**current, **changes})])
+        await self.store.commit(writes)
+
+    async def query(
+        self,
+        status: Optional[str] = None,
+        campus_id: Optional[str] = None,
+        building_id: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        newest_first: bool = True,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Doc]:
+        """fields projeta os documentos no próprio store (None = inteiros)."""
+        where = []
+        if status:
+            where.append(("status", "==", status))
+        if campus_id:
+            where.append(("campusId", "==", campus_id))
+        if building_id:
+            where.append(("buildingId", "==", building_id))
+        if created_after:
+            where.append(("createdAt", ">=", created_after))
+        return await self.store.query(
+            self.collection, where, order_by="createdAt", descending=newest_first, limit=limit,
+            select=fields,
+        )
+
+
+class ThreadRepository:
+    collection = "threads"
+
+    def __init__(self, store: DocumentStore):
+        self.store = store
+
+    def new_id(self) -> str:
+        return self.store.new_id()
+
+    async def get(self, thread_id: str) -> Optional[Doc]:
+        return await self.store.get(self.collection, thread_id)
+
+    async def get_many(self, thread_ids: Iterable[str]) -> Dict[str, Doc]:
+        return await self.store.get_many(self.collection, list(thread_ids))
+
+    async def find_for_item(self, item_id: str, uid: str) -> Optional[Doc]:
+        docs = await self.store.query(
+            self.collection,
+            [("itemId", "==", item_id), ("participants", "array_contains", uid)],
+            limit=1,
+        )
+        return docs[0] if docs else None
+
+    async def create(self, thread_id: str, data: Doc) -> None:
+        """Grava a thread e as entradas de inbox dos participantes no mesmo commit."""
+        batch = self.store.batch()
+        batch.set(self.collection, thread_id, data)
+        for uid in data["participants"]:
+            batch.set(_inbox_collection(uid), thread_id, {
+                "threadId": thread_id,
+                "itemId": data.get("itemId"),
+                "updatedAt": data.get("updatedAt"),
+                "unread": 0,
+            })
+        await batch.commit()
+
+    async def list(self, participant: Optional[str] = None, limit: Optional[int] = None) -> List[Doc]:
+        where = [("participants", "array_contains", participant)] if participant else []
+        return await self.store.query(self.collection, where, order_by="updatedAt", descending=True, limit=limit)
+
+
+class MessageRepository:
+    def __init__(self, store: DocumentStore):
+        self.store = store
+
+    def new_id(self) -> str:
+        return self.store.new_id()
+
+    async def list(self, thread_id: str, limit: int) -> List[Doc]:
+        return await self.store.query(
+            _messages_collection(thread_id), order_by="createdAt", descending=True, limit=limit
+        )
+
+    async def send(
+        self,
+        thread_id: str,
+        message_id: str,
+        message: Doc,
+        item_id: Optional[str],
+        participants: Iterable[str],
+        preview: str,
+    ) -> None:
+        """
+        Mensagem, lastMessage/updatedAt da thread e inbox dos participantes
+        em um único commit atômico (incrementa não lidas dos destinatários).
+        """
+        sender = message["senderUid"]
+        sent_at = message["createdAt"]
+
+        batch = self.store.batch()
+        batch.set(_messages_collection(thread_id), message_id, message)
+        batch.update("threads", thread_id, {"lastMessage": preview, "updatedAt": sent_at})
+        for uid in participants:
+            entry = {
+                "threadId": thread_id,
+                "itemId": item_id,
+                "lastMessage": preview,
+                "lastSenderUid": sender,
+                "updatedAt": sent_at,
+            }
+            if uid != sender:
+                entry["unread"] = Increment(1)
+            batch.set(_inbox_collection(uid), thread_id, entry, merge=True)
+        await batch.commit()
+
+    async def mark_read(self, uid: str, thread_ids: Iterable[str]) -> None:
+        """Marca mensagens recebidas como lidas e desconta-as das não lidas da inbox."""
+        await asyncio.gather(*(self._mark_thread_read(uid, thread_id) for thread_id in thread_ids))
+
+    async def _mark_thread_read(self, uid: str, thread_id: str, attempts: int = 3) -> None:
+        """
+        Cada commit marca um lote de mensagens e decrementa o contador pelo
+        mesmo número, então mensagens que chegam durante a operação continuam
+        contadas. A pré-condição read == False evita descontar duas vezes a
+        mesma mensagem quando duas chamadas concorrem; nesse caso relê e repete,
+        e levanta PreconditionFailed se as `attempts` tentativas conflitarem.
+        """
+        collection = _messages_collection(thread_id)
+        chunk_size = MAX_COMMIT_WRITES - 1  # reserva uma escrita para a inbox
+        for _ in range(attempts):
+            unread = await self.store.query(collection, [("read", "==", False)])
+            received = [doc["id"] for doc in unread if doc.get("senderUid") != uid]
+            try:
+                for start in range(0, len(received), chunk_size):
+                    chunk = received[start:start + chunk_size]
+                    batch = self.store.batch()
+                    for message_id in chunk:
+                        batch.update(collection, message_id, {"read": True}, precondition={"read": False})
+                    batch.set(_inbox_collection(uid), thread_id, {"unread": Increment(-len(chunk))}, merge=True)
+                    await batch.commit()
+                return
+            except PreconditionFailed:
+                continue
+        raise PreconditionFailed(f"{collection}: read state kept changing after {attempts} attempts")
+
+
+class InboxRepository:
+    def __init__(self, store: DocumentStore):
+        self.store = store
+
+    async def list(self, uid: str, limit: int) -> List[Doc]:
+        return await self.store.query(
+            _inbox_collection(uid), order_by="updatedAt", descending=True, limit=limit
+        )
+
+
+class AlertRepository:
+    collection = "alerts"
+
+    def __init__(self, store: DocumentStore):
+        self.store = store
+
+    def new_id(self) -> str:
+        return self.store.new_id()
+
+    async def create(self, alert_id: str, data: Doc) -> None:
+        await self.store.set(self.collection, alert_id, data)
+
+    async def get(self, alert_id: str) -> Optional[Doc]:
+        return await self.store.get(self.collection, alert_id)
+
+    async def list_for_user(self, uid: str) -> List[Doc]:
+        return await self.store.query(self.collection, [("uid", "==", uid)])
+
+    async def update(self, alert_id: str, changes: Doc, precondition: Optional[Doc] = None) -> None:
+        await self.store.update(self.collection, alert_id, changes, precondition=precondition)
+
+    async def delete(self, alert_id: str) -> None:
+        await self.store.delete(self.collection, alert_id)
+
+
+class ReportRepository:
+    """
+    Agregados de itens: buckets (hora de criação, campus, categoria, tipo)
+    gravados na escrita e os rollups por dia e por mês compactados deles.
+    """
+
+    collection = REPORT_COLLECTION
+
+    def __init__(self, store: DocumentStore):
+        self.store = store
+
+    async def hours(
+        self,
+        since: Optional[datetime] = None,
+        campus_id: Optional[str] = None,
+        until: Optional[datetime] = None,
+    ) -> List[Doc]:
+        where = []
+        if since is not None:
+            where.append(("hour", ">=", hour_of(since)))
+        if until is not None:
+            where.append(("hour", "<", until))
+        if campus_id:
+            where.append(("campusId", "==", campus_id))
+        return await self.store.query(self.collection, where)
+
+    async def rollups(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        campus_id: Optional[str] = None,
+    ) -> List[Rollup]:
+        """Rollups mensais e diários que cobrem algum dia de [since, until)."""
+        rollups = []
+        for collection, first in ((MONTH_COLLECTION, month_of), (DAY_COLLECTION, day_of)):
+            where = []
+            if since is not None:
+                where.append(("start", ">=", first(since)))
+            if until is not None:
+                where.append(("start", "<", until))
+            if campus_id:
+                where.append(("campusId", "==", campus_id))
+            rollups += [Rollup.from_doc(doc) for doc in await self.store.query(collection, where)]
+        return rollups
+
+    async def range(
+        self,
+        start: datetime,
+        end: datetime,
+        group_by: Sequence[str] = (),
+        campus_id: Optional[str] = None,
+    ) -> RangeAccumulator:
+        """Contagens dos dias [start, end) somando rollups e buckets por hora."""
+        accumulator = RangeAccumulator(start, end, group_by)
+        for rollup in await self.rollups(start, end, campus_id):
+            accumulator.add_rollup(rollup)
+        for bucket in await self.hours(start, campus_id, until=end):
+            accumulator.add_bucket(bucket)
+        return accumulator
+
+    async def compact(self, now: Optional[datetime] = None, keep_days: int = 2) -> Dict[str, int]:
+        """
+        Dobra os buckets por hora anteriores a `keep_days` dias atrás em
+        rollups diários, e os dias de meses fechados em rollups mensais.
+        Cada commit apaga as origens (condicionadas aos valores lidos) e
+        grava o destino: um incremento concorrente na origem faz o commit
+        falhar, e aquele rollup fica para a próxima rodada. Rode um único
+        compactador por vez.
+        """
+        cutoff = day_of(now or datetime.utcnow()) - timedelta(days=keep_days)
+        closed = month_of(cutoff)
+        plan: Dict[Tuple[str, str], Tuple[Rollup, List[Tuple[Write, Callable[[Rollup], None]]]]] = {}
+
+        def sources(start: datetime, campus_id: str, monthly: bool) -> List[Tuple[Write, Callable[[Rollup], None]]]:
+            key = (MONTH_COLLECTION if monthly else DAY_COLLECTION, rollup_id(start, campus_id, monthly))
+            if key not in plan:
+                empty = Rollup.for_month(start, campus_id) if monthly else Rollup.for_day(start, campus_id)
+                plan[key] = (empty, [])
+            return plan[key][1]
+
+        for bucket in await self.store.query(self.collection, [("hour", "<", cutoff)]):
+            day = day_of(bucket["hour"])
+            monthly = day < closed
+            sources(month_of(day) if monthly else day, bucket.get("campusId") or "", monthly).append((
+                Write("delete", self.collection, bucket["id"],
+                      precondition={name: bucket.get(name) for name in REPORT_COUNTERS}),
+                lambda rollup, bucket=bucket: rollup.add_bucket(bucket),
+            ))
+        for doc in await self.store.query(DAY_COLLECTION, [("start", "<", closed)]):
+            daily = Rollup.from_doc(doc)
+            sources(month_of(daily.start), daily.campus_id, True).append((
+                Write("delete", DAY_COLLECTION, doc["id"], precondition={"version": daily.version}),
+                lambda rollup, daily=daily: rollup.merge(daily),
+            ))
+
+        result = {"hours": 0, "days": 0, "rollups": len(plan), "conflicts": 0}
+        step = MAX_COMMIT_WRITES - 1
+        for (collection, doc_id), (empty, folds) in plan.items():
+            stored = await self.store.get(collection, doc_id)
+            committed = Rollup.from_doc(stored) if stored else empty
+            for start in range(0, len(folds), step):
+                chunk = folds[start:start + step]
+                rollup = committed.copy()
+                for _, fold in chunk:
+                    fold(rollup)
+                rollup.version += 1
+                precondition = {"version": committed.version} if committed.version else None
+                try:
+                    await self.store.commit([
+                        *(write for write, _ in chunk),
+                        Write("set", collection, doc_id, rollup.to_doc(), precondition=precondition),
+                    ])
+                except PreconditionFailed:
+                    result["conflicts"] += 1
+                    break
+                committed = rollup
+                for write, _ in chunk:
+                    result["hours" if write.collection == self.collection else "days"] += 1
+        return result
+
+    async def reconcile(self, since: Optional[datetime] = None, fix: bool = True) -> Dict[str, Dict[str, Doc]]:
+        """
+        Recalcula os buckets a partir dos itens (desde a hora de `since`;
+        None = todos) e devolve as diferenças. Com fix, corrige com
+        incrementos, que não atropelam escritas concorrentes; uma escrita
+        que caia entre as duas leituras é corrigida na próxima rodada.
+
+        Dias já compactados só têm resolução de dia: são comparados por
+        (dia, campus, categoria, tipo), e a correção vai para o bucket da
+        meia-noite, que a próxima compactação dobra no rollup.
+        """
+        since = hour_of(since) if since is not None else None
+        rollups = await self.rollups(since)
+        rolled_days = {
+            (rollup.start + timedelta(days=day), rollup.campus_id)
+            for rollup in rollups for day in range(rollup.days)
+        }
+        if since is not None and any(day == day_of(since) for day, _ in rolled_days):
+            since = day_of(since)
+
+        items = await self.store.query(
+            ItemRepository.collection,
+            [("createdAt", ">=", since)] if since is not None else [],
+            select=("createdAt", "status", "resolvedAt", *REPORT_DIMENSIONS),
+        )
+        hourly: Dict[str, Dict[str, Any]] = {}
+        daily: Dict[tuple, Dict[str, Any]] = {}
+
+        def entry(bucket: Doc) -> Dict[str, Any]:
+            fields = {name: bucket.get(name) or "" for name in REPORT_DIMENSIONS}
+            day = day_of(bucket["hour"])
+            if (day, fields["campusId"]) not in rolled_days:
+                return hourly.setdefault(bucket["id"], {
+                    "fields": {"hour": bucket["hour"], **fields}, "expected": Counter(), "stored": Counter(),
+                })
+            return daily.setdefault((day, *fields.values()), {
+                "fields": {"hour": day, **fields}, "expected": Counter(), "stored": Counter(),
+            })
+
+        for key, bucket in recompute(items).items():
+            entry({**bucket, "id": key})["expected"].update(_report_counts(bucket))
+        for bucket in await self.hours(since):
+            entry(bucket)["stored"].update(_report_counts(bucket))
+        for rollup in rollups:
+            for n, (category, type_) in enumerate(rollup.groups):
+                for day in range(rollup.days):
+                    hour = rollup.start + timedelta(days=day)
+                    if since is not None and hour < since:
+                        continue
+                    counts = dict(zip(REPORT_COUNTERS, rollup.counts(n, day)))
+                    bucket = {"hour": hour, "campusId": rollup.campus_id, "category": category, "type": type_}
+                    entry(bucket)["stored"].update(counts)
+
+        diffs: Dict[str, Dict[str, Doc]] = {}
+        writes = []
+        compared = [*hourly.items(), *((bucket_id(e["fields"]["hour"], e["fields"]), e) for e in daily.values())]
+        for key, compared_entry in sorted(compared, key=lambda pair: pair[0]):
+            want = {name: compared_entry["expected"][name] for name in REPORT_COUNTERS}
+            have = {name: compared_entry["stored"][name] for name in REPORT_COUNTERS}
+            if want == have:
+                continue
+            diffs[key] = {"stored": have, "expected": want}
+            increments = {name: Increment(want[name] - have[name]) for name in REPORT_COUNTERS if want[name] != have[name]}
+            writes.append(Write("set", self.collection, key, {**compared_entry["fields"], **increments}, merge=True))
+        if fix:
+            for start in range(0, len(writes), MAX_COMMIT_WRITES):
+                await self.store.commit(writes[start:start + MAX_COMMIT_WRITES])
+        return diffs
+
+
+def _report_counts(bucket: Doc) -> Dict[str, int]:
+    return {name: bucket.get(name) or 0 for name in REPORT_COUNTERS}
+
+
+class Repository:
+    """Ponto único de acesso a dados usado pelas rotas."""
+
+    def __init__(self, store: DocumentStore):
+        self.store = store
+        self.items = ItemRepository(store)
+        self.threads = ThreadRepository(store)
+        self.messages = MessageRepository(store)
+        self.inbox = InboxRepository(store)
+        self.alerts = AlertRepository(store)
+        self.reports = ReportRepository(store)
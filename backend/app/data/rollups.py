@@ -0,0 +1,245 @@
+"""
+Rollups compactos dos buckets de relatório, para consultas por intervalo.
+
+Os buckets por hora (reports.py) de dias já fechados são compactados em um
+documento por (dia, campus), e os dias de meses fechados em um documento
+por (mês, campus). Um rollup guarda a lista de grupos (categoria, tipo) e
+um único array de inteiros de 64 bits, contador a contador e dia a dia:
+
+    values[(grupo * len(REPORT_COUNTERS) + contador) * days + dia]
+
+Somar um contador de um grupo num trecho de dias é uma fatia contígua. No
+documento o array vai empacotado (little-endian, em base64): os stores
+copiam e (de)serializam uma string, não milhares de inteiros.
+
+A compactação move as contagens (apaga a origem no mesmo commit que grava o
+destino): hora, dia e mês nunca contam a mesma escrita, e uma consulta soma
+os três níveis. Escritas tardias (item antigo resolvido hoje) recriam o
+bucket da hora, que a compactação seguinte dobra de novo.
+"""
+from __future__ import annotations
+
+import base64
+import calendar
+import sys
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from .reports import REPORT_COUNTERS, ReportTotals
+
+Doc = Dict[str, Any]
+Group = Tuple[str, str]
+
+DAY_COLLECTION = "report_days"
+MONTH_COLLECTION = "report_months"
+# Dimensões dentro de um rollup (o campus fica no documento)
+ROLLUP_GROUP = ("category", "type")
+
+# Chaves aceitas em groupBy: dimensões dos buckets e períodos
+GROUP_DIMENSIONS = {"campus": "campusId", "category": "category", "type": "type"}
+GROUP_PERIODS = ("day", "week", "month")
+
+_COUNTERS = len(REPORT_COUNTERS)
+
+
+def day_of(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def month_of(value: datetime) -> datetime:
+    return day_of(value).replace(day=1)
+
+
+def next_month(month: datetime) -> datetime:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def pack_values(values: array) -> str:
+    if sys.byteorder != "little":
+        values = array("q", values)
+        values.byteswap()
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def unpack_values(packed: str) -> array:
+    values = array("q", base64.b64decode(packed))
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def rollup_id(start: datetime, campus_id: str, monthly: bool) -> str:
+    return f"{start:%Y%m}|{quote(campus_id, safe='')}" if monthly else f"{start:%Y%m%d}|{quote(campus_id, safe='')}"
+
+
+@dataclass
+class Rollup:
+    """Contadores de um campus por (grupo, dia), de `start` a `start + days`."""
+
+    start: datetime
+    days: int
+    campus_id: str
+    groups: List[Group] = field(default_factory=list)
+    values: array = field(default_factory=lambda: array("q"))
+    version: int = 0
+
+    def __post_init__(self):
+        self._index = {group: n for n, group in enumerate(self.groups)}
+
+    @classmethod
+    def for_day(cls, day: datetime, campus_id: str) -> "Rollup":
+        return cls(day, 1, campus_id)
+
+    @classmethod
+    def for_month(cls, month: datetime, campus_id: str) -> "Rollup":
+        return cls(month, calendar.monthrange(month.year, month.month)[1], campus_id)
+
+    @classmethod
+    def from_doc(cls, doc: Doc) -> "Rollup":
+        return cls(
+            doc["start"], doc["days"], doc["campusId"],
+            [tuple(group) for group in doc["groups"]], unpack_values(doc["values"]), doc.get("version", 0),
+        )
+
+    def to_doc(self) -> Doc:
+        return {
+            "start": self.start,
+            "days": self.days,
+            "campusId": self.campus_id,
+            "groups": [list(group) for group in self.groups],
+            "values": pack_values(self.values),
+            "version": self.version,
+        }
+
+    def copy(self) -> "Rollup":
+        return Rollup(self.start, self.days, self.campus_id, list(self.groups), array("q", self.values), self.version)
+
+    def _base(self, group: Group) -> int:
+        n = self._index.get(group)
+        if n is None:
+            n = self._index[group] = len(self.groups)
+            self.groups.append(group)
+            self.values.extend(array("q", [0]) * (_COUNTERS * self.days))
+        return n * _COUNTERS * self.days
+
+    def add(self, day: int, group: Group, counts: Sequence[int]) -> None:
+        base = self._base(group) + day
+        for counter, value in enumerate(counts):
+            self.values[base + counter * self.days] += value
+
+    def add_bucket(self, bucket: Doc) -> None:
+        """Dobra um bucket por hora (do mesmo campus) no rollup."""
+        self.add(
+            (day_of(bucket["hour"]) - self.start).days,
+            tuple(bucket.get(name) or "" for name in ROLLUP_GROUP),
+            [bucket.get(name) or 0 for name in REPORT_COUNTERS],
+        )
+
+    def merge(self, other: "Rollup") -> None:
+        """Dobra um rollup menor (um dia) contido neste (o mês)."""
+        shift = (other.start - self.start).days
+        for n, group in enumerate(other.groups):
+            for day in range(other.days):
+                self.add(shift + day, group, other.counts(n, day))
+
+    def counts(self, n: int, day: int) -> List[int]:
+        base = n * _COUNTERS * self.days + day
+        return [self.values[base + counter * self.days] for counter in range(_COUNTERS)]
+
+    def daily(self, n: int, first: int, last: int) -> Iterator[Tuple[int, Tuple[int, ...]]]:
+        """(dia, contadores) do grupo n nos dias [first, last), sem os dias zerados."""
+        base = n * _COUNTERS * self.days
+        columns = [self.values[base + counter * self.days + first:base + counter * self.days + last]
+                   for counter in range(_COUNTERS)]
+        for day, counts in enumerate(zip(*columns), first):
+            if any(counts):
+                yield day, counts
+
+    def sums(self, first: int, last: int) -> Iterator[Tuple[Group, List[int]]]:
+        """Contadores de cada grupo somados nos dias [first, last)."""
+        for n, group in enumerate(self.groups):
+            base = n * _COUNTERS * self.days
+            yield group, [
+                sum(self.values[base + counter * self.days + first:base + counter * self.days + last])
+                for counter in range(_COUNTERS)
+            ]
+
+
+def period_key(day: datetime, period: str) -> str:
+    if period == "day":
+        return day.date().isoformat()
+    if period == "week":
+        return (day - timedelta(days=day.weekday())).date().isoformat()
+    return f"{day:%Y-%m}"
+
+
+class RangeAccumulator:
+    """
+    Soma contagens de [start, end) agrupadas pelas chaves de groupBy
+    (dimensões e no máximo um período).
+    """
+
+    def __init__(self, start: datetime, end: datetime, group_by: Sequence[str] = ()):
+        self.start = start
+        self.end = end
+        self.dimensions = [GROUP_DIMENSIONS[key] for key in group_by if key in GROUP_DIMENSIONS]
+        periods = [key for key in group_by if key in GROUP_PERIODS]
+        self.period: Optional[str] = periods[0] if periods else None
+        self.rows: Dict[tuple, List[int]] = defaultdict(lambda: [0] * _COUNTERS)
+
+    def _prefix(self, dimensions: Dict[str, str]) -> tuple:
+        return tuple(dimensions.get(name) or "" for name in self.dimensions)
+
+    def _key(self, day: datetime, dimensions: Dict[str, str]) -> tuple:
+        key = self._prefix(dimensions)
+        return key + (period_key(day, self.period),) if self.period else key
+
+    def _add(self, key: tuple, counts: Sequence[int]) -> None:
+        row = self.rows[key]
+        for counter, value in enumerate(counts):
+            row[counter] += value
+
+    def add_bucket(self, bucket: Doc) -> None:
+        self._add(self._key(bucket["hour"], bucket), [bucket.get(name) or 0 for name in REPORT_COUNTERS])
+
+    def add_rollup(self, rollup: Rollup) -> None:
+        first = max((self.start - rollup.start).days, 0)
+        last = min((self.end - rollup.start).days, rollup.days)
+        if first >= last:
+            return
+        if self.period not in ("day", "week"):
+            # Um rollup cabe em um único mês: basta a fatia somada por grupo
+            for (category, type_), counts in rollup.sums(first, last):
+                dimensions = {"campusId": rollup.campus_id, "category": category, "type": type_}
+                self._add(self._key(rollup.start, dimensions), counts)
+            return
+        periods = [period_key(rollup.start + timedelta(days=day), self.period) for day in range(rollup.days)]
+        for n, (category, type_) in enumerate(rollup.groups):
+            prefix = self._prefix({"campusId": rollup.campus_id, "category": category, "type": type_})
+            for day, counts in rollup.daily(n, first, last):
+                self._add(prefix + (periods[day],), counts)
+
+    def result(self) -> List[Tuple[tuple, ReportTotals]]:
+        return [
+            (key, ReportTotals(*counts))
+            for key, counts in sorted(self.rows.items())
+            if any(counts)
+        ]
+
+    def totals(self) -> ReportTotals:
+        totals = ReportTotals()
+        for counts in self.rows.values():
+            totals.add(dict(zip(REPORT_COUNTERS, counts)))
+        return totals
+
+    @property
+    def key_names(self) -> List[str]:
+        return self.dimensions + ([self.period] if self.period else [])
+
+
+def as_datetime(value: date) -> datetime:
+    return datetime(value.year, value.month, value.day)
@@ -0,0 +1,559 @@
+"""
+Store embarcado em SQLite, espelhando as tabelas de supabase_schema.sql.
+
+Cada coleção conhecida vira uma tabela com o documento completo em `data`
+(JSON) e os campos usados em filtros/ordenação projetados em colunas
+indexadas, com os mesmos índices do schema do Postgres. Subcoleções
+("threads/{id}/messages", "users/{uid}/inbox") usam a coluna do pai;
+coleções desconhecidas caem na tabela genérica `documents`.
+
+Desempenho:
+- pool de conexões (uma por thread do executor), modo WAL e
+  synchronous=NORMAL: leitores não bloqueiam o escritor
+- SQL gerado de forma determinística para reaproveitar o cache de
+  prepared statements de cada conexão
+- sets consecutivos de um commit viram um único executemany
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import queue
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from enum import Enum
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .base import DocumentStore, Filter, Increment, Write, apply_write, check_commit_size
+
+# Limite de parâmetros por IN (...) em leituras em lote
+_MAX_IN_PARAMS = 500
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    table: str
+    # campo do documento -> coluna projetada
+    columns: Dict[str, str] = field(default_factory=dict)
+    # coluna que guarda o id do documento pai (subcoleções)
+    parent_column: Optional[str] = None
+
+
+TABLES: Dict[str, TableSpec] = {
+    "items": TableSpec("items", {
+        "ownerUid": "owner_id",
+        "type": "type",
+        "status": "status",
+        "campusId": "campus_id",
+        "buildingId": "building_id",
+        "createdAt": "created_at",
+        "updatedAt": "updated_at",
+    }),
+    "threads": TableSpec("threads", {
+        "itemId": "item_id",
+        "createdAt": "created_at",
+        "updatedAt": "updated_at",
+    }),
+    "threads/*/messages": TableSpec("messages", {
+        "senderUid": "author_id",
+        "read": "read",
+        "createdAt": "created_at",
+    }, parent_column="thread_id"),
+    "users/*/inbox": TableSpec("inbox", {
+        "updatedAt": "updated_at",
+    }, parent_column="user_id"),
+    "report_hours": TableSpec("report_hours", {
+        "hour": "hour",
+        "campusId": "campus_id",
+    }),
+    "report_days": TableSpec("report_days", {
+        "start": "start",
+        "campusId": "campus_id",
+    }),
+    "report_months": TableSpec("report_months", {
+        "start": "start",
+        "campusId": "campus_id",
+    }),
+    "alerts": TableSpec("alerts", {
+        "uid": "user_id",
+        "campusId": "campus_id",
+        "active": "active",
+        "createdAt": "created_at",
+    }),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+  id TEXT PRIMARY KEY,
+  owner_id TEXT,
+  type TEXT,
+  status TEXT,
+  campus_id TEXT,
+  building_id TEXT,
+  created_at TEXT,
+  updated_at TEXT,
+  data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_items_owner ON items(owner_id);
+CREATE INDEX IF NOT EXISTS idx_items_type ON items(type);
+CREATE INDEX IF NOT EXISTS idx_items_status ON items(status);
+CREATE INDEX IF NOT EXISTS idx_items_campus ON items(campus_id);
+CREATE INDEX IF NOT EXISTS idx_items_building ON items(building_id);
+CREATE INDEX IF NOT EXISTS idx_items_created ON items(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_items_composite ON items(status, campus_id, created_at DESC);
+
+CREATE TABLE IF NOT EXISTS threads (
+  id TEXT PRIMARY KEY,
+  item_id TEXT,
+  created_at TEXT,
+  updated_at TEXT,
+  data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_threads_item ON threads(item_id);
+CREATE INDEX IF NOT EXISTS idx_threads_updated ON threads(updated_at DESC);
+
+CREATE TABLE IF NOT EXISTS messages (
+  thread_id TEXT NOT NULL,
+  id TEXT NOT NULL,
+  author_id TEXT,
+  read INTEGER,
+  created_at TEXT,
+  data TEXT NOT NULL,
+  PRIMARY KEY (thread_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_messages_thread ON messages(thread_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_messages_author ON messages(author_id);
+
+CREATE TABLE IF NOT EXISTS inbox (
+  user_id TEXT NOT NULL,
+  id TEXT NOT NULL,
+  updated_at TEXT,
+  data TEXT NOT NULL,
+  PRIMARY KEY (user_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_inbox_updated ON inbox(user_id, updated_at DESC);
+
+CREATE TABLE IF NOT EXISTS alerts (
+  id TEXT PRIMARY KEY,
+  user_id TEXT,
+  campus_id TEXT,
+  active INTEGER,
+  created_at TEXT,
+  data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_user ON alerts(user_id);
+CREATE INDEX IF NOT EXISTS idx_alerts_active ON alerts(active);
+CREATE INDEX IF NOT EXISTS idx_alerts_campus ON alerts(campus_id);
+
+CREATE TABLE IF NOT EXISTS report_hours (
+  id TEXT PRIMARY KEY,
+  hour TEXT,
+  campus_id TEXT,
+  data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_report_hours_hour ON report_hours(hour, campus_id);
+CREATE INDEX IF NOT EXISTS idx_report_hours_campus ON report_hours(campus_id, hour);
+
+CREATE TABLE IF NOT EXISTS report_days (
+  id TEXT PRIMARY KEY,
+  start TEXT,
+  campus_id TEXT,
+  data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_report_days_start ON report_days(start, campus_id);
+CREATE INDEX IF NOT EXISTS idx_report_days_campus ON report_days(campus_id, start);
+
+CREATE TABLE IF NOT EXISTS report_months (
+  id TEXT PRIMARY KEY,
+  start TEXT,
+  campus_id TEXT,
+  data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_report_months_start ON report_months(start, campus_id);
+CREATE INDEX IF NOT EXISTS idx_report_months_campus ON report_months(campus_id, start);
+
+CREATE TABLE IF NOT EXISTS documents (
+  collection TEXT NOT NULL,
+  id TEXT NOT NULL,
+  data TEXT NOT NULL,
+  PRIMARY KEY (collection, id)
+);
+"""
+
+# Coleções que ganharam tabela própria depois de já terem documentos na
+# tabela genérica: movidos na abertura do banco (no-op depois da primeira)
+MIGRATIONS = """
+INSERT OR IGNORE INTO report_hours (id, hour, campus_id, data)
+  SELECT id, json_extract(data, '$.hour."$date"'), json_extract(data, '$.campusId'), data
+  FROM documents WHERE collection = 'report_hours';
+DELETE FROM documents WHERE collection = 'report_hours';
+INSERT OR IGNORE INTO report_days (id, start, campus_id, data)
+  SELECT id, json_extract(data, '$.start."$date"'), json_extract(data, '$.campusId'), data
+  FROM documents WHERE collection = 'report_days';
+DELETE FROM documents WHERE collection = 'report_days';
+INSERT OR IGNORE INTO report_months (id, start, campus_id, data)
+  SELECT id, json_extract(data, '$.start."$date"'), json_extract(data, '$.campusId'), data
+  FROM documents WHERE collection = 'report_months';
+DELETE FROM documents WHERE collection = 'report_months';
+"""
+
+_SQL_OPS = {"==": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+
+# --------------------------------------------------------------------------
+# Serialização
+# --------------------------------------------------------------------------
+
+def _to_sql(value: Any) -> Any:
+    """Valor de coluna/parâmetro: datas em ISO (ordenável), enums pelo valor."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat(timespec="microseconds")
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$date": _to_sql(value)}
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _json_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "$date" in obj:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+
+def encode_document(data: Dict[str, Any]) -> str:
+    return json.dumps(data, default=_json_default, separators=(",", ":"), ensure_ascii=False)
+
+
+def decode_document(raw: str) -> Dict[str, Any]:
+    return json.loads(raw, object_hook=_json_hook)
+
+
+# --------------------------------------------------------------------------
+# Resolução de coleções
+# --------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class _Target:
+    spec: TableSpec
+    # (coluna, valor) que restringem a tabela à coleção: pai ou nome genérico
+    scope: Tuple[Tuple[str, str], ...]
+
+
+_GENERIC = TableSpec("documents")
+
+
+def _resolve(collection: str) -> _Target:
+    parts = collection.split("/")
+    if len(parts) == 1 and collection in TABLES:
+        return _Target(TABLES[collection], ())
+    if len(parts) == 3:
+        spec = TABLES.get(f"{parts[0]}/*/{parts[2]}")
+        if spec is not None:
+            return _Target(spec, ((spec.parent_column, parts[1]),))
+    return _Target(_GENERIC, (("collection", collection),))
+
+
+class SQLiteStore(DocumentStore):
+    def __init__(self, path: str = "lost_found.db", pool_size: int = 4):
+        self.path = path
+        self.pool_size = pool_size
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._connections: List[sqlite3.Connection] = []
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="sqlite")
+        self._write_lock = threading.Lock()
+
+        for _ in range(pool_size):
+            conn = self._connect()
+            self._connections.append(conn)
+            self._pool.put(conn)
+
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+            conn.executescript(f"BEGIN IMMEDIATE;{MIGRATIONS}COMMIT;")
+
+    def _connect(self) -> sqlite3.Connection:
+        uri = self.path.startswith("file:")
+        conn = sqlite3.connect(
+            self.path,
+            uri=uri,
+            check_same_thread=False,
+            isolation_level=None,  # transações controladas explicitamente
+            cached_statements=256,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    async def _run(self, fn: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args))
+
+    def new_id(self) -> str:
+        return uuid.uuid4().hex[:20]
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "poolSize": self.pool_size,
+            "idleConnections": self._pool.qsize(),
+            "documents": await self._run(self._count_sync),
+        }
+
+    def _count_sync(self) -> Dict[str, int]:
+        with self._connection() as conn:
+            return {
+                name: conn.execute(f"SELECT COUNT(*) FROM {spec.table}").fetchone()[0]
+                for name, spec in TABLES.items()
+            }
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        for conn in self._connections:
+            conn.close()
+        self._connections.clear()
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    async def get(self, collection: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        found = await self._run(self._get_many_sync, collection, [doc_id])
+        return found.get(doc_id)
+
+    async def get_many(self, collection: str, doc_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        if not doc_ids:
+            return {}
+        return await self._run(self._get_many_sync, collection, list(doc_ids))
+
+    def _get_many_sync(self, collection: str, doc_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        target = _resolve(collection)
+        result = {}
+        with self._connection() as conn:
+            for start in range(0, len(doc_ids), _MAX_IN_PARAMS):
+                chunk = doc_ids[start:start + _MAX_IN_PARAMS]
+                where, params = self._scope_clause(target)
+                where.append(f"id IN ({','.join('?' * len(chunk))})")
+                sql = f"SELECT id, data FROM {target.spec.table} WHERE {' AND '.join(where)}"
+                for doc_id, raw in conn.execute(sql, params + chunk):
+                    result[doc_id] = self._read(doc_id, raw)
+        return result
+
+    async def query(
+        self,
+        collection: str,
+        where: Iterable[Filter] = (),
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        select: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        return await self._run(
+            self._query_sync, collection, list(where), order_by, descending, limit, select
+        )
+
+    def _query_sync(
+        self,
+        collection: str,
+        where: List[Filter],
+        order_by: Optional[str],
+        descending: bool,
+        limit: Optional[int],
+        select: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        target = _resolve(collection)
+        clauses, params = self._scope_clause(target)
+
+        for field_name, op, value in where:
+            expr = self._field_expr(target.spec, field_name)
+            if op in _SQL_OPS:
+                clauses.append(f"{expr} {_SQL_OPS[op]} ?")
+                params.append(_to_sql(value))
+            elif op == "in":
+                values = [_to_sql(v) for v in value]
+                if not values:
+                    return []
+                clauses.append(f"{expr} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+            elif op == "array_contains":
+                clauses.append(
+                    f"EXISTS (SELECT 1 FROM json_each({target.spec.table}.data, ?) WHERE value = ?)"
+                )
+                params.extend([f"$.{field_name}", _to_sql(value)])
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+
+        sql = f"SELECT id, {self._select_expr(select)} FROM {target.spec.table}"
+        if order_by:
+            order_expr = self._field_expr(target.spec, order_by)
+            clauses.append(f"{order_expr} IS NOT NULL")
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if order_by:
+            sql += f" ORDER BY {order_expr} {'DESC' if descending else 'ASC'}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        if select is None:
+            return [self._read(doc_id, raw) for doc_id, raw in rows]
+        return [self._read_projection(doc_id, raw) for doc_id, raw in rows]
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    async def commit(self, writes: List[Write]) -> None:
+        check_commit_size(writes)
+        if writes:
+            await self._run(self._commit_sync, writes)
+
+    def _commit_sync(self, writes: List[Write]) -> None:
+        with self._write_lock, self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                pending: List[Write] = []
+                for write in writes:
+                    if _is_plain_set(write):
+                        if pending and pending[-1].collection != write.collection:
+                            self._flush_sets(conn, pending)
+                        pending.append(write)
+                        continue
+                    self._flush_sets(conn, pending)
+                    self._apply_one(conn, write)
+                self._flush_sets(conn, pending)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _flush_sets(self, conn: sqlite3.Connection, pending: List[Write]) -> None:
+        """Sets simples da mesma coleção em um único executemany."""
+        if not pending:
+            return
+        target = _resolve(pending[0].collection)
+        sql = self._upsert_sql(target)
+        conn.executemany(sql, [self._row(target, w.doc_id, w.data) for w in pending])
+        pending.clear()
+
+    def _apply_one(self, conn: sqlite3.Connection, write: Write) -> None:
+        target = _resolve(write.collection)
+        where, params = self._scope_clause(target)
+        where.append("id = ?")
+        params.append(write.doc_id)
+        condition = " AND ".join(where)
+
+        if write.kind == "delete" and not write.precondition:
+            conn.execute(f"DELETE FROM {target.spec.table} WHERE {condition}", params)
+            return
+
+        current = None
+        if not _is_plain_set(write):
+            row = conn.execute(f"SELECT data FROM {target.spec.table} WHERE {condition}", params).fetchone()
+            current = decode_document(row[0]) if row else None
+
+        doc = apply_write(current, write)
+        if doc is None:
+            conn.execute(f"DELETE FROM {target.spec.table} WHERE {condition}", params)
+            return
+        conn.execute(self._upsert_sql(target), self._row(target, write.doc_id, doc))
+
+    # ------------------------------------------------------------------
+    # SQL
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _scope_clause(target: _Target) -> Tuple[List[str], List[Any]]:
+        return [f"{column} = ?" for column, _ in target.scope], [value for _, value in target.scope]
+
+    @staticmethod
+    def _field_expr(spec: TableSpec, field_name: str) -> str:
+        column = spec.columns.get(field_name)
+        if column:
+            return column
+        if not field_name.replace("_", "").replace(".", "").isalnum():
+            raise ValueError(f"Invalid field name: {field_name}")
+        # Datas ficam no JSON como {"$date": "<ISO>"}: compara pelo texto ISO
+        return (
+            f"COALESCE(json_extract(data, '$.{field_name}.\"$date\"'), "
+            f"json_extract(data, '$.{field_name}'))"
+        )
+
+    @staticmethod
+    def _select_expr(select: Optional[Sequence[str]]) -> str:
+        """Projeção feita pelo SQLite: só os campos pedidos saem do banco."""
+        if select is None:
+            return "data"
+        pairs = []
+        for field_name in select:
+            if field_name == "id":
+                continue
+            if not field_name.replace("_", "").isalnum():
+                raise ValueError(f"Invalid field name: {field_name}")
+            pairs.append(f"'{field_name}', json_extract(data, '$.{field_name}')")
+        return f"json_object({', '.join(pairs)})"
+
+    @staticmethod
+    def _upsert_sql(target: _Target) -> str:
+        columns = [column for column, _ in target.scope] + ["id"]
+        columns += list(target.spec.columns.values()) + ["data"]
+        placeholders = ",".join("?" * len(columns))
+        return f"INSERT OR REPLACE INTO {target.spec.table} ({','.join(columns)}) VALUES ({placeholders})"
+
+    @staticmethod
+    def _row(target: _Target, doc_id: str, data: Dict[str, Any]) -> List[Any]:
+        row = [value for _, value in target.scope] + [doc_id]
+        row += [_to_sql(data.get(field_name)) for field_name in target.spec.columns]
+        row.append(encode_document(data))
+        return row
+
+    @staticmethod
+    def _read(doc_id: str, raw: str) -> Dict[str, Any]:
+        data = decode_document(raw)
+        data["id"] = doc_id
+        return data
+
+    @staticmethod
+    def _read_projection(doc_id: str, raw: str) -> Dict[str, Any]:
+        # json_object não distingue campo ausente de nulo: ambos ficam de fora
+        data = {key: value for key, value in decode_document(raw).items() if value is not None}
+        data["id"] = doc_id
+        return data
+
+
+def _is_plain_set(write: Write) -> bool:
+    """Set que não depende do estado atual (pode ir em executemany)."""
+    return (
+        write.kind == "set"
+        and not write.merge
+        and not write.precondition
+        and not any(isinstance(value, Increment) for value in write.data.values())
+    )
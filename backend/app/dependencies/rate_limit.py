@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import math
+
+from fastapi import Depends, HTTPException, status
+
+from ..services.rate_limit import get_rate_limiter, rate_limit_rules
+from .auth import AuthenticatedUser, get_current_user
+
+
+def rate_limit(scope: str):
+    """
+    Dependency que limita requisições por usuário no escopo informado
+    ("messages", "items", "alerts"). Excedido o limite, responde 429.
+    """
+    async def check_rate_limit(
+        user: AuthenticatedUser = Depends(get_current_user),
+        limiter=Depends(get_rate_limiter)
+    ) -> None:
+        rule = rate_limit_rules()[scope]
+        decision = await limiter.hit(f"{scope}:{user.uid}", rule)
+        if not decision.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(retry_after_header(decision.retry_after))}
+            )
+
+    return check_rate_limit
+
+
+def retry_after_header(seconds: float) -> int:
+    """Arredonda para cima: tentar antes do prazo seria rejeitado de novo."""
+    return max(1, math.ceil(seconds))
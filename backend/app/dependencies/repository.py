@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import logging
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import Depends, Request
+
+from ..data import Repository, get_repository
+from ..data.loader import LoadingStore, StoreUsage
+from ..middleware.timing import STORE_USAGE_SCOPE_KEY, route_template
+from ..services.metrics import MetricsRegistry, get_metrics
+from ..settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+STORE_USAGE_KINDS = ("reads", "writes", "queries", "docs_streamed")
+
+
+async def get_request_repository(
+    request: Request,
+    repo: Repository = Depends(get_repository),
+    metrics: MetricsRegistry = Depends(get_metrics)
+) -> AsyncIterator[Repository]:
+    """
+    Repositório da requisição: leituras pontuais agrupadas e memorizadas
+    pelo DataLoader. Ao final, registra o uso do store nas métricas e
+    confere o orçamento da rota.
+    """
+    store = LoadingStore(repo.store)
+    request.scope[STORE_USAGE_SCOPE_KEY] = store.usage
+    try:
+        yield Repository(store)
+    finally:
+        loader = store.loader
+        metrics.inc("store_round_trips_total", store.round_trips)
+        metrics.inc("dataloader_loads_total", loader.loads)
+        metrics.inc("dataloader_memo_hits_total", loader.memo_hits)
+        metrics.inc("requests_with_store_total")
+        record_store_usage(metrics, request.scope, store.usage)
+
+
+def record_store_usage(
+    metrics: MetricsRegistry,
+    scope,
+    usage: StoreUsage,
+    budgets: Optional[Dict[str, Dict[str, int]]] = None,
+) -> None:
+    """
+    Contadores por rota e checagem do orçamento ("GET /items/{item_id}" ->
+    limites por tipo). Violações são logadas e contadas, não rejeitadas.
+    """
+    method = scope.get("method", "WS")
+    route = route_template(scope)
+    for kind in STORE_USAGE_KINDS:
+        metrics.inc(f"store_{kind}_total", getattr(usage, kind), method=method, route=route)
+
+    if budgets is None:
+        budgets = get_settings().store_budgets
+    budget = budgets.get(f"{method} {route}")
+    if not budget:
+        return
+    for kind, limit in budget.items():
+        value = getattr(usage, kind, None)
+        if value is not None and value > limit:
+            logger.warning(
+                "Orçamento de store excedido em %s %s: %s=%d (limite %d)", method, route, kind, value, limit
+            )
+            metrics.inc("store_budget_violations_total", method=method, route=route, kind=kind)
@@ -4,6 +4,14 @@ Kept for compatibility with existing imports.
 """
 from __future__ import annotations
 
+from contextlib import contextmanager
+from typing import Iterator
+
+from .data.base import MAX_COMMIT_WRITES, CommitTooLarge
+
+# Limite de operações por WriteBatch do Firestore
+MAX_BATCH_WRITES = MAX_COMMIT_WRITES
+
 
 def initialize_firebase():
     """Stub function - Firebase not used anymore"""
@@ -18,3 +26,50 @@ def get_firestore_client():
 def get_storage_bucket():
     """Stub function - Use Supabase storage instead"""
     raise NotImplementedError("Use Supabase storage instead of Firebase storage")
+
+
+class BatchWriter:
+    """
+    Acumula escritas e as envia em um único WriteBatch atômico (um round
+    trip). Nunca divide: a operação além de `max_ops` levanta CommitTooLarge,
+    como check_commit_size, e o bloco sai sem gravar nada.
+    """
+
+    def __init__(self, db, max_ops: int = MAX_BATCH_WRITES):
+        self.db = db
+        self.max_ops = max_ops
+        self.commits = 0
+        self._batch = db.batch()
+        self._pending = 0
+
+    def set(self, ref, data: dict, merge: bool = False) -> None:
+        self._batch.set(ref, data, merge=merge)
+        self._count()
+
+    def update(self, ref, data: dict) -> None:
+        self._batch.update(ref, data)
+        self._count()
+
+    def delete(self, ref) -> None:
+        self._batch.delete(ref)
+        self._count()
+
+    def commit(self) -> None:
+        if self._pending:
+            self._batch.commit()
+            self.commits += 1
+            self._batch = self.db.batch()
+            self._pending = 0
+
+    def _count(self) -> None:
+        self._pending += 1
+        if self._pending > self.max_ops:
+            raise CommitTooLarge(f"more than {self.max_ops} writes in one batch")
+
+
+@contextmanager
+def batched_writes(db, max_ops: int = MAX_BATCH_WRITES) -> Iterator[BatchWriter]:
+    """Agrupa as escritas do bloco; faz commit ao sair sem exceção."""
+    writer = BatchWriter(db, max_ops)
+    yield writer
+    writer.commit()
@@ -1,19 +1,57 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from .routes import alerts, health, items, staff, threads, uploads
+from .middleware import ProfilingMiddleware, TimingMiddleware
+from .routes import LazyRouterMiddleware, RouterLoader
+from .services.item_cache import get_item_cache
+from .services.pubsub import get_hub
+from .services.stats import get_stats, register_app_stats
+from .services.warmup import WarmupState, resolve, warm_up
+from .settings import get_settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Inicia o broadcast já no boot: invalidações de cache de outros
+    # workers chegam mesmo antes do primeiro WebSocket
+    hub = resolve(app, get_hub)
+    resolve(app, get_item_cache)
+    await hub.start()
+
+    # Warmup em segundo plano: o worker já atende enquanto aquece
+    app.state.warmup = WarmupState()
+    register_app_stats(app, resolve(app, get_stats))
+    task = None
+    if get_settings().warmup:
+        task = asyncio.create_task(warm_up(app, app.state.warmup))
+    else:
+        app.state.warmup.status = "disabled"
+    try:
+        yield
+    finally:
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await hub.stop()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Lost & Found API", version="0.1.0")
-
-    app.include_router(health.router)
-    app.include_router(items.router, prefix="/items", tags=["items"])
-    app.include_router(uploads.router, prefix="/uploads", tags=["uploads"])
-    app.include_router(threads.router, prefix="/threads", tags=["threads"])
-    app.include_router(alerts.router, prefix="/alerts", tags=["alerts"])
-    app.include_router(staff.router, prefix="/staff", tags=["staff"])
+    app = FastAPI(title="Lost & Found API", version="0.1.0", lifespan=lifespan)
+    app.add_middleware(LazyRouterMiddleware)
+    app.add_middleware(TimingMiddleware)
+    # Adicionado por último = mais externo: o perfil cobre a requisição toda
+    app.add_middleware(ProfilingMiddleware)
+
+    # Routers são importados na primeira requisição sob o prefixo
+    app.state.routers = RouterLoader(app)
+    if not get_settings().lazy_routers:
+        app.state.routers.load_all()
 
     return app
 
@@ -0,0 +1,8 @@
+from .profiling import ProfilingMiddleware
+from .timing import TimingMiddleware, route_template
+
+__all__ = [
+    "ProfilingMiddleware",
+    "TimingMiddleware",
+    "route_template",
+]
@@ -0,0 +1,91 @@
+"""
+Middleware ASGI de perfis sob demanda.
+
+Perfila a requisição quando ela traz `X-Profile: <token de staff>` ou cai na
+amostragem (`profile_sample_rate`). A autenticação do app é uma dependency,
+invisível ao middleware, então o cabeçalho carrega o token configurado em
+`profile_token`; os perfis são lidos nas rotas de staff.
+
+Requisições não perfiladas pagam só a leitura do cabeçalho.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime
+
+import anyio
+
+from ..services.profiling import Profile, Profiler, StackSampler, get_profiler
+from .timing import route_template
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+
+def _profiler(scope) -> Profiler:
+    app = scope.get("app")
+    overrides = getattr(app, "dependency_overrides", None) or {}
+    return overrides.get(get_profiler, get_profiler)()
+
+
+def _header(scope, name: bytes):
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profiler = _profiler(scope)
+        reason = profiler.reason_for(_header(scope, PROFILE_HEADER))
+        if reason is None or not profiler.acquire():
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = profiler.new_id()
+        status = 500
+
+        async def tagging_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if reason == "header":
+                    headers = list(message.get("headers", ())) + [(PROFILE_ID_HEADER, profile_id.encode())]
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident(), profiler.interval)
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, tagging_send)
+        finally:
+            # O sampler termina o intervalo em curso antes de sair: o join
+            # roda numa thread para não parar o event loop
+            with anyio.CancelScope(shield=True):
+                stacks = await anyio.to_thread.run_sync(sampler.stop)
+            elapsed = time.perf_counter() - start
+            profiler.release()
+            profiler.record(Profile(
+                id=profile_id,
+                method=scope["method"],
+                path=scope["path"],
+                route=route_template(scope),
+                status=status,
+                reason=reason,
+                startedAt=started_at,
+                durationMs=round(elapsed * 1000, 3),
+                intervalMs=profiler.interval * 1000,
+                samples=sum(stacks.values()),
+                stacks=dict(stacks),
+            ))
@@ -0,0 +1,105 @@
+"""
+Middleware ASGI de tempos: histogramas de latência por rota e status,
+requisições em andamento e tamanhos de requisição/resposta.
+
+É ASGI puro (sem BaseHTTPMiddleware, que cria tasks e streams por
+requisição); o custo é envolver receive/send e algumas observações com lock.
+A rota é o template ("/items/{item_id}"), não o caminho: a cardinalidade dos
+labels fica limitada ao número de rotas.
+
+Em modo debug, a resposta leva o uso do store da requisição em cabeçalhos
+X-Store-* (leituras, escritas, queries, documentos das queries).
+"""
+from __future__ import annotations
+
+import time
+
+from ..services.metrics import SIZE_BUCKETS, MetricsRegistry, get_metrics
+from ..settings import get_settings
+
+# Requisições que não casaram com nenhuma rota (404 do roteador)
+UNMATCHED_ROUTE = "unmatched"
+
+# Chave do scope com o StoreUsage da requisição (gravada pelo repositório)
+STORE_USAGE_SCOPE_KEY = "store_usage"
+
+STORE_USAGE_HEADERS = (
+    ("reads", b"x-store-reads"),
+    ("writes", b"x-store-writes"),
+    ("queries", b"x-store-queries"),
+    ("docs_streamed", b"x-store-docs-streamed"),
+    ("round_trips", b"x-store-round-trips"),
+)
+
+
+def route_template(scope) -> str:
+    """Template da rota casada ("/items/{item_id}"), com o prefixo do router."""
+    # Versões do FastAPI que não copiam as rotas incluídas guardam a rota
+    # efetiva (com prefixo) à parte; nas demais, scope["route"] já a tem
+    route = scope.get("fastapi", {}).get("effective_route_context") or scope.get("route")
+    return getattr(route, "path_format", None) or UNMATCHED_ROUTE
+
+
+def store_usage_headers(scope):
+    """Cabeçalhos X-Store-* com o uso do store até agora (vazio sem store)."""
+    usage = scope.get(STORE_USAGE_SCOPE_KEY)
+    if usage is None:
+        return []
+    return [(header, str(getattr(usage, kind)).encode()) for kind, header in STORE_USAGE_HEADERS]
+
+
+def _registry(scope) -> MetricsRegistry:
+    # Resolvido por requisição para respeitar dependency_overrides (testes)
+    app = scope.get("app")
+    overrides = getattr(app, "dependency_overrides", None) or {}
+    return overrides.get(get_metrics, get_metrics)()
+
+
+class TimingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = _registry(scope)
+        debug = get_settings().debug
+        method = scope["method"]
+        status = 500
+        request_bytes = 0
+        response_bytes = 0
+
+        async def counting_receive():
+            nonlocal request_bytes
+            message = await receive()
+            request_bytes += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if debug:
+                    extra = store_usage_headers(scope)
+                    if extra:
+                        message = {**message, "headers": list(message.get("headers", ())) + extra}
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        metrics.add_gauge("http_requests_in_flight", 1, method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.add_gauge("http_requests_in_flight", -1, method=method)
+            # O roteador grava a rota casada no próprio scope
+            route = route_template(scope)
+            metrics.observe(
+                "http_request_duration_seconds", elapsed, method=method, route=route, status=str(status)
+            )
+            metrics.observe("http_request_size_bytes", request_bytes, SIZE_BUCKETS, method=method, route=route)
+            metrics.observe("http_response_size_bytes", response_bytes, SIZE_BUCKETS, method=method, route=route)
@@ -1,19 +1,45 @@
-from .items import Item, ItemCreate, ItemUpdate, ItemType, ItemStatus
-from .users import User, UserRole
-from .threads import Thread, Message, MessageCreate
+from .items import (
+    Item,
+    ItemCreate,
+    ItemUpdate,
+    ItemType,
+    ItemStatus,
+    ItemBatchCreate,
+    ItemBatchResponse,
+    ItemBatchResult,
+    ITEM_CARD_FIELDS,
+    ITEM_SEARCH_FIELDS,
+)
+from .threads import Thread, Message, MessageCreate, InboxEntry, MarkReadRequest
 from .alerts import Alert, AlertCreate, AlertUpdate
 
+
+def __getattr__(name):
+    # users puxa EmailStr (email_validator + dnspython); só carrega quando usado
+    if name in ("User", "UserRole"):
+        from . import users
+        return getattr(users, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "Item",
     "ItemCreate",
     "ItemUpdate",
     "ItemType",
     "ItemStatus",
+    "ItemBatchCreate",
+    "ItemBatchResponse",
+    "ItemBatchResult",
+    "ITEM_CARD_FIELDS",
+    "ITEM_SEARCH_FIELDS",
     "User",
     "UserRole",
     "Thread",
     "Message",
     "MessageCreate",
+    "InboxEntry",
+    "MarkReadRequest",
     "Alert",
     "AlertCreate",
     "AlertUpdate",
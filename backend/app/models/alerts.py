@@ -15,6 +15,7 @@ class Alert(BaseModel):
     radiusKm: Optional[float] = None
     active: bool = True
     createdAt: datetime = Field(default_factory=datetime.utcnow)
+    version: int = 1
 
 
 class AlertCreate(BaseModel):
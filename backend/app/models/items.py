@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -67,11 +67,23 @@ class Item(BaseModel):
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
     moderation: Optional[dict] = None
+    version: int = 1
 
     class Config:
         use_enum_values = True
 
 
+# Campos internos da busca textual: nunca vão para listagens por padrão
+ITEM_SEARCH_FIELDS = ("title_n", "desc_n", "tags_n", "ngrams")
+
+# Projeção "card" das listagens: o que um cartão de resultado exibe
+ITEM_CARD_FIELDS = (
+    "id", "ownerUid", "type", "title", "description", "category", "tags",
+    "campusId", "campusName", "buildingId", "buildingName", "spot",
+    "photos", "status", "createdAt", "updatedAt", "version",
+)
+
+
 class ItemCreate(BaseModel):
     type: ItemType
     title: str
@@ -96,3 +108,21 @@ class ItemUpdate(BaseModel):
     photos: Optional[List[Photo]] = None
     status: Optional[ItemStatus] = None
     resolvedReason: Optional[str] = None
+
+
+class ItemBatchCreate(BaseModel):
+    # Payloads validados um a um: um item inválido não derruba o lote
+    items: List[Dict[str, Any]] = Field(min_length=1)
+
+
+class ItemBatchResult(BaseModel):
+    index: int
+    status: int
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class ItemBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[ItemBatchResult]
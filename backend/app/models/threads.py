@@ -26,3 +26,16 @@ class Thread(BaseModel):
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
     lastMessage: Optional[str] = None
+
+
+class InboxEntry(BaseModel):
+    threadId: str
+    itemId: Optional[str] = None
+    lastMessage: Optional[str] = None
+    lastSenderUid: Optional[str] = None
+    updatedAt: datetime = Field(default_factory=datetime.utcnow)
+    unread: int = 0
+
+
+class MarkReadRequest(BaseModel):
+    threadIds: List[str] = Field(default_factory=list, max_length=100)
@@ -1,14 +1,27 @@
-from .alerts import router as alerts_router
-from .health import router as health_router
-from .items import router as items_router
-from .staff import router as staff_router
-from .threads import router as threads_router
-from .uploads import router as uploads_router
+import importlib
+
+from .loader import ROUTERS, LazyRouter, LazyRouterMiddleware, RouterLoader
+
+# Os routers são importados só quando pedidos (ver loader.py)
+_ROUTER_MODULES = {f"{router.module}_router": router.module for router in ROUTERS}
+
+
+def __getattr__(name):
+    module = _ROUTER_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return importlib.import_module(f".{module}", __name__).router
+
 
 __all__ = [
+    "ROUTERS",
+    "LazyRouter",
+    "LazyRouterMiddleware",
+    "RouterLoader",
     "alerts_router",
     "health_router",
     "items_router",
+    "metrics_router",
     "staff_router",
     "threads_router",
     "uploads_router",
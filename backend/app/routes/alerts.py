@@ -1,24 +1,29 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 
 from ..dependencies.auth import AuthenticatedUser, get_current_user
-from ..firebase import get_firestore_client
+from ..dependencies.rate_limit import rate_limit
+from ..dependencies.repository import get_request_repository
+from ..data import PreconditionFailed, Repository
 from ..models.alerts import Alert, AlertCreate, AlertUpdate
+from ..utils import FastJSONResponse, format_etag, model_shaper, parse_if_match
 
 router = APIRouter()
 
+_shape_alert = model_shaper(Alert)
 
-@router.post("", response_model=Alert, status_code=status.HTTP_201_CREATED)
+
+@router.post("", response_model=Alert, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(rate_limit("alerts"))])
 async def create_alert(
     alert_data: AlertCreate,
-    user: AuthenticatedUser = Depends(get_current_user)
+    user: AuthenticatedUser = Depends(get_current_user),
+    repo: Repository = Depends(get_request_repository)
 ):
     """Cria um alerta de notificação para novos itens."""
-    db = get_firestore_client()
-    
     alert = Alert(
         uid=user.uid,
         queryText=alert_data.queryText,
@@ -27,76 +32,76 @@ async def create_alert(
         radiusKm=alert_data.radiusKm
     )
     
-    doc_ref = db.collection("alerts").document()
-    alert.id = doc_ref.id
-    doc_ref.set(alert.dict(exclude_none=True))
+    alert.id = repo.alerts.new_id()
+    await repo.alerts.create(alert.id, alert.dict(exclude_none=True))
     
     return alert
 
 
 @router.get("", response_model=List[Alert])
 async def list_alerts(
-    user: AuthenticatedUser = Depends(get_current_user)
+    user: AuthenticatedUser = Depends(get_current_user),
+    repo: Repository = Depends(get_request_repository)
 ):
     """Lista alertas do usuário."""
-    db = get_firestore_client()
-    
-    query = db.collection("alerts").where("uid", "==", user.uid)
-    docs = query.stream()
-    
-    alerts = []
-    for doc in docs:
-        alert_dict = doc.to_dict()
-        alert_dict["id"] = doc.id
-        alerts.append(Alert(**alert_dict))
+    docs = await repo.alerts.list_for_user(user.uid)
     
-    return alerts
+    return FastJSONResponse([_shape_alert(alert_dict) for alert_dict in docs])
 
 
 @router.patch("/{alert_id}", response_model=Alert)
 async def update_alert(
     alert_id: str,
     update_data: AlertUpdate,
-    user: AuthenticatedUser = Depends(get_current_user)
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    user: AuthenticatedUser = Depends(get_current_user),
+    repo: Repository = Depends(get_request_repository)
 ):
-    """Atualiza um alerta existente."""
-    db = get_firestore_client()
-    doc_ref = db.collection("alerts").document(alert_id)
-    doc = doc_ref.get()
+    """Atualiza um alerta existente (condicional à versão, como itens)."""
+    try:
+        expected_version = parse_if_match(if_match)
+    except ValueError:
+        raise HTTPException(status_code=412, detail="Precondition failed")
     
-    if not doc.exists:
+    alert_data = await repo.alerts.get(alert_id)
+    
+    if alert_data is None:
         raise HTTPException(status_code=404, detail="Alert not found")
     
-    alert_data = doc.to_dict()
     if alert_data["uid"] != user.uid:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    update_dict = update_data.dict(exclude_none=True)
-    doc_ref.update(update_dict)
+    stored_version = alert_data.get("version")
+    current_version = stored_version or 1
+    if expected_version is not None and current_version != expected_version:
+        raise HTTPException(status_code=412, detail="Alert was modified by another request")
     
-    updated_doc = doc_ref.get()
-    updated_dict = updated_doc.to_dict()
-    updated_dict["id"] = updated_doc.id
+    update_dict = update_data.dict(exclude_none=True)
+    update_dict["version"] = current_version + 1
+    try:
+        await repo.alerts.update(alert_id, update_dict, precondition={"version": stored_version})
+    except PreconditionFailed:
+        raise HTTPException(status_code=412, detail="Alert was modified by another request")
     
-    return Alert(**updated_dict)
+    response.headers["ETag"] = format_etag(update_dict["version"])
+    return Alert(**{**alert_data, **update_dict})
 
 
 @router.delete("/{alert_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_alert(
     alert_id: str,
-    user: AuthenticatedUser = Depends(get_current_user)
+    user: AuthenticatedUser = Depends(get_current_user),
+    repo: Repository = Depends(get_request_repository)
 ):
     """Deleta um alerta."""
-    db = get_firestore_client()
-    doc_ref = db.collection("alerts").document(alert_id)
-    doc = doc_ref.get()
+    alert_data = await repo.alerts.get(alert_id)
     
-    if not doc.exists:
+    if alert_data is None:
         raise HTTPException(status_code=404, detail="Alert not found")
     
-    alert_data = doc.to_dict()
     if alert_data["uid"] != user.uid:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    doc_ref.delete()
+    await repo.alerts.delete(alert_id)
     return None
@@ -1,4 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Response, status
+
+from ..services.stats import StatsRegistry, get_stats
 
 router = APIRouter()
 
@@ -7,3 +9,20 @@ router = APIRouter()
 async def health_check():
     """Health check endpoint"""
     return {"status": "ok", "service": "lost-and-found-api"}
+
+
+@router.get("/ready")
+async def readiness_check(response: Response, stats: StatsRegistry = Depends(get_stats)):
+    """
+    Readiness para o balanceador: 503 enquanto o worker aquece (warmup em
+    curso ou caches abaixo do mínimo), 200 depois. Traz as estatísticas de
+    cada subsistema e, quando não pronto, o motivo de cada checagem.
+    """
+    readiness = await stats.readiness()
+    if not readiness.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {
+        "status": "ready" if readiness.ready else "warming",
+        "failing": readiness.failing,
+        "subsystems": readiness.stats,
+    }
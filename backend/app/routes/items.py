@@ -1,136 +1,189 @@
 from __future__ import annotations
 
+import logging
+import time
 from datetime import datetime
-from typing import List, Optional
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from pydantic import ValidationError
 
-from ..dependencies.auth import AuthenticatedUser, get_current_user
-from ..firebase import get_firestore_client
-from ..models.items import Item, ItemCreate, ItemUpdate, ItemStatus
-from ..utils import normalize_text, generate_ngrams, encode_geohash, calculate_search_score
+from ..dependencies.auth import AuthenticatedUser, get_current_user, get_staff_user
+from ..dependencies.rate_limit import rate_limit
+from ..dependencies.repository import get_request_repository
+from ..data import PartialCommit, PreconditionFailed, Repository
+from ..models.items import ITEM_CARD_FIELDS, ITEM_SEARCH_FIELDS, Item, ItemCreate, ItemUpdate, ItemStatus
+from ..models.items import ItemBatchCreate, ItemBatchResponse, ItemBatchResult
+from ..services.item_cache import ItemCache, get_item_cache
+from ..settings import get_settings
+from ..utils import normalize_text, generate_ngrams, encode_geohash, rank_items
+from ..utils import FastJSONResponse, digest_etag, etag_matches, format_etag, model_shaper, parse_if_match
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_shape_item = model_shaper(Item)
+
 
-@router.post("", response_model=Item, status_code=status.HTTP_201_CREATED)
+@router.post("", response_model=Item, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(rate_limit("items"))])
 async def create_item(
     item_data: ItemCreate,
-    user: AuthenticatedUser = Depends(get_current_user)
+    user: AuthenticatedUser = Depends(get_current_user),
+    cache: ItemCache = Depends(get_item_cache),
+    repo: Repository = Depends(get_request_repository)
 ):
     """
     Cria um novo item (FOUND ou LOST).
     Gera automaticamente campos normalizados, n-grams e geohash.
     """
-    db = get_firestore_client()
+    item = _build_item(item_data, user.uid)
     
-    # Normalização
-    title_n = normalize_text(item_data.title)
-    desc_n = normalize_text(item_data.description)
-    tags_n = [normalize_text(tag) for tag in item_data.tags]
+    # Salva no store
+    item.id = repo.items.new_id()
+    item_dict = item.dict(exclude_none=True)
+    await repo.items.create(item.id, item_dict)
     
-    # N-grams (trigramas do título + tags)
-    ngrams = generate_ngrams(item_data.title)
-    for tag in item_data.tags:
-        ngrams.extend(generate_ngrams(tag))
-    ngrams = list(set(ngrams))  # Remove duplicatas
+    # Aquece o detalhe e avança a marca d'água das listas
+    cache.put(item.id, item_dict)
     
-    # Geohash (se houver geo)
-    if item_data.geo:
-        item_data.geo.geohash = encode_geohash(item_data.geo.lat, item_data.geo.lng)
+    return item
+
+
+@router.post("/batch", response_model=ItemBatchResponse)
+async def create_items_batch(
+    batch: ItemBatchCreate,
+    user: AuthenticatedUser = Depends(get_staff_user),
+    cache: ItemCache = Depends(get_item_cache),
+    repo: Repository = Depends(get_request_repository)
+):
+    """
+    Cadastro em lote no balcão (apenas staff).
+    Normalização, trigramas e geohash são memoizados dentro do lote, a
+    gravação sai em commits de lote e o cache é atualizado uma vez.
+    Cada item tem seu próprio resultado: inválidos não impedem os demais.
+    """
+    max_size = get_settings().item_batch_max_size
+    if len(batch.items) > max_size:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {max_size} items")
     
-    # Monta o item
-    item = Item(
-        ownerUid=user.uid,
-        type=item_data.type,
-        title=item_data.title,
-        description=item_data.description,
-        category=item_data.category,
-        tags=item_data.tags,
-        campusId=item_data.campusId,
-        buildingId=item_data.buildingId,
-        spot=item_data.spot,
-        geo=item_data.geo,
-        photos=item_data.photos,
-        title_n=title_n,
-        desc_n=desc_n,
-        tags_n=tags_n,
-        ngrams=ngrams,
-    )
+    # Memos válidos só para este lote (tags e prédios se repetem muito)
+    normalize = lru_cache(maxsize=None)(normalize_text)
+    trigrams = lru_cache(maxsize=None)(generate_ngrams)
+    geohash = lru_cache(maxsize=None)(encode_geohash)
     
-    # Salva no Firestore
-    doc_ref = db.collection("items").document()
-    item.id = doc_ref.id
-    doc_ref.set(item.dict(exclude_none=True))
+    results: List[ItemBatchResult] = []
+    docs = {}
+    for index, payload in enumerate(batch.items):
+        try:
+            item_data = ItemCreate(**payload)
+        except ValidationError as exc:
+            results.append(ItemBatchResult(index=index, status=422, error=_validation_message(exc)))
+            continue
+        item = _build_item(item_data, user.uid, normalize, trigrams, geohash)
+        item.id = repo.items.new_id()
+        docs[item.id] = item.dict(exclude_none=True)
+        results.append(ItemBatchResult(index=index, status=201, id=item.id))
     
-    return item
+    if docs:
+        # Lotes acima de um commit são gravados em partes: uma falha no meio
+        # só marca como falhos os itens que não chegaram a ser gravados
+        committed = set(docs)
+        try:
+            await repo.items.create_many(docs)
+        except PartialCommit as exc:
+            logger.exception("Batch item write failed after %d items", len(exc.committed))
+            committed = set(exc.committed)
+        except Exception:
+            logger.exception("Batch item write failed")
+            committed = set()
+        for result in results:
+            if result.status == 201 and result.id not in committed:
+                result.status, result.id, result.error = 503, None, "Write failed"
+        cache.put_many({item_id: doc for item_id, doc in docs.items() if item_id in committed})
+    
+    created = sum(1 for result in results if result.status == 201)
+    return ItemBatchResponse(created=created, failed=len(results) - created, results=results)
 
 
-@router.get("", response_model=List[Item])
+@router.get("", response_model=None, responses={
+    200: {"model": List[Item], "description": "Items (cards by default; only the requested fields with fields=)"},
+})
 async def list_items(
+    request: Request,
     status_filter: Optional[ItemStatus] = Query(None, alias="status"),
     campus_id: Optional[str] = Query(None, alias="campusId"),
     building_id: Optional[str] = Query(None, alias="buildingId"),
     q: Optional[str] = Query(None, description="Query de busca"),
     limit: int = Query(20, ge=1, le=100),
-    user: AuthenticatedUser = Depends(get_current_user)
+    fields: str = Query("card", description='"card", "full" ou lista de campos separados por vírgula'),
+    if_none_match: Optional[str] = Header(None),
+    user: AuthenticatedUser = Depends(get_current_user),
+    cache: ItemCache = Depends(get_item_cache),
+    repo: Repository = Depends(get_request_repository)
 ):
     """
     Lista itens com filtros opcionais e busca por texto.
+    A ETag deriva da marca d'água da coleção: feeds inalterados
+    recebem 304 sem consultar o store.
+    Por padrão devolve cards (sem os campos internos de busca); a projeção
+    é feita no store. Os documentos saem direto para o orjson, sem
+    revalidação: o formato do Item é garantido na escrita.
     """
-    db = get_firestore_client()
-    query = db.collection("items")
-    
-    # Filtros básicos
-    if status_filter:
-        query = query.where("status", "==", status_filter.value)
-    if campus_id:
-        query = query.where("campusId", "==", campus_id)
-    if building_id:
-        query = query.where("buildingId", "==", building_id)
+    selected = _parse_fields(fields)
+    etag = _list_etag(cache, request)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
     
-    # Ordenação
-    query = query.order_by("createdAt", direction="DESCENDING").limit(limit)
+    # O ranking precisa dos campos de busca mesmo quando a resposta não os leva
+    fetched = selected
+    if q and selected is not None:
+        fetched = tuple(dict.fromkeys(selected + ITEM_SEARCH_FIELDS + ("campusId", "createdAt")))
     
-    docs = query.stream()
-    items = []
-    
-    for doc in docs:
-        item_dict = doc.to_dict()
-        item_dict["id"] = doc.id
-        items.append(item_dict)
+    # Filtros básicos, mais recentes primeiro
+    items = await repo.items.query(
+        status=status_filter.value if status_filter else None,
+        campus_id=campus_id,
+        building_id=building_id,
+        limit=limit,
+        fields=fetched,
+    )
     
     # Se houver busca textual, aplica ranking
     if q:
-        query_ngrams = set(generate_ngrams(q))
-        scored_items = []
-        
-        for item in items:
-            score = calculate_search_score(item, query_ngrams)
-            if score > 0:
-                scored_items.append((score, item))
-        
-        # Ordena por score decrescente
-        scored_items.sort(key=lambda x: x[0], reverse=True)
-        items = [item for _, item in scored_items]
+        items = rank_items(items, q)
     
-    return [Item(**item) for item in items]
+    if selected is None:
+        items = [_shape_item(item) for item in items]
+    elif fetched != selected:
+        items = [{key: item[key] for key in selected if key in item} for item in items]
+    return FastJSONResponse(items, headers={"ETag": etag})
 
 
 @router.get("/{item_id}", response_model=Item)
 async def get_item(
     item_id: str,
-    user: AuthenticatedUser = Depends(get_current_user)
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    user: AuthenticatedUser = Depends(get_current_user),
+    cache: ItemCache = Depends(get_item_cache),
+    repo: Repository = Depends(get_request_repository)
 ):
-    """Retorna detalhes de um item específico."""
-    db = get_firestore_client()
-    doc = db.collection("items").document(item_id).get()
+    """
+    Retorna detalhes de um item específico (read-through no cache de itens).
+    ETag forte pela versão do item; itens em cache respondem 304 sem store.
+    """
+    item_dict = await cache.get_or_load(item_id, lambda: repo.items.get(item_id))
     
-    if not doc.exists:
+    if item_dict is None:
         raise HTTPException(status_code=404, detail="Item not found")
     
-    item_dict = doc.to_dict()
-    item_dict["id"] = doc.id
+    etag = format_etag(item_dict.get("version") or 1)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     
     return Item(**item_dict)
 
@@ -139,24 +192,22 @@ async def get_item(
 async def update_item(
     item_id: str,
     update_data: ItemUpdate,
-    user: AuthenticatedUser = Depends(get_current_user)
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    user: AuthenticatedUser = Depends(get_current_user),
+    cache: ItemCache = Depends(get_item_cache),
+    repo: Repository = Depends(get_request_repository)
 ):
     """
     Atualiza um item existente.
     Apenas o dono pode editar (exceto staff).
+    Escrita condicional à versão lida (If-Match opcional): edições
+    concorrentes recebem 412 em vez de se sobrescreverem.
     """
-    db = get_firestore_client()
-    doc_ref = db.collection("items").document(item_id)
-    doc = doc_ref.get()
-    
-    if not doc.exists:
-        raise HTTPException(status_code=404, detail="Item not found")
-    
-    item_dict = doc.to_dict()
-    
-    # Verifica permissão
-    if item_dict["ownerUid"] != user.uid and user.role not in ["staff", "admin"]:
-        raise HTTPException(status_code=403, detail="Not authorized to edit this item")
+    try:
+        expected_version = parse_if_match(if_match)
+    except ValueError:
+        raise HTTPException(status_code=412, detail="Precondition failed")
     
     # Prepara update
     update_dict = update_data.dict(exclude_none=True)
@@ -175,11 +226,103 @@ async def update_item(
     
     update_dict["updatedAt"] = datetime.utcnow()
     
-    doc_ref.update(update_dict)
+    # Primeira tentativa a partir do cache; se ele estiver defasado
+    # (escrita feita por outra instância), relê do store uma vez
+    item_dict = await cache.get_or_load(item_id, lambda: repo.items.get(item_id))
+    for fresh in (False, True):
+        if item_dict is None:
+            raise HTTPException(status_code=404, detail="Item not found")
+        
+        # Verifica permissão
+        if item_dict["ownerUid"] != user.uid and user.role not in ["staff", "admin"]:
+            raise HTTPException(status_code=403, detail="Not authorized to edit this item")
+        
+        stored_version = item_dict.get("version")
+        current_version = stored_version or 1
+        if expected_version is None or current_version == expected_version:
+            update_dict["version"] = current_version + 1
+            try:
+                await repo.items.update(
+                    item_id, update_dict, precondition={"version": stored_version}, current=item_dict
+                )
+                break
+            except PreconditionFailed:
+                pass
+        
+        cache.invalidate(item_id)
+        if fresh:
+            raise HTTPException(status_code=412, detail="Item was modified by another request")
+        item_dict = await repo.items.get(item_id)
     
-    # Retorna item atualizado
-    updated_doc = doc_ref.get()
-    updated_dict = updated_doc.to_dict()
-    updated_dict["id"] = updated_doc.id
+    # Documento resultante montado localmente, sem reler do store
+    updated_dict = {**item_dict, **update_dict}
+    cache.put(item_id, updated_dict)
+    response.headers["ETag"] = format_etag(updated_dict["version"])
     
     return Item(**updated_dict)
+
+
+def _build_item(
+    item_data: ItemCreate,
+    owner_uid: str,
+    normalize: Callable[[str], str] = normalize_text,
+    trigrams: Callable[[str], List[str]] = generate_ngrams,
+    geohash: Callable[[float, float], str] = encode_geohash,
+) -> Item:
+    """Monta o Item com campos normalizados, n-grams e geohash."""
+    # N-grams (trigramas do título + tags), sem duplicatas
+    ngrams = set(trigrams(item_data.title))
+    for tag in item_data.tags:
+        ngrams.update(trigrams(tag))
+    
+    # Geohash (se houver geo)
+    if item_data.geo:
+        item_data.geo.geohash = geohash(item_data.geo.lat, item_data.geo.lng)
+    
+    return Item(
+        ownerUid=owner_uid,
+        type=item_data.type,
+        title=item_data.title,
+        description=item_data.description,
+        category=item_data.category,
+        tags=item_data.tags,
+        campusId=item_data.campusId,
+        buildingId=item_data.buildingId,
+        spot=item_data.spot,
+        geo=item_data.geo,
+        photos=item_data.photos,
+        title_n=normalize(item_data.title),
+        desc_n=normalize(item_data.description),
+        tags_n=[normalize(tag) for tag in item_data.tags],
+        ngrams=list(ngrams),
+    )
+
+
+def _validation_message(exc: ValidationError) -> str:
+    error = exc.errors()[0]
+    location = ".".join(str(part) for part in error["loc"])
+    return f"{location}: {error['msg']}" if location else error["msg"]
+
+
+def _parse_fields(fields: str) -> Optional[Sequence[str]]:
+    """Campos pedidos em ?fields= ("id" sempre incluso); None = Item completo."""
+    if fields == "full":
+        return None
+    if fields == "card":
+        return ITEM_CARD_FIELDS
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = sorted(set(names) - set(Item.model_fields))
+    if not names or unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown) or fields!r}")
+    return ("id",) + tuple(name for name in names if name != "id")
+
+
+def _list_etag(cache: ItemCache, request: Request) -> str:
+    """
+    ETag de uma página da lista: marca d'água do processo + parâmetros.
+    A janela do TTL do cache limita por quanto tempo uma escrita de outro
+    worker, sem broadcast, pode passar despercebida.
+    """
+    window = int(time.time() // cache.ttl) if cache.ttl else 0
+    params = sorted(request.query_params.multi_items())
+    return digest_etag(["items", cache.origin, cache.high_water, window, params])
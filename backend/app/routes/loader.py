@@ -0,0 +1,92 @@
+"""
+Montagem preguiçosa dos routers.
+
+Importar um router puxa modelos pydantic, serviços e utils; num cold start
+(escala a zero) esse custo vinha todo antes da primeira resposta. Com o
+loader, create_app() só registra a tabela abaixo e cada router é importado
+e incluído na primeira requisição sob o seu prefixo (ou pelo warmup).
+Documentação/OpenAPI carregam todos.
+"""
+from __future__ import annotations
+
+import importlib
+import threading
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+from fastapi import FastAPI
+
+
+@dataclass(frozen=True)
+class LazyRouter:
+    module: str  # módulo em app.routes
+    prefix: str = ""
+    tags: Tuple[str, ...] = ()
+    # Caminhos que disparam o carregamento (padrão: o prefixo)
+    paths: Tuple[str, ...] = ()
+
+    def matches(self, path: str) -> bool:
+        return any(path == base or path.startswith(base.rstrip("/") + "/") for base in self.paths or (self.prefix,))
+
+
+ROUTERS: Tuple[LazyRouter, ...] = (
+    LazyRouter("health", paths=("/health", "/ready")),
+    LazyRouter("metrics", paths=("/metrics",)),
+    LazyRouter("items", "/items", ("items",)),
+    LazyRouter("uploads", "/uploads", ("uploads",)),
+    LazyRouter("threads", "/threads", ("threads",)),
+    LazyRouter("alerts", "/alerts", ("alerts",)),
+    LazyRouter("staff", "/staff", ("staff",)),
+)
+
+
+class RouterLoader:
+    def __init__(self, app: FastAPI, routers: Iterable[LazyRouter] = ROUTERS):
+        self.app = app
+        self.pending: List[LazyRouter] = list(routers)
+        self.loaded: List[str] = []
+        # Requisições síncronas rodam em threads; o include não pode duplicar
+        self._lock = threading.Lock()
+
+    @property
+    def complete(self) -> bool:
+        return not self.pending
+
+    def load_for_path(self, path: str) -> None:
+        if path in self._docs_paths():
+            self.load_all()
+            return
+        for router in self.pending:
+            if router.matches(path):
+                self._load([router])
+                return
+
+    def load_all(self) -> None:
+        self._load(self.pending)
+
+    def _load(self, routers: List[LazyRouter]) -> None:
+        with self._lock:
+            for router in [router for router in routers if router in self.pending]:
+                module = importlib.import_module(f"{__package__}.{router.module}")
+                self.app.include_router(module.router, prefix=router.prefix, tags=list(router.tags) or None)
+                self.pending.remove(router)
+                self.loaded.append(router.module)
+            # O schema em cache não conhece as rotas novas
+            self.app.openapi_schema = None
+
+    def _docs_paths(self) -> Tuple[Optional[str], ...]:
+        return (self.app.openapi_url, self.app.docs_url, self.app.redoc_url)
+
+
+class LazyRouterMiddleware:
+    """Carrega o router do prefixo antes de a requisição chegar ao roteamento."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            loader: Optional[RouterLoader] = getattr(scope["app"].state, "routers", None)
+            if loader is not None and not loader.complete:
+                loader.load_for_path(scope["path"])
+        await self.app(scope, receive, send)
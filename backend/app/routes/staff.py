@@ -1,13 +1,18 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
 
 from ..dependencies.auth import AuthenticatedUser, get_staff_user
-from ..firebase import get_firestore_client
-from ..models.items import ItemStatus
+from ..dependencies.repository import get_request_repository
+from ..data import PreconditionFailed, Repository
+from ..data.reports import ReportTotals, hour_of
+from ..data.rollups import GROUP_DIMENSIONS, GROUP_PERIODS, as_datetime
+from ..services.item_cache import ItemCache, get_item_cache
+from ..services.profiling import Profiler, get_profiler
 
 router = APIRouter()
 
@@ -16,28 +21,38 @@ router = APIRouter()
 async def receive_item_at_desk(
     item_id: str,
     notes: Optional[str] = None,
-    user: AuthenticatedUser = Depends(get_staff_user)
+    user: AuthenticatedUser = Depends(get_staff_user),
+    cache: ItemCache = Depends(get_item_cache),
+    repo: Repository = Depends(get_request_repository)
 ):
     """
     Registra recebimento físico de um item no balcão.
     Apenas staff pode executar.
     """
-    db = get_firestore_client()
-    doc_ref = db.collection("items").document(item_id)
-    doc = doc_ref.get()
-    
-    if not doc.exists:
-        raise HTTPException(status_code=404, detail="Item not found")
-    
-    # Atualiza item
-    doc_ref.update({
-        "moderation": {
-            "receivedAt": datetime.utcnow(),
-            "receivedBy": user.uid,
-            "notes": notes or ""
-        },
-        "updatedAt": datetime.utcnow()
-    })
+    # Atualiza item condicionado à versão lida (como update_item); uma
+    # escrita concorrente faz reler e tentar de novo uma única vez
+    for attempt in range(2):
+        item_dict = await repo.items.get(item_id)
+        if item_dict is None:
+            raise HTTPException(status_code=404, detail="Item not found")
+        
+        stored_version = item_dict.get("version")
+        try:
+            await repo.items.update(item_id, {
+                "moderation": {
+                    "receivedAt": datetime.utcnow(),
+                    "receivedBy": user.uid,
+                    "notes": notes or ""
+                },
+                "updatedAt": datetime.utcnow(),
+                "version": (stored_version or 1) + 1
+            }, precondition={"version": stored_version}, current=item_dict)
+            break
+        except PreconditionFailed:
+            cache.invalidate(item_id)
+    else:
+        raise HTTPException(status_code=409, detail="Item was modified by another request")
+    cache.invalidate(item_id)
     
     # Gera QR code URL (simplificado)
     qr_url = f"https://your-app.com/items/{item_id}"
@@ -49,50 +64,102 @@ async def receive_item_at_desk(
     }
 
 
+def _report_metrics(totals: ReportTotals) -> Dict[str, Any]:
+    return {
+        "total": totals.created,
+        "resolved": totals.resolved,
+        "resolutionRate": (totals.resolved / totals.created * 100) if totals.created > 0 else 0,
+        "avgResolutionHours": round(totals.avg_resolution_hours, 2)
+    }
+
+
 @router.get("/reports/daily")
 async def get_daily_report(
     campus_id: Optional[str] = Query(None, alias="campusId"),
-    user: AuthenticatedUser = Depends(get_staff_user)
+    user: AuthenticatedUser = Depends(get_staff_user),
+    repo: Repository = Depends(get_request_repository)
 ):
     """
     Relatório diário de itens para staff.
     Métricas: total, resolvidos, tempo médio de resolução.
+    Lê os agregados por hora mantidos na escrita (um bucket por hora,
+    campus, categoria e tipo), não os itens; a janela começa na hora cheia
+    de 24h atrás.
     """
-    db = get_firestore_client()
-    
-    # Busca itens das últimas 24h
-    from datetime import timedelta
-    yesterday = datetime.utcnow() - timedelta(days=1)
-    
-    query = db.collection("items").where("createdAt", ">=", yesterday)
-    
-    if campus_id:
-        query = query.where("campusId", "==", campus_id)
-    
-    docs = query.stream()
-    
-    total = 0
-    resolved = 0
-    resolution_times = []
-    
-    for doc in docs:
-        item = doc.to_dict()
-        total += 1
-        
-        if item.get("status") == ItemStatus.RESOLVED.value:
-            resolved += 1
-            
-            if item.get("resolvedAt") and item.get("createdAt"):
-                delta = item["resolvedAt"] - item["createdAt"]
-                resolution_times.append(delta.total_seconds() / 3600)  # horas
-    
-    avg_resolution_hours = sum(resolution_times) / len(resolution_times) if resolution_times else 0
+    since = hour_of(datetime.utcnow() - timedelta(days=1))
+    totals = ReportTotals.from_buckets(await repo.reports.hours(since, campus_id=campus_id))
     
     return {
         "period": "last_24h",
+        "since": since.isoformat(),
+        "campusId": campus_id,
+        **_report_metrics(totals)
+    }
+
+
+@router.get("/reports/range")
+async def get_range_report(
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    group_by: Optional[str] = Query(None, alias="groupBy"),
+    campus_id: Optional[str] = Query(None, alias="campusId"),
+    user: AuthenticatedUser = Depends(get_staff_user),
+    repo: Repository = Depends(get_request_repository)
+):
+    """
+    Relatório de itens criados entre `from` e `to` (dias inclusivos, UTC).
+    groupBy aceita, separados por vírgula, campus, category e type e no
+    máximo um período (day, week ou month). Responde dos rollups por mês e
+    por dia e das horas ainda não compactadas, nunca dos itens.
+    """
+    keys = [key.strip() for key in (group_by or "").split(",") if key.strip()]
+    unknown = [key for key in keys if key not in GROUP_DIMENSIONS and key not in GROUP_PERIODS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown groupBy keys: {', '.join(unknown)}")
+    if len([key for key in keys if key in GROUP_PERIODS]) > 1:
+        raise HTTPException(status_code=400, detail="groupBy accepts at most one period")
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+
+    start = as_datetime(from_date)
+    report = await repo.reports.range(start, start + timedelta(days=(to_date - from_date).days + 1), keys, campus_id)
+
+    return {
+        "from": from_date.isoformat(),
+        "to": to_date.isoformat(),
         "campusId": campus_id,
-        "total": total,
-        "resolved": resolved,
-        "resolutionRate": (resolved / total * 100) if total > 0 else 0,
-        "avgResolutionHours": round(avg_resolution_hours, 2)
+        "groupBy": report.key_names,
+        **_report_metrics(report.totals()),
+        "groups": [
+            {**dict(zip(report.key_names, key)), **_report_metrics(totals)}
+            for key, totals in report.result()
+        ]
     }
+
+
+@router.get("/profiles")
+async def list_profiles(
+    user: AuthenticatedUser = Depends(get_staff_user),
+    profiler: Profiler = Depends(get_profiler)
+):
+    """Perfis de requisição guardados (sem as pilhas), mais recentes primeiro."""
+    return [profile.summary() for profile in profiler.profiles()]
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: str = Query("json", pattern="^(json|folded)$"),
+    user: AuthenticatedUser = Depends(get_staff_user),
+    profiler: Profiler = Depends(get_profiler)
+):
+    """
+    Perfil completo. Com format=folded, devolve as pilhas no formato
+    "folded" (entrada de flamegraph.pl e speedscope).
+    """
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "folded":
+        return PlainTextResponse(profile.folded())
+    return {**profile.summary(), "stacks": profile.stacks}
@@ -1,82 +1,103 @@
 from __future__ import annotations
 
-from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, status
+from fastapi.encoders import jsonable_encoder
 
 from ..dependencies.auth import AuthenticatedUser, get_current_user
-from ..firebase import get_firestore_client
-from ..models.threads import Thread, Message, MessageCreate
+from ..dependencies.rate_limit import rate_limit
+from ..dependencies.repository import get_request_repository
+from ..data import PreconditionFailed, Repository
+from ..models.threads import InboxEntry, MarkReadRequest, Message, MessageCreate, Thread
+from ..services.pubsub import PubSubHub, get_hub
+from ..services.thread_cache import ThreadMembers, ThreadParticipantsCache, get_thread_cache
+from ..services.thread_index import ThreadLookupIndex, get_thread_index
+from ..utils import FastJSONResponse, model_shaper
 
 router = APIRouter()
 
+_shape_thread = model_shaper(Thread)
+_shape_message = model_shaper(Message)
+_shape_inbox_entry = model_shaper(InboxEntry)
+
 
 @router.post("/items/{item_id}/threads", response_model=Thread, status_code=status.HTTP_201_CREATED)
 async def create_thread(
     item_id: str,
-    user: AuthenticatedUser = Depends(get_current_user)
+    user: AuthenticatedUser = Depends(get_current_user),
+    cache: ThreadParticipantsCache = Depends(get_thread_cache),
+    index: ThreadLookupIndex = Depends(get_thread_index),
+    repo: Repository = Depends(get_request_repository)
 ):
     """
     Cria uma thread de chat para um item.
     Conecta o usuário atual com o dono do item.
+    Threads já abertas são respondidas pelo índice em memória.
     """
-    db = get_firestore_client()
-    
-    # Verifica se item existe
-    item_doc = db.collection("items").document(item_id).get()
-    if not item_doc.exists:
-        raise HTTPException(status_code=404, detail="Item not found")
-    
-    item_data = item_doc.to_dict()
-    owner_uid = item_data["ownerUid"]
+    # Dono do item (cacheado; também confirma que o item existe)
+    owner_uid = index.get_owner(item_id)
+    if owner_uid is None:
+        item_data = await repo.items.get(item_id)
+        if item_data is None:
+            raise HTTPException(status_code=404, detail="Item not found")
+        
+        owner_uid = item_data["ownerUid"]
+        index.put_owner(item_id, owner_uid)
     
     # Não permite criar thread consigo mesmo
     if owner_uid == user.uid:
         raise HTTPException(status_code=400, detail="Cannot create thread with yourself")
     
-    # Verifica se já existe thread
-    existing = db.collection("threads").where("itemId", "==", item_id).where(
-        "participants", "array_contains", user.uid
-    ).limit(1).stream()
-    
-    for doc in existing:
-        thread_dict = doc.to_dict()
-        thread_dict["id"] = doc.id
-        return Thread(**thread_dict)
-    
-    # Cria nova thread
-    thread = Thread(
-        itemId=item_id,
-        participants=[owner_uid, user.uid]
-    )
-    
-    doc_ref = db.collection("threads").document()
-    thread.id = doc_ref.id
-    doc_ref.set(thread.dict(exclude_none=True))
+    async with index.lock(item_id, user.uid):
+        thread = index.get_thread(item_id, user.uid)
+        if thread is not None:
+            return thread
+        
+        # Verifica se já existe thread
+        thread_dict = await repo.threads.find_for_item(item_id, user.uid)
+        if thread_dict is not None:
+            thread = Thread(**thread_dict)
+            cache.put(thread.id, item_id, thread.participants)
+            index.put_thread(user.uid, thread)
+            return thread
+        
+        # Cria nova thread
+        thread = Thread(
+            itemId=item_id,
+            participants=[owner_uid, user.uid]
+        )
+        
+        # Thread e entradas da inbox dos participantes são gravadas juntas
+        thread.id = repo.threads.new_id()
+        await repo.threads.create(thread.id, thread.dict(exclude_none=True))
+        
+        cache.put(thread.id, item_id, thread.participants)
+        index.put_thread(user.uid, thread)
     
     return thread
 
 
-@router.post("/{thread_id}/messages", response_model=Message, status_code=status.HTTP_201_CREATED)
+@router.post("/{thread_id}/messages", response_model=Message, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(rate_limit("messages"))])
 async def send_message(
     thread_id: str,
     message_data: MessageCreate,
-    user: AuthenticatedUser = Depends(get_current_user)
+    user: AuthenticatedUser = Depends(get_current_user),
+    hub: PubSubHub = Depends(get_hub),
+    cache: ThreadParticipantsCache = Depends(get_thread_cache),
+    index: ThreadLookupIndex = Depends(get_thread_index),
+    repo: Repository = Depends(get_request_repository)
 ):
     """
     Envia mensagem em uma thread.
-    Rate limit aplicado (simplificado aqui).
+    Rate limit aplicado por usuário (escopo "messages").
+    Mensagem, thread e inbox são gravadas em um único batch.
     """
-    db = get_firestore_client()
-    
-    # Verifica se thread existe e usuário é participante
-    thread_doc = db.collection("threads").document(thread_id).get()
-    if not thread_doc.exists:
-        raise HTTPException(status_code=404, detail="Thread not found")
-    
-    thread_data = thread_doc.to_dict()
-    if user.uid not in thread_data["participants"]:
+    # Verifica se thread existe e usuário é participante (cache evita a leitura)
+    members = await _get_thread_members(repo, cache, thread_id)
+    if user.uid not in members.participants:
         raise HTTPException(status_code=403, detail="Not a participant of this thread")
     
     # Cria mensagem
@@ -86,73 +107,146 @@ async def send_message(
         content=message_data.content
     )
     
-    doc_ref = db.collection("threads").document(thread_id).collection("messages").document()
-    message.id = doc_ref.id
-    doc_ref.set(message.dict(exclude_none=True))
+    message.id = repo.messages.new_id()
+    
+    # Mensagem, thread e inbox dos participantes em um único commit atômico
+    preview = message_data.content[:100]
+    await repo.messages.send(
+        thread_id,
+        message.id,
+        message.dict(exclude_none=True),
+        item_id=members.itemId,
+        participants=members.participants,
+        preview=preview,
+    )
+    
+    index.touch(thread_id, preview, message.createdAt)
     
-    # Atualiza thread
-    db.collection("threads").document(thread_id).update({
-        "lastMessage": message_data.content[:100],
-        "updatedAt": datetime.utcnow()
+    # Notifica participantes conectados
+    await hub.publish(members.participants, {
+        "type": "message",
+        "threadId": thread_id,
+        "message": jsonable_encoder(message),
     })
     
     return message
 
 
+@router.websocket("/ws")
+async def thread_events(
+    websocket: WebSocket,
+    user: AuthenticatedUser = Depends(get_current_user),
+    hub: PubSubHub = Depends(get_hub)
+):
+    """
+    Canal de eventos em tempo real do usuário (novas mensagens).
+    Substitui o polling de GET /threads/{id}/messages.
+    """
+    subscription = await hub.subscribe(user.uid)
+    await websocket.accept()
+    
+    async def pump_events():
+        while True:
+            event = await subscription.get()
+            await websocket.send_json(event)
+    
+    async def wait_disconnect():
+        while True:
+            data = await websocket.receive()
+            if data["type"] == "websocket.disconnect":
+                break
+        task_group.cancel_scope.cancel()
+    
+    try:
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(pump_events)
+            task_group.start_soon(wait_disconnect)
+    finally:
+        hub.unsubscribe(subscription)
+
+
+@router.get("/inbox", response_model=List[InboxEntry])
+async def get_inbox(
+    limit: int = Query(20, ge=1, le=100),
+    user: AuthenticatedUser = Depends(get_current_user),
+    repo: Repository = Depends(get_request_repository)
+):
+    """
+    Lista de conversas do usuário com contadores de não lidas.
+    Lê apenas a inbox materializada (uma consulta por página).
+    """
+    docs = await repo.inbox.list(user.uid, limit)
+    
+    return FastJSONResponse([_shape_inbox_entry(entry) for entry in docs])
+
+
+@router.post("/read", status_code=status.HTTP_204_NO_CONTENT)
+async def mark_threads_read(
+    request: MarkReadRequest,
+    user: AuthenticatedUser = Depends(get_current_user),
+    repo: Repository = Depends(get_request_repository)
+):
+    """
+    Marca como lidas todas as mensagens recebidas nas threads informadas
+    e zera os contadores da inbox, em um único batch.
+    """
+    thread_ids = set(request.threadIds)
+    
+    # Verifica participação em todas as threads com uma única leitura em lote
+    threads = await repo.threads.get_many(thread_ids)
+    for thread_id in thread_ids:
+        thread_data = threads.get(thread_id)
+        if thread_data is None or user.uid not in thread_data["participants"]:
+            raise HTTPException(status_code=403, detail="Not a participant of this thread")
+    
+    try:
+        await repo.messages.mark_read(user.uid, thread_ids)
+    except PreconditionFailed:
+        raise HTTPException(status_code=409, detail="Messages were modified by another request")
+    return None
+
+
 @router.get("", response_model=List[Thread])
 async def list_threads(
     mine: bool = Query(True, description="Apenas minhas threads"),
-    user: AuthenticatedUser = Depends(get_current_user)
+    user: AuthenticatedUser = Depends(get_current_user),
+    repo: Repository = Depends(get_request_repository)
 ):
     """Lista threads do usuário."""
-    db = get_firestore_client()
-    
-    if mine:
-        query = db.collection("threads").where("participants", "array_contains", user.uid)
-    else:
-        query = db.collection("threads")
-    
-    query = query.order_by("updatedAt", direction="DESCENDING")
+    docs = await repo.threads.list(participant=user.uid if mine else None)
     
-    docs = query.stream()
-    threads = []
-    
-    for doc in docs:
-        thread_dict = doc.to_dict()
-        thread_dict["id"] = doc.id
-        threads.append(Thread(**thread_dict))
-    
-    return threads
+    return FastJSONResponse([_shape_thread(thread_dict) for thread_dict in docs])
 
 
 @router.get("/{thread_id}/messages", response_model=List[Message])
 async def list_messages(
     thread_id: str,
     limit: int = Query(50, ge=1, le=100),
-    user: AuthenticatedUser = Depends(get_current_user)
+    user: AuthenticatedUser = Depends(get_current_user),
+    cache: ThreadParticipantsCache = Depends(get_thread_cache),
+    repo: Repository = Depends(get_request_repository)
 ):
     """Lista mensagens de uma thread."""
-    db = get_firestore_client()
-    
     # Verifica permissão
-    thread_doc = db.collection("threads").document(thread_id).get()
-    if not thread_doc.exists:
-        raise HTTPException(status_code=404, detail="Thread not found")
-    
-    thread_data = thread_doc.to_dict()
-    if user.uid not in thread_data["participants"]:
+    members = await _get_thread_members(repo, cache, thread_id)
+    if user.uid not in members.participants:
         raise HTTPException(status_code=403, detail="Not a participant")
     
     # Busca mensagens
-    query = db.collection("threads").document(thread_id).collection("messages")
-    query = query.order_by("createdAt", direction="DESCENDING").limit(limit)
+    docs = await repo.messages.list(thread_id, limit)
     
-    docs = query.stream()
-    messages = []
-    
-    for doc in docs:
-        msg_dict = doc.to_dict()
-        msg_dict["id"] = doc.id
-        messages.append(Message(**msg_dict))
+    return FastJSONResponse([_shape_message(msg_dict) for msg_dict in docs])
+
+
+async def _get_thread_members(
+    repo: Repository, cache: ThreadParticipantsCache, thread_id: str
+) -> ThreadMembers:
+    members = cache.get(thread_id)
+    if members is not None:
+        return members
+    
+    thread_data = await repo.threads.get(thread_id)
+    if thread_data is None:
+        raise HTTPException(status_code=404, detail="Thread not found")
     
-    return messages
+    return cache.put(thread_id, thread_data.get("itemId"), thread_data["participants"])
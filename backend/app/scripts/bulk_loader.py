@@ -0,0 +1,332 @@
+"""
+Carga em massa de documentos em qualquer DocumentStore.
+
+Os registros são agrupados em lotes de até MAX_COMMIT_WRITES (um commit
+cada), gravados por um pool de workers assíncronos e marcados num arquivo
+de checkpoint. Lotes terminam fora de ordem: o checkpoint guarda só a
+marca d'água dos lotes contíguos concluídos, então retomar pode regravar
+alguns lotes, o que é seguro porque cada escrita é um set idempotente.
+
+Entradas JSONL e CSV são lidas de forma preguiçosa (memória constante).
+"""
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from app.data.base import MAX_COMMIT_WRITES, DocumentStore, Write
+from app.utils.geohash import encode_geohash
+from app.utils.normalization import generate_ngrams, normalize_text
+
+Doc = Dict[str, Any]
+Record = Tuple[str, Doc]
+
+DATE_FIELDS = ("createdAt", "updatedAt", "resolvedAt", "expiresAt")
+
+
+class BulkLoadError(RuntimeError):
+    """Lote que falhou mesmo após as novas tentativas."""
+
+
+# --------------------------------------------------------------------------
+# Entradas
+# --------------------------------------------------------------------------
+
+def read_jsonl(path: Path) -> Iterator[Doc]:
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_csv(path: Path) -> Iterator[Doc]:
+    """
+    CSV com cabeçalho. Colunas "tags" separadas por "|"; "lat"/"lng" viram
+    geo; células vazias são omitidas.
+    """
+    with open(path, encoding="utf-8", newline="") as handle:
+        for row in csv.DictReader(handle):
+            doc: Doc = {key: value for key, value in row.items() if value not in ("", None)}
+            if "tags" in doc:
+                doc["tags"] = [tag.strip() for tag in doc["tags"].split("|") if tag.strip()]
+            if "lat" in doc and "lng" in doc:
+                doc["geo"] = {"lat": float(doc.pop("lat")), "lng": float(doc.pop("lng"))}
+            if "version" in doc:
+                doc["version"] = int(doc["version"])
+            yield doc
+
+
+def read_input(path: Path, fmt: Optional[str] = None) -> Iterator[Doc]:
+    fmt = fmt or path.suffix.lstrip(".").lower()
+    if fmt in ("jsonl", "ndjson"):
+        return read_jsonl(path)
+    if fmt == "csv":
+        return read_csv(path)
+    raise ValueError(f"Unsupported input format: {fmt}")
+
+
+def with_ids(docs: Iterable[Doc], namespace: str) -> Iterator[Record]:
+    """
+    (id, doc) para cada registro. Sem "id" no registro, o id deriva da
+    posição na entrada: retomar uma carga gera os mesmos ids.
+    """
+    for position, doc in enumerate(docs):
+        doc_id = doc.get("id") or uuid.uuid5(uuid.NAMESPACE_URL, f"{namespace}:{position}").hex[:20]
+        yield str(doc_id), {**doc, "id": str(doc_id)}
+
+
+# --------------------------------------------------------------------------
+# Preparação de itens
+# --------------------------------------------------------------------------
+
+# Tags e prédios se repetem muito em cargas grandes
+_normalize = lru_cache(maxsize=65_536)(normalize_text)
+_trigrams = lru_cache(maxsize=65_536)(generate_ngrams)
+_geohash = lru_cache(maxsize=65_536)(encode_geohash)
+
+
+def parse_timestamp(value: str) -> datetime:
+    """ISO 8601 como datetime UTC ingênuo, como os utcnow() gravados pela API."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def prepare_item(raw: Doc) -> Doc:
+    """
+    Completa um item histórico com o que create_item geraria: campos
+    normalizados, n-grams, geohash, datas e defaults de status/versão.
+    Campos já presentes no registro são mantidos.
+    """
+    doc = dict(raw)
+    for name in DATE_FIELDS:
+        if isinstance(doc.get(name), str):
+            doc[name] = parse_timestamp(doc[name])
+    tags = doc.setdefault("tags", [])
+    doc.setdefault("title_n", _normalize(doc.get("title", "")))
+    doc.setdefault("desc_n", _normalize(doc.get("description", "")))
+    doc.setdefault("tags_n", [_normalize(tag) for tag in tags])
+    if "ngrams" not in doc:
+        ngrams = set(_trigrams(doc.get("title", "")))
+        for tag in tags:
+            ngrams.update(_trigrams(tag))
+        doc["ngrams"] = sorted(ngrams)
+    geo = doc.get("geo")
+    if geo and not geo.get("geohash"):
+        doc["geo"] = {**geo, "geohash": _geohash(geo["lat"], geo["lng"])}
+    now = datetime.utcnow()
+    doc.setdefault("createdAt", now)
+    doc.setdefault("updatedAt", doc["createdAt"])
+    doc.setdefault("status", "OPEN")
+    doc.setdefault("photos", [])
+    doc.setdefault("version", 1)
+    return doc
+
+
+# --------------------------------------------------------------------------
+# Checkpoint e progresso
+# --------------------------------------------------------------------------
+
+@dataclass
+class Checkpoint:
+    """Lotes contíguos já gravados de uma carga (por coleção e origem)."""
+    path: Optional[Path]
+    collection: str
+    source: str
+    batch_size: int
+    batches_done: int = 0
+
+    @classmethod
+    def open(cls, path: Optional[Path], collection: str, source: str, batch_size: int) -> "Checkpoint":
+        if path is None or not path.exists():
+            return cls(path, collection, source, batch_size)
+        state = json.loads(path.read_text())
+        if (state["collection"], state["source"]) != (collection, source):
+            raise ValueError(f"Checkpoint {path} belongs to {state['collection']} from {state['source']}")
+        # Retoma com o tamanho de lote original: a marca d'água conta lotes
+        return cls(path, collection, source, state["batchSize"], state["batchesDone"])
+
+    @property
+    def records_done(self) -> int:
+        return self.batches_done * self.batch_size
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps({
+            "collection": self.collection,
+            "source": self.source,
+            "batchSize": self.batch_size,
+            "batchesDone": self.batches_done,
+            "recordsDone": self.records_done,
+            "savedAt": datetime.utcnow().isoformat(),
+        }))
+        # Troca atômica: um crash no meio da escrita não corrompe o checkpoint
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class Progress:
+    label: str
+    interval: float = 2.0
+    out: TextIO = field(default_factory=lambda: sys.stderr)
+    clock: Callable[[], float] = time.monotonic
+    written: int = 0
+    skipped: int = 0
+
+    def __post_init__(self):
+        self.started = self.clock()
+        self._last_report = self.started
+
+    @property
+    def elapsed(self) -> float:
+        return self.clock() - self.started
+
+    @property
+    def rate(self) -> float:
+        return self.written / self.elapsed if self.elapsed > 0 else 0.0
+
+    def add(self, count: int) -> None:
+        self.written += count
+        if self.clock() - self._last_report >= self.interval:
+            self.report()
+
+    def report(self, final: bool = False) -> None:
+        self._last_report = self.clock()
+        prefix = "✓" if final else "…"
+        skipped = f", {self.skipped} já carregados" if self.skipped else ""
+        print(
+            f"  {prefix} {self.label}: {self.written} docs em {self.elapsed:.1f}s "
+            f"({self.rate:,.0f} docs/s{skipped})",
+            file=self.out,
+        )
+
+
+# --------------------------------------------------------------------------
+# Carga
+# --------------------------------------------------------------------------
+
+class BulkLoader:
+    """
+    `collection` pode ser um modelo com campos do documento, como
+    "threads/{threadId}/messages": cada registro vai para a sua subcoleção
+    e um lote pode abranger várias delas no mesmo commit.
+    """
+
+    def __init__(
+        self,
+        store: DocumentStore,
+        collection: str,
+        batch_size: int = MAX_COMMIT_WRITES,
+        workers: int = 8,
+        retries: int = 3,
+        backoff: float = 0.5,
+        checkpoint: Optional[Path] = None,
+        progress: Optional[Progress] = None,
+        prepare: Optional[Callable[[Doc], Doc]] = None,
+    ):
+        if not 1 <= batch_size <= MAX_COMMIT_WRITES:
+            raise ValueError(f"batch_size must be between 1 and {MAX_COMMIT_WRITES}")
+        self.store = store
+        self.collection = collection
+        self.batch_size = batch_size
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.checkpoint_path = checkpoint
+        self.progress = progress or Progress(collection)
+        # Aplicado só aos registros que serão gravados (não aos pulados)
+        self.prepare = prepare
+
+    async def load(self, records: Iterable[Record], source: str = "-") -> int:
+        """
+        Grava os registros e devolve quantos foram escritos nesta execução.
+        Com checkpoint, os lotes já concluídos numa execução anterior são pulados.
+        """
+        checkpoint = Checkpoint.open(self.checkpoint_path, self.collection, source, self.batch_size)
+        batch_size = checkpoint.batch_size
+        queue: "asyncio.Queue[Optional[Tuple[int, List[Write]]]]" = asyncio.Queue(self.workers * 2)
+        finished: Set[int] = set()
+        failures: List[BaseException] = []
+
+        def advance(index: int) -> None:
+            finished.add(index)
+            moved = False
+            while checkpoint.batches_done in finished:
+                finished.discard(checkpoint.batches_done)
+                checkpoint.batches_done += 1
+                moved = True
+            if moved:
+                checkpoint.save()
+
+        async def worker() -> None:
+            while True:
+                job = await queue.get()
+                if job is None:
+                    return
+                index, writes = job
+                if failures:
+                    continue
+                try:
+                    await self._write(writes)
+                except Exception as exc:
+                    failures.append(exc)
+                    continue
+                self.progress.add(len(writes))
+                advance(index)
+
+        tasks = [asyncio.create_task(worker()) for _ in range(self.workers)]
+        try:
+            skip = checkpoint.records_done
+            self.progress.skipped = skip
+            batch: List[Write] = []
+            index = checkpoint.batches_done
+            templated = "{" in self.collection
+            for position, (doc_id, doc) in enumerate(records):
+                if position < skip:
+                    continue
+                if self.prepare:
+                    doc = self.prepare(doc)
+                collection = self.collection.format_map(doc) if templated else self.collection
+                batch.append(Write("set", collection, doc_id, doc))
+                if len(batch) == batch_size:
+                    await queue.put((index, batch))
+                    index, batch = index + 1, []
+                if failures:
+                    break
+            if batch and not failures:
+                await queue.put((index, batch))
+        finally:
+            for _ in tasks:
+                await queue.put(None)
+            await asyncio.gather(*tasks)
+
+        self.progress.report(final=True)
+        if failures:
+            raise BulkLoadError(
+                f"{self.collection}: batch failed after {self.retries} attempts; "
+                f"resume from {checkpoint.records_done} records"
+            ) from failures[0]
+        return self.progress.written
+
+    async def _write(self, writes: List[Write]) -> None:
+        for attempt in range(self.retries):
+            try:
+                await self.store.commit(writes)
+                return
+            except Exception:
+                if attempt == self.retries - 1:
+                    raise
+                await asyncio.sleep(self.backoff * 2 ** attempt)
@@ -0,0 +1,58 @@
+"""
+Compactação dos agregados de relatório em rollups por dia e por mês.
+
+Uso (a partir de backend/):
+    python -m app.scripts.compact_reports [--keep-days 2]
+
+Dobra os buckets por hora anteriores aos últimos N dias em rollups
+diários, e os dias de meses fechados em rollups mensais, que respondem o
+relatório por intervalo (/staff/reports/range). Rode periodicamente (uma
+vez por dia basta) e nunca duas instâncias ao mesmo tempo; buckets com
+escritas concorrentes ficam para a rodada seguinte.
+
+O backend segue STORAGE_BACKEND/SQLITE_PATH (ou --backend/--sqlite-path).
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.data import Repository
+from app.scripts.init_database import open_store
+from app.settings import get_settings
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--backend", choices=["memory", "sqlite", "firestore"])
+    parser.add_argument("--sqlite-path")
+    parser.add_argument(
+        "--keep-days", type=int, default=get_settings().report_keep_hours_days,
+        help="dias recentes mantidos em buckets por hora",
+    )
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> int:
+    store = open_store(args.backend, args.sqlite_path)
+    try:
+        result = await Repository(store).reports.compact(keep_days=args.keep_days)
+    finally:
+        await store.close()
+    print(
+        f"{result['hours']} horas e {result['days']} dias compactados em {result['rollups']} rollups"
+        f" ({result['conflicts']} adiados por escritas concorrentes)"
+    )
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    sys.exit(asyncio.run(run(parse_args(argv))))
+
+
+if __name__ == "__main__":
+    main()
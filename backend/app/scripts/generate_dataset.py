@@ -0,0 +1,435 @@
+"""
+Gerador determinístico de catálogos sintéticos para testes de carga e escala.
+
+Mesma semente e mesmos parâmetros produzem exatamente os mesmos documentos
+(ids, textos e datas), então medições de desempenho podem ser repetidas
+entre commits. Os dados seguem a forma gravada pelas rotas: itens com campos
+de busca, threads, mensagens, entradas de inbox e alertas.
+
+Distribuições:
+- objetos e usuários com popularidade enviesada (Zipf);
+- campus/prédios e coordenadas a partir dos dados de exemplo do seed;
+- datas concentradas nas semanas recentes, em dias úteis e horários de aula.
+
+Uso (a partir de backend/):
+    python -m app.scripts.generate_dataset --items 100000 --out dados/
+    python -m app.scripts.generate_dataset --items 100000 --load --backend sqlite
+"""
+import argparse
+import asyncio
+import bisect
+import itertools
+import json
+import random
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.data import DocumentStore, Repository
+from app.scripts.bulk_loader import BulkLoader, Progress, prepare_item
+from app.scripts.init_database import building_docs, campus_docs, open_store
+from app.settings import get_settings
+
+Doc = Dict[str, Any]
+
+# Data de referência padrão: fixa para que a saída não dependa do relógio
+DEFAULT_NOW = datetime(2025, 1, 1)
+
+# (categoria, substantivo, gênero, tags, marcas)
+OBJECTS: Sequence[Tuple[str, str, str, Sequence[str], Sequence[str]]] = (
+    ("Eletrônicos", "Celular", "m", ("celular", "smartphone"), ("Samsung", "Apple", "Motorola", "Xiaomi")),
+    ("Garrafas", "Garrafa Térmica", "f", ("garrafa", "termica"), ("Stanley", "Tupperware", "Contigo")),
+    ("Documentos", "Carteira", "f", ("carteira", "documentos"), ("Couro", "Nike", "Adidas")),
+    ("Chaves", "Molho de Chaves", "m", ("chaves", "chaveiro"), ("UnB", "Yale", "Pado")),
+    ("Roupas e Acessórios", "Mochila", "f", ("mochila", "material escolar"), ("Nike", "Adidas", "Samsonite", "Puma")),
+    ("Eletrônicos", "Fone de Ouvido", "m", ("fone", "bluetooth"), ("JBL", "Apple", "Sony", "Xiaomi")),
+    ("Roupas e Acessórios", "Casaco", "m", ("casaco", "blusa", "frio"), ("Hering", "Nike", "Renner")),
+    ("Documentos", "Carteirinha Estudantil", "f", ("carteirinha", "documentos", "unb"), ("UnB",)),
+    ("Eletrônicos", "Notebook", "m", ("notebook", "laptop", "computador"), ("Dell", "Lenovo", "Apple", "Acer")),
+    ("Roupas e Acessórios", "Óculos", "m", ("oculos", "grau"), ("Ray-Ban", "Oakley", "Chilli Beans")),
+    ("Eletrônicos", "Carregador", "m", ("carregador", "cabo", "usb"), ("Samsung", "Apple", "Anker")),
+    ("Livros", "Livro", "m", ("livro", "material escolar"), ("Cálculo", "Física", "Química", "Direito")),
+    ("Outros", "Guarda-chuva", "m", ("guarda-chuva", "chuva"), ("Fazzoletti", "Chuva Fina")),
+    ("Eletrônicos", "Calculadora", "f", ("calculadora", "cientifica"), ("Casio", "HP", "Texas")),
+    ("Roupas e Acessórios", "Relógio", "m", ("relogio", "pulso"), ("Casio", "Apple", "Garmin")),
+)
+
+# (masculino, feminino, tag)
+COLORS = (
+    ("Preto", "Preta", "preto"), ("Azul", "Azul", "azul"), ("Branco", "Branca", "branco"),
+    ("Vermelho", "Vermelha", "vermelho"), ("Verde", "Verde", "verde"), ("Cinza", "Cinza", "cinza"),
+    ("Rosa", "Rosa", "rosa"), ("Prata", "Prata", "prata"), ("Amarelo", "Amarela", "amarelo"),
+)
+
+# (local, local com preposição)
+SPOTS = (
+    ("Sala de Estudos", "na sala de estudos"), ("Corredor", "no corredor"),
+    ("Banheiro", "no banheiro"), ("Cantina", "na cantina"), ("Laboratório", "no laboratório"),
+    ("Auditório", "no auditório"), ("Sala de Aula", "na sala de aula"),
+    ("Estacionamento", "no estacionamento"), ("Quadra de Esportes", "na quadra de esportes"),
+    ("Entrada Principal", "na entrada principal"),
+)
+
+DESCRIPTIONS = (
+    "Encontrado {where}. Está em bom estado.",
+    "Perdi durante a tarde, acho que {where} ({building}).",
+    "{noun} {color_lower} deixado {where}. Entregue no balcão de achados.",
+    "Tem um adesivo na parte de trás. Visto pela última vez {where} ({building}).",
+)
+
+MESSAGES = (
+    "Oi! Acho que esse item é meu.",
+    "Você pode descrever algum detalhe?",
+    "Tem um adesivo na parte de trás.",
+    "Onde posso buscar?",
+    "Está no balcão do {building}.",
+    "Consigo passar amanhã de manhã.",
+    "Obrigado! Já retirei.",
+    "Ainda está disponível?",
+)
+
+# Peso relativo dos campus (Darcy Ribeiro concentra o movimento)
+CAMPUS_WEIGHTS = {
+    "campus-darcy-ribeiro": 6.0,
+    "campus-gama": 2.0,
+    "campus-ceilandia": 1.5,
+    "campus-planaltina": 1.0,
+}
+
+# Peso por hora do dia: picos nos intervalos das aulas (manhã, tarde e noite)
+HOUR_WEIGHTS = (
+    0.05, 0.02, 0.01, 0.01, 0.01, 0.05, 0.2, 0.6, 1.0, 1.2, 1.5, 1.3,
+    1.1, 1.2, 1.5, 1.3, 1.2, 1.0, 1.1, 1.3, 1.0, 0.6, 0.3, 0.1,
+)
+WEEKEND_WEIGHT = 0.3
+
+
+@dataclass
+class DatasetSpec:
+    items: int = 10_000
+    users: Optional[int] = None  # padrão: um usuário a cada 20 itens
+    thread_ratio: float = 0.3  # threads por item, em média
+    messages_per_thread: float = 4.0
+    alert_ratio: float = 0.2  # alertas por usuário, em média
+    days: int = 365
+    seed: int = 42
+    now: datetime = DEFAULT_NOW
+
+    @property
+    def user_count(self) -> int:
+        return self.users or max(10, self.items // 20)
+
+
+@dataclass(frozen=True)
+class _Skeleton:
+    """Parte de um item que threads e mensagens precisam (sem textos)."""
+    index: int
+    id: str
+    owner: str
+    created_at: datetime
+    building: Doc
+
+
+class _Weighted:
+    """Sorteio ponderado com bisect sobre pesos acumulados."""
+
+    def __init__(self, values: Sequence[Any], weights: Sequence[float]):
+        self.values = values
+        self.cumulative = list(itertools.accumulate(weights))
+
+    def pick(self, rng: random.Random) -> Any:
+        return self.values[bisect.bisect(self.cumulative, rng.random() * self.cumulative[-1])]
+
+
+def _zipf(count: int, exponent: float = 1.1) -> List[float]:
+    return [1.0 / (rank + 1) ** exponent for rank in range(count)]
+
+
+class CatalogGenerator:
+    def __init__(self, spec: DatasetSpec):
+        self.spec = spec
+        campuses = {campus["id"]: campus for campus in campus_docs()}
+        buildings = []
+        weights = []
+        for campus_id, campus_buildings in building_docs().items():
+            for building in campus_buildings:
+                buildings.append({**building, "campusName": campuses[campus_id]["name"]})
+                weights.append(CAMPUS_WEIGHTS.get(campus_id, 1.0) / len(campus_buildings))
+        self._buildings = _Weighted(buildings, weights)
+        self._objects = _Weighted(range(len(OBJECTS)), _zipf(len(OBJECTS), 0.8))
+        self._users = _Weighted(range(spec.user_count), _zipf(spec.user_count, 0.9))
+        self._hours = _Weighted(range(24), HOUR_WEIGHTS)
+
+    def _rng(self, stream: str) -> random.Random:
+        # Um gerador por corpus: mudar um corpus não desloca os outros
+        return random.Random(f"{self.spec.seed}:{stream}")
+
+    def _user(self, rng: random.Random) -> str:
+        return f"user-{self._users.pick(rng):06d}"
+
+    def _timestamp(self, rng: random.Random) -> datetime:
+        """Idade exponencial (recentes dominam), dias úteis e horário de aula."""
+        while True:
+            age = min(rng.expovariate(4.0 / self.spec.days), self.spec.days - 1)
+            day = self.spec.now - timedelta(days=int(age) + 1)
+            if day.weekday() < 5 or rng.random() < WEEKEND_WEIGHT:
+                break
+        return day.replace(hour=self._hours.pick(rng), minute=rng.randrange(60), second=rng.randrange(60))
+
+    def _skeletons(self) -> Iterator[_Skeleton]:
+        rng = self._rng("skeleton")
+        for index in range(self.spec.items):
+            yield _Skeleton(
+                index=index,
+                id=f"gen-item-{index:07d}",
+                owner=self._user(rng),
+                created_at=self._timestamp(rng),
+                building=self._buildings.pick(rng),
+            )
+
+    # ------------------------------------------------------------------
+    # Corpora
+    # ------------------------------------------------------------------
+
+    def items(self) -> Iterator[Doc]:
+        rng = self._rng("items")
+        for skeleton in self._skeletons():
+            category, noun, gender, tags, brands = OBJECTS[self._objects.pick(rng)]
+            masculine, feminine, color_tag = rng.choice(COLORS)
+            color = masculine if gender == "m" else feminine
+            brand = rng.choice(brands)
+            building = skeleton.building
+            spot, where = rng.choice(SPOTS)
+            created_at = skeleton.created_at
+            doc = {
+                "id": skeleton.id,
+                "ownerUid": skeleton.owner,
+                "type": "FOUND" if rng.random() < 0.6 else "LOST",
+                "title": f"{noun} {brand} {color}",
+                "description": rng.choice(DESCRIPTIONS).format(
+                    where=where, building=building["name"], noun=noun, color_lower=color.lower()
+                ),
+                "category": category,
+                "tags": [*tags, color_tag, brand.lower()],
+                "campusId": building["campusId"],
+                "campusName": building["campusName"],
+                "buildingId": building["id"],
+                "buildingName": building["name"],
+                "spot": spot,
+                "geo": {
+                    "lat": round(building["geo"]["lat"] + rng.uniform(-0.0008, 0.0008), 6),
+                    "lng": round(building["geo"]["lng"] + rng.uniform(-0.0008, 0.0008), 6),
+                },
+                "createdAt": created_at,
+                "updatedAt": created_at,
+            }
+            # Itens antigos tendem a estar resolvidos
+            age_days = (self.spec.now - created_at).days
+            if rng.random() < min(0.8, age_days / 60):
+                doc["status"] = "RESOLVED"
+                doc["resolvedAt"] = created_at + timedelta(hours=rng.expovariate(1 / 48))
+                doc["resolvedReason"] = "Devolvido ao dono"
+            yield prepare_item(doc)
+
+    def _conversations(self) -> Iterator[Tuple[Doc, List[Doc], List[Doc]]]:
+        """(thread, mensagens, entradas de inbox) por conversa."""
+        rng = self._rng("threads")
+        spec = self.spec
+        for skeleton in self._skeletons():
+            count = 0
+            while rng.random() < spec.thread_ratio / (1 + spec.thread_ratio) and count < 20:
+                count += 1
+            for seq in range(count):
+                yield self._conversation(rng, skeleton, seq)
+
+    def _conversation(self, rng: random.Random, item: _Skeleton, seq: int) -> Tuple[Doc, List[Doc], List[Doc]]:
+        thread_id = f"{item.id}-t{seq}"
+        other = self._user(rng)
+        if other == item.owner:
+            other = f"user-{(int(other[5:]) + 1) % self.spec.user_count:06d}"
+        participants = [other, item.owner]
+
+        sent_at = item.created_at + timedelta(minutes=rng.expovariate(1 / 240))
+        total = 1 + int(rng.expovariate(1 / max(self.spec.messages_per_thread - 1, 0.1)))
+        # Destinatários leram tudo, exceto as últimas mensagens recebidas
+        unread_tail = rng.choice((0, 0, 1, 2))
+        messages = []
+        for n in range(total):
+            sender = participants[n % 2]
+            messages.append({
+                "id": f"{thread_id}-m{n:03d}",
+                "threadId": thread_id,
+                "senderUid": sender,
+                "content": rng.choice(MESSAGES).format(building=item.building["name"]),
+                "createdAt": sent_at,
+                "read": n < total - unread_tail,
+            })
+            sent_at += timedelta(minutes=rng.expovariate(1 / 90))
+
+        last = messages[-1]
+        preview = last["content"][:100]
+        thread = {
+            "id": thread_id,
+            "itemId": item.id,
+            "participants": participants,
+            "createdAt": messages[0]["createdAt"],
+            "updatedAt": last["createdAt"],
+            "lastMessage": preview,
+        }
+        inbox = [
+            {
+                "id": thread_id,
+                "uid": uid,  # dono da inbox (users/{uid}/inbox)
+                "threadId": thread_id,
+                "itemId": item.id,
+                "lastMessage": preview,
+                "lastSenderUid": last["senderUid"],
+                "updatedAt": last["createdAt"],
+                "unread": sum(1 for m in messages if not m["read"] and m["senderUid"] != uid),
+            }
+            for uid in participants
+        ]
+        return thread, messages, inbox
+
+    def threads(self) -> Iterator[Doc]:
+        for thread, _, _ in self._conversations():
+            yield thread
+
+    def messages(self) -> Iterator[Doc]:
+        for _, messages, _ in self._conversations():
+            yield from messages
+
+    def inbox(self) -> Iterator[Doc]:
+        for _, _, entries in self._conversations():
+            yield from entries
+
+    def alerts(self) -> Iterator[Doc]:
+        rng = self._rng("alerts")
+        campus_ids = list(CAMPUS_WEIGHTS)
+        for user in range(self.spec.user_count):
+            count = 0
+            while rng.random() < self.spec.alert_ratio / (1 + self.spec.alert_ratio) and count < 5:
+                count += 1
+            for seq in range(count):
+                _, noun, _, tags, _ = OBJECTS[self._objects.pick(rng)]
+                masculine, _, color_tag = rng.choice(COLORS)
+                yield {
+                    "id": f"gen-alert-{user:06d}-{seq}",
+                    "uid": f"user-{user:06d}",
+                    "queryText": f"{noun.lower()} {color_tag}",
+                    "tags": [tags[0], color_tag],
+                    "campusId": rng.choice(campus_ids) if rng.random() < 0.7 else None,
+                    "active": rng.random() < 0.8,
+                    "createdAt": self._timestamp(rng),
+                    "version": 1,
+                }
+
+    def corpora(self) -> Dict[str, Tuple[str, Callable[[], Iterator[Doc]]]]:
+        """Nome do corpus -> (coleção, possivelmente modelo; fábrica de documentos)."""
+        return {
+            "items": ("items", self.items),
+            "threads": ("threads", self.threads),
+            "messages": ("threads/{threadId}/messages", self.messages),
+            "inbox": ("users/{uid}/inbox", self.inbox),
+            "alerts": ("alerts", self.alerts),
+        }
+
+
+# --------------------------------------------------------------------------
+# Saída
+# --------------------------------------------------------------------------
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def write_jsonl(generator: CatalogGenerator, out_dir: Path) -> Dict[str, int]:
+    """Um arquivo por corpus; devolve a contagem de documentos de cada um."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    counts = {}
+    for name, (_, docs) in generator.corpora().items():
+        count = 0
+        with open(out_dir / f"{name}.jsonl", "w", encoding="utf-8") as handle:
+            for doc in docs():
+                handle.write(json.dumps(doc, default=_json_default, ensure_ascii=False))
+                handle.write("\n")
+                count += 1
+        counts[name] = count
+    return counts
+
+
+async def load_into(store: DocumentStore, generator: CatalogGenerator, workers: int = 8) -> Dict[str, int]:
+    """Grava os corpora direto no store, pelo BulkLoader."""
+    counts = {}
+    for name, (collection, docs) in generator.corpora().items():
+        loader = BulkLoader(store, collection, workers=workers, progress=Progress(name))
+        counts[name] = await loader.load((doc["id"], doc) for doc in docs())
+    # A carga direta não passa pelo repositório: monta os agregados de
+    # relatório e compacta o histórico (um ano de horas) em rollups
+    reports = Repository(store).reports
+    await reports.reconcile()
+    await reports.compact(keep_days=get_settings().report_keep_hours_days)
+    return counts
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Gera catálogos sintéticos determinísticos")
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--thread-ratio", type=float, default=0.3)
+    parser.add_argument("--messages-per-thread", type=float, default=4.0)
+    parser.add_argument("--alert-ratio", type=float, default=0.2)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--now", type=datetime.fromisoformat, default=DEFAULT_NOW,
+                        help="data de referência (ISO); fixa por padrão")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", type=Path, help="diretório de saída JSONL")
+    target.add_argument("--load", action="store_true", help="grava no backend configurado")
+    parser.add_argument("--backend", choices=["memory", "sqlite", "firestore"])
+    parser.add_argument("--sqlite-path")
+    parser.add_argument("--workers", type=int, default=8)
+    return parser.parse_args(argv)
+
+
+def spec_from_args(args: argparse.Namespace) -> DatasetSpec:
+    return DatasetSpec(
+        items=args.items,
+        users=args.users,
+        thread_ratio=args.thread_ratio,
+        messages_per_thread=args.messages_per_thread,
+        alert_ratio=args.alert_ratio,
+        days=args.days,
+        seed=args.seed,
+        now=args.now,
+    )
+
+
+async def _load(args: argparse.Namespace, generator: CatalogGenerator) -> Dict[str, int]:
+    store = open_store(args.backend, args.sqlite_path)
+    try:
+        return await load_into(store, generator, workers=args.workers)
+    finally:
+        await store.close()
+
+
+def main() -> None:
+    args = parse_args()
+    generator = CatalogGenerator(spec_from_args(args))
+    if args.out:
+        counts = write_jsonl(generator, args.out)
+    else:
+        counts = asyncio.run(_load(args, generator))
+    summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+    print(f"✅ seed {args.seed}: {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,16 @@
 """
 Script para inicializar o banco de dados com dados de exemplo
+e para cargas em massa (JSONL/CSV) no backend configurado.
+
+Uso (a partir de backend/):
+    python -m app.scripts.init_database seed
+    python -m app.scripts.init_database load itens.jsonl --collection items \
+        --workers 8 --checkpoint itens.ckpt
+
+O backend segue STORAGE_BACKEND/SQLITE_PATH (ou --backend/--sqlite-path).
 """
+import argparse
+import asyncio
 import sys
 from pathlib import Path
 
@@ -8,15 +18,19 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from datetime import datetime, timedelta
-from app.firebase import get_firestore_client
-from app.utils.normalization import normalize_text, generate_ngrams
+from typing import Any, Dict, List, Optional
+
+from app.data import DocumentStore, Repository, get_store
+from app.data.base import MAX_COMMIT_WRITES
+from app.scripts.bulk_loader import BulkLoader, BulkLoadError, Progress, prepare_item, read_input, with_ids
+from app.settings import get_settings
 from app.utils.geohash import encode_geohash
 
+Doc = Dict[str, Any]
 
-def init_campuses():
-    """Inicializa dados dos campus"""
-    db = get_firestore_client()
-    
+
+def campus_docs() -> List[Doc]:
+    """Dados dos campus"""
     campuses = [
         {
             "id": "campus-planaltina",
@@ -87,20 +101,11 @@ def init_campuses():
             "updatedAt": datetime.now()
         }
     ]
-    
-    print("📍 Criando campus...")
-    for campus in campuses:
-        campus_ref = db.collection("campuses").document(campus["id"])
-        campus_ref.set(campus)
-        print(f"  ✓ {campus['name']}")
-    
-    print()
+    return campuses
 
 
-def init_buildings():
-    """Inicializa dados dos prédios"""
-    db = get_firestore_client()
-    
+def building_docs() -> Dict[str, List[Doc]]:
+    """Dados dos prédios, por campus"""
     buildings_data = {
         "campus-darcy-ribeiro": [
             {
@@ -182,26 +187,17 @@ def init_buildings():
         ]
     }
     
-    print("🏢 Criando prédios...")
     for campus_id, buildings in buildings_data.items():
         for building in buildings:
             building["campusId"] = campus_id
             building["active"] = True
             building["createdAt"] = datetime.now()
             building["updatedAt"] = datetime.now()
-            
-            building_ref = db.collection("campuses").document(campus_id)\
-                .collection("buildings").document(building["id"])
-            building_ref.set(building)
-            print(f"  ✓ {campus_id} - {building['name']}")
-    
-    print()
+    return buildings_data
 
 
-def init_sample_items():
-    """Cria itens de exemplo"""
-    db = get_firestore_client()
-    
+def sample_item_docs() -> List[Doc]:
+    """Itens de exemplo, já com campos de busca"""
     sample_items = [
         {
             "type": "FOUND",
@@ -337,36 +333,13 @@ def init_sample_items():
         }
     ]
     
-    print("📦 Criando itens de exemplo...")
-    for item_data in sample_items:
-        # Gera ID único
-        item_id = f"item-{datetime.now().timestamp()}"
-        
-        # Normaliza textos
-        title_n = normalize_text(item_data["title"])
-        desc_n = normalize_text(item_data["description"])
-        tags_n = [normalize_text(tag) for tag in item_data["tags"]]
-        
-        # Gera n-grams
-        ngrams = generate_ngrams(item_data["title"])
-        for tag in item_data["tags"]:
-            ngrams.extend(generate_ngrams(tag))
-        ngrams = list(set(ngrams))  # Remove duplicatas
-        
-        # Calcula timestamps
+    items = []
+    for n, item_data in enumerate(sample_items):
         created_at = datetime.now() - timedelta(days=item_data.pop("created_days_ago"))
-        
-        # Monta documento
-        item_doc = {
-            "id": item_id,
+        items.append(prepare_item({
+            "id": f"sample-item-{n + 1}",
             "ownerUid": "demo-user-123",
             **item_data,
-            "photos": [],
-            "status": "OPEN",
-            "title_n": title_n,
-            "desc_n": desc_n,
-            "tags_n": tags_n,
-            "ngrams": ngrams,
             "createdAt": created_at,
             "updatedAt": created_at,
             "expiresAt": created_at + timedelta(days=90),
@@ -376,20 +349,13 @@ def init_sample_items():
             },
             "viewCount": 0,
             "contactCount": 0
-        }
-        
-        # Salva no Firestore
-        db.collection("items").document(item_id).set(item_doc)
-        print(f"  ✓ {item_data['type']}: {item_data['title']}")
-    
-    print()
+        }))
+    return items
 
 
-def init_demo_user():
-    """Cria usuário de demonstração"""
-    db = get_firestore_client()
-    
-    user_data = {
+def demo_user_doc() -> Doc:
+    """Usuário de demonstração"""
+    return {
         "uid": "demo-user-123",
         "name": "Usuário Demo",
         "email": "demo@undf.edu.br",
@@ -402,25 +368,109 @@ def init_demo_user():
         "createdAt": datetime.now(),
         "updatedAt": datetime.now()
     }
+
+
+async def load_docs(store: DocumentStore, collection: str, docs: List[Doc], label: str) -> None:
+    loader = BulkLoader(store, collection, progress=Progress(label, out=sys.stdout))
+    await loader.load((doc["id"], doc) for doc in docs)
+
+
+async def seed(store: DocumentStore) -> None:
+    """Dados de exemplo: campus, prédios, usuário demo e itens"""
+    print("📍 Criando campus...")
+    await load_docs(store, "campuses", campus_docs(), "campuses")
+    
+    print("🏢 Criando prédios...")
+    for campus_id, buildings in building_docs().items():
+        await load_docs(store, f"campuses/{campus_id}/buildings", buildings, campus_id)
     
     print("👤 Criando usuário demo...")
-    db.collection("users").document(user_data["uid"]).set(user_data)
-    print(f"  ✓ {user_data['name']} ({user_data['email']})")
+    user = demo_user_doc()
+    await store.set("users", user["uid"], user)
+    print(f"  ✓ {user['name']} ({user['email']})")
+    
+    print("📦 Criando itens de exemplo...")
+    await load_docs(store, "items", sample_item_docs(), "items")
+    await Repository(store).reports.reconcile()
     print()
 
 
+async def load_file(store: DocumentStore, args: argparse.Namespace) -> int:
+    """Carga em massa de um arquivo JSONL/CSV"""
+    path = Path(args.input)
+    loader = BulkLoader(
+        store,
+        args.collection,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        checkpoint=Path(args.checkpoint) if args.checkpoint else None,
+        progress=Progress(args.collection, interval=args.progress_interval),
+        prepare=prepare_item if args.collection == "items" else None,
+    )
+    records = with_ids(read_input(path, args.format), f"{args.collection}:{path.name}")
+    written = await loader.load(records, source=str(path.resolve()))
+    if args.collection == "items":
+        # A carga direta não passa pelo repositório: monta os agregados de relatório
+        await Repository(store).reports.reconcile()
+    return written
+
+
+def open_store(backend: Optional[str], sqlite_path: Optional[str]) -> DocumentStore:
+    settings = get_settings()
+    if backend:
+        settings.storage_backend = backend
+    if sqlite_path:
+        settings.sqlite_path = sqlite_path
+    return get_store()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Inicializa o banco e faz cargas em massa")
+    parser.add_argument("--backend", choices=["memory", "sqlite", "firestore"])
+    parser.add_argument("--sqlite-path")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("seed", help="dados de exemplo (padrão)")
+    load = commands.add_parser("load", help="carga em massa de JSONL/CSV")
+    load.add_argument("input")
+    load.add_argument("--collection", default="items")
+    load.add_argument("--format", choices=["jsonl", "csv"])
+    load.add_argument("--batch-size", type=int, default=MAX_COMMIT_WRITES)
+    load.add_argument("--workers", type=int, default=8)
+    load.add_argument("--checkpoint", help="arquivo de checkpoint para retomar após falha")
+    load.add_argument("--progress-interval", type=float, default=2.0)
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> None:
+    store = open_store(args.backend, args.sqlite_path)
+    try:
+        if args.command == "load":
+            written = await load_file(store, args)
+            print(f"✅ {written} documentos gravados em {args.collection}")
+        else:
+            await seed(store)
+    finally:
+        await store.close()
+
+
 def main():
-    """Executa inicialização completa"""
+    """Executa inicialização completa ou carga em massa"""
+    args = parse_args()
+    if args.command == "load":
+        try:
+            asyncio.run(run(args))
+        except BulkLoadError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        return
+    
     print("=" * 60)
     print("🚀 INICIALIZANDO BANCO DE DADOS - UNDF ACHADOS E PERDIDOS")
     print("=" * 60)
     print()
     
     try:
-        init_campuses()
-        init_buildings()
-        init_demo_user()
-        init_sample_items()
+        asyncio.run(run(args))
         
         print("=" * 60)
         print("✅ BANCO DE DADOS INICIALIZADO COM SUCESSO!")
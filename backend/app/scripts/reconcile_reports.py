@@ -0,0 +1,56 @@
+"""
+Reconciliação dos agregados de relatório (buckets por hora e campus).
+
+Uso (a partir de backend/):
+    python -m app.scripts.reconcile_reports [--since-hours 48] [--check]
+
+Recalcula os buckets a partir dos itens (varredura completa, ou só das
+últimas N horas) e corrige as diferenças com incrementos. --check só
+lista as diferenças e sai com código 1 se houver alguma. Rode depois de
+cargas diretas no store e periodicamente como verificação.
+
+O backend segue STORAGE_BACKEND/SQLITE_PATH (ou --backend/--sqlite-path).
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.data import Repository
+from app.scripts.init_database import open_store
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--backend", choices=["memory", "sqlite", "firestore"])
+    parser.add_argument("--sqlite-path")
+    parser.add_argument("--since-hours", type=int, help="só itens criados nas últimas N horas")
+    parser.add_argument("--check", action="store_true", help="não corrige; sai com 1 se houver diferenças")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> int:
+    store = open_store(args.backend, args.sqlite_path)
+    since = datetime.utcnow() - timedelta(hours=args.since_hours) if args.since_hours else None
+    try:
+        diffs = await Repository(store).reports.reconcile(since, fix=not args.check)
+    finally:
+        await store.close()
+    for key, diff in diffs.items():
+        print(f"  {key}: armazenado {diff['stored']} != recalculado {diff['expected']}")
+    action = "encontradas" if args.check else "corrigidas"
+    print(f"{len(diffs)} diferenças {action}")
+    return 1 if diffs and args.check else 0
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    sys.exit(asyncio.run(run(parse_args(argv))))
+
+
+if __name__ == "__main__":
+    main()
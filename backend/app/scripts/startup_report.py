@@ -0,0 +1,132 @@
+"""
+Relatório de cold start: importações, create_app e primeira resposta 200.
+
+Uso (a partir de backend/):
+    python -m app.scripts.startup_report [--path /items] [--top 15] [--eager] [--json]
+
+Roda um processo novo com `python -X importtime`, importa app.main e faz a
+primeira requisição via ASGI (com lifespan). Mostra o tempo de cada fase,
+o custo de importação por pacote (tempo próprio somado) e os módulos do app
+mais caros (tempo acumulado). --eager compara com todos os routers
+importados no create_app (LAZY_ROUTERS=false).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).parent.parent.parent
+
+# Executado no processo filho; o stderr leva a saída do -X importtime
+PROBE = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+loaded = sorted(name for name in sys.modules if name.startswith("app."))
+
+async def first_request(path):
+    import httpx
+    application = app.main.app
+    async with application.router.lifespan_context(application):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            response = await client.get(path)
+        return ready, response.status_code
+
+ready, status = asyncio.run(first_request(sys.argv[1]))
+done = time.perf_counter()
+print(json.dumps({
+    "importMs": (imported - start) * 1000,
+    "lifespanMs": (ready - imported) * 1000,
+    "firstResponseMs": (done - ready) * 1000,
+    "totalMs": (done - start) * 1000,
+    "status": status,
+    "modulesAfterImport": loaded,
+}))
+"""
+
+
+def parse_importtime(lines: List[str]) -> List[dict]:
+    """Linhas "import time: self | cumulative | módulo" (microssegundos)."""
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append({"module": name.strip(), "self": int(self_us), "cumulative": int(cumulative_us)})
+    return entries
+
+
+def by_package(entries: List[dict]) -> Dict[str, int]:
+    """Tempo próprio (µs) somado por pacote de topo; o app conta por subpacote."""
+    totals: Dict[str, int] = defaultdict(int)
+    for entry in entries:
+        parts = entry["module"].split(".")
+        package = ".".join(parts[:2]) if parts[0] == "app" else parts[0]
+        totals[package] += entry["self"]
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def measure(path: str = "/items", eager: bool = False, env: Optional[Dict[str, str]] = None) -> dict:
+    """Roda a sonda num processo novo e devolve fases, importações e módulos carregados."""
+    child_env = {**os.environ, **(env or {})}
+    child_env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BACKEND_DIR), child_env.get("PYTHONPATH")]))
+    if eager:
+        child_env["LAZY_ROUTERS"] = "false"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE, path],
+        cwd=BACKEND_DIR, env=child_env, capture_output=True, text=True, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Sonda de startup falhou:\n{result.stderr[-2000:]}")
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    entries = parse_importtime(result.stderr.splitlines())
+    report["imports"] = entries
+    report["packages"] = by_package(entries)
+    report["appSelfMs"] = sum(entry["self"] for entry in entries if entry["module"].split(".")[0] == "app") / 1000
+    return report
+
+
+def print_report(report: dict, top: int) -> None:
+    print(f"import app.main   {report['importMs']:8.1f} ms")
+    print(f"lifespan startup  {report['lifespanMs']:8.1f} ms")
+    print(f"primeira resposta {report['firstResponseMs']:8.1f} ms  (status {report['status']})")
+    print(f"total             {report['totalMs']:8.1f} ms")
+    print(f"\nTempo próprio de importação por pacote (top {top}):")
+    for package, micros in list(report["packages"].items())[:top]:
+        print(f"  {package:<32} {micros / 1000:8.1f} ms")
+    # Um módulo pode aparecer duas vezes (ex.: app.main via app/__init__)
+    app_modules: Dict[str, int] = {}
+    for entry in report["imports"]:
+        if entry["module"].startswith("app."):
+            app_modules[entry["module"]] = max(app_modules.get(entry["module"], 0), entry["cumulative"])
+    print(f"\nMódulos do app por tempo acumulado (top {top}):")
+    for module, micros in sorted(app_modules.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {module:<32} {micros / 1000:8.1f} ms")
+    routers = [name for name in report["modulesAfterImport"] if name.startswith("app.routes.") and name != "app.routes.loader"]
+    print(f"\nRouters importados no create_app: {', '.join(routers) or 'nenhum'}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--path", default="/items", help="rota da primeira requisição")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--eager", action="store_true", help="importa todos os routers no create_app")
+    parser.add_argument("--json", action="store_true", help="imprime o relatório em JSON")
+    args = parser.parse_args(argv)
+
+    report = measure(args.path, eager=args.eager)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.top)
+
+
+if __name__ == "__main__":
+    main()
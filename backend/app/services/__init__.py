@@ -0,0 +1,37 @@
+import importlib
+
+# Exports carregados sob demanda: importar um serviço (ex.: o profiler no
+# middleware) não puxa os demais nem os modelos pydantic que eles usam
+_EXPORTS = {
+    "ItemCache": "item_cache",
+    "get_item_cache": "item_cache",
+    "LRUCache": "lru",
+    "MetricsRegistry": "metrics",
+    "get_metrics": "metrics",
+    "Profiler": "profiling",
+    "get_profiler": "profiling",
+    "PubSubHub": "pubsub",
+    "Subscription": "pubsub",
+    "get_hub": "pubsub",
+    "InMemoryRateLimiter": "rate_limit",
+    "RateLimitRule": "rate_limit",
+    "RedisRateLimiter": "rate_limit",
+    "get_rate_limiter": "rate_limit",
+    "StatsRegistry": "stats",
+    "get_stats": "stats",
+    "ThreadParticipantsCache": "thread_cache",
+    "get_thread_cache": "thread_cache",
+    "ThreadLookupIndex": "thread_index",
+    "get_thread_index": "thread_index",
+    "WarmupState": "warmup",
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module}", __name__), name)
+
+
+__all__ = list(_EXPORTS)
@@ -0,0 +1,182 @@
+"""
+Cache read-through de itens (LRU + TTL) com invalidação versionada.
+
+Cada item tem um número de versão local, incrementado a cada invalidação.
+Uma leitura que começou antes de uma escrita não repovoa o cache com o
+documento antigo: o preenchimento só é aceito se a versão não mudou.
+404s podem ser cacheados por um TTL curto (cache negativo).
+
+O cache é local ao processo. Com vários workers, `bind(hub)` propaga as
+invalidações pelo adaptador de broadcast do hub de pub/sub (LISTEN/NOTIFY
+quando configurado); sem broadcast entre processos, o TTL limita por quanto
+tempo outro worker pode servir um item desatualizado.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set
+
+from ..settings import get_settings
+from .lru import LRUCache
+
+Doc = Dict[str, Any]
+
+_NOT_FOUND = object()
+
+INVALIDATE_EVENT = "item_cache.invalidate"
+
+
+class ItemCache:
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        ttl: Optional[float] = 30.0,
+        negative_ttl: Optional[float] = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.negative_ttl = negative_ttl
+        self.negative_hits = 0
+        self._entries: LRUCache[Any] = LRUCache(max_size, ttl=ttl, clock=clock)
+        # Versões sobrevivem à remoção da entrada; limite maior que o cache
+        self._versions: LRUCache[int] = LRUCache(max_size * 2)
+        self.origin = uuid.uuid4().hex
+        # Marca d'água da coleção: muda a cada escrita de item vista pelo
+        # processo (local ou via broadcast); base das ETags de listas
+        self.high_water = 0
+        self._hub = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    def bind(self, hub) -> None:
+        """Propaga invalidações aos demais workers pelo hub de pub/sub."""
+        self._hub = hub
+        hub.add_listener(self._on_event)
+
+    @property
+    def hits(self) -> int:
+        return self._entries.hits
+
+    @property
+    def misses(self) -> int:
+        return self._entries.misses
+
+    @property
+    def ttl(self) -> Optional[float]:
+        return self._entries.ttl
+
+    @property
+    def hit_ratio(self) -> float:
+        return self._entries.hit_ratio
+
+    def version(self, item_id: str) -> int:
+        return self._versions.get(item_id, 0)
+
+    async def get_or_load(
+        self, item_id: str, load: Callable[[], Awaitable[Optional[Doc]]]
+    ) -> Optional[Doc]:
+        """Devolve o item do cache ou chama `load` e guarda o resultado."""
+        cached = self._entries.get(item_id, None)
+        if cached is _NOT_FOUND:
+            self.negative_hits += 1
+            return None
+        if cached is not None:
+            return dict(cached)
+
+        version = self.version(item_id)
+        doc = await load()
+        if self.version(item_id) == version:
+            if doc is not None:
+                self._entries.put(item_id, dict(doc))
+            elif self.negative_ttl:
+                self._entries.put(item_id, _NOT_FOUND, ttl=self.negative_ttl)
+        return doc
+
+    def preload(self, docs: Iterable[Doc]) -> int:
+        """
+        Preenche o cache sem gerar versão nem broadcast (warmup). Itens já
+        em cache ou escritos/invalidados desde o boot (versão > 0) ficam de
+        fora: o documento lido pode ser anterior à escrita.
+        """
+        loaded = 0
+        for doc in docs:
+            item_id = doc["id"]
+            if self.version(item_id) == 0 and item_id not in self._entries:
+                self._entries.put(item_id, dict(doc))
+                loaded += 1
+        return loaded
+
+    def put(self, item_id: str, doc: Doc) -> None:
+        """Write-through: nova versão com o documento recém-gravado."""
+        self._bump(item_id)
+        self._entries.put(item_id, dict(doc))
+        self._broadcast(item_id)
+
+    def put_many(self, docs: Dict[str, Doc]) -> None:
+        """put em lote: um único broadcast com todos os ids."""
+        for item_id, doc in docs.items():
+            self._bump(item_id)
+            self._entries.put(item_id, dict(doc))
+        if docs:
+            self._publish({"type": INVALIDATE_EVENT, "itemIds": list(docs), "origin": self.origin})
+
+    def invalidate(self, item_id: str) -> None:
+        self._invalidate_local(item_id)
+        self._broadcast(item_id)
+
+    def _invalidate_local(self, item_id: str) -> None:
+        self._bump(item_id)
+        self._entries.pop(item_id)
+
+    def _broadcast(self, item_id: str) -> None:
+        self._publish({"type": INVALIDATE_EVENT, "itemId": item_id, "origin": self.origin})
+
+    def _publish(self, event: Dict[str, Any]) -> None:
+        if self._hub is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._hub.publish([], event))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _on_event(self, event: Dict[str, Any]) -> None:
+        if event.get("type") == INVALIDATE_EVENT and event.get("origin") != self.origin:
+            for item_id in event.get("itemIds") or [event["itemId"]]:
+                self._invalidate_local(item_id)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._versions.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._entries.stats(),
+            "negativeHits": self.negative_hits,
+            "trackedVersions": len(self._versions),
+            "highWater": self.high_water,
+        }
+
+    def _bump(self, item_id: str) -> None:
+        self._versions.put(item_id, self.version(item_id) + 1)
+        self.high_water += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@lru_cache
+def get_item_cache() -> ItemCache:
+    from .pubsub import get_hub
+
+    settings = get_settings()
+    cache = ItemCache(
+        max_size=settings.item_cache_size,
+        ttl=settings.item_cache_ttl,
+        negative_ttl=settings.item_cache_negative_ttl,
+    )
+    cache.bind(get_hub())
+    return cache
@@ -0,0 +1,172 @@
+"""
+Registro de métricas do processo (contadores, gauges e histogramas com
+labels), thread-safe.
+
+Histogramas usam buckets fixos: cada observação é um bisect e um incremento,
+e os acumulados do formato Prometheus só são calculados na exposição.
+"""
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+# Segundos: de 1 ms a 10 s (padrão dos clientes Prometheus, mais 1 ms)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Bytes: de 100 B a 10 MB
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# Limite do memo de labels normalizados (séries distintas esperadas)
+MAX_LABEL_KEYS = 10_000
+
+
+def _labels(labels: Dict[str, str]) -> LabelSet:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Histogram:
+    """Contagens por bucket (não acumuladas), soma e total de observações."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        # Último bucket é o +Inf
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Pares (le, acumulado) no formato do Prometheus."""
+        pairs, total = [], 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            pairs.append(("+Inf" if bound == float("inf") else _format_value(bound), total))
+        return pairs
+
+    def copy(self) -> "Histogram":
+        clone = Histogram(self.bounds)
+        clone.counts = list(self.counts)
+        clone.sum, clone.count = self.sum, self.count
+        return clone
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._counters: Dict[str, Dict[LabelSet, float]] = defaultdict(lambda: defaultdict(float))
+        self._gauges: Dict[str, Dict[LabelSet, float]] = defaultdict(lambda: defaultdict(float))
+        self._histograms: Dict[str, Dict[LabelSet, Histogram]] = defaultdict(dict)
+        # Labels na ordem da chamada -> LabelSet ordenado: o caminho quente
+        # (middleware) não reordena nem converte a cada requisição
+        self._label_keys: Dict[tuple, LabelSet] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelSet:
+        raw = tuple(labels.items())
+        key = self._label_keys.get(raw)
+        if key is None:
+            if len(self._label_keys) >= MAX_LABEL_KEYS:
+                self._label_keys.clear()
+            key = self._label_keys[raw] = _labels(labels)
+        return key
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        if not amount:
+            return
+        with self._lock:
+            self._counters[name][self._key(labels)] += amount
+
+    def value(self, name: str, **labels: str) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_labels(labels), 0.0)
+
+    def counters(self) -> Dict[str, Dict[LabelSet, float]]:
+        with self._lock:
+            return {name: dict(series) for name, series in self._counters.items()}
+
+    def add_gauge(self, name: str, amount: float, **labels: str) -> None:
+        """Soma (ou subtrai) de um gauge, ex.: requisições em andamento."""
+        with self._lock:
+            self._gauges[name][self._key(labels)] += amount
+
+    def gauge(self, name: str, **labels: str) -> float:
+        with self._lock:
+            return self._gauges.get(name, {}).get(_labels(labels), 0.0)
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS, **labels: str) -> None:
+        """
+        Registra uma observação no histograma. Os buckets valem a partir da
+        primeira observação de cada série.
+        """
+        with self._lock:
+            key = self._key(labels)
+            series = self._histograms[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def histogram(self, name: str, **labels: str) -> Histogram:
+        """Cópia do histograma da série (vazio se nunca observado)."""
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(_labels(labels))
+            return histogram.copy() if histogram is not None else Histogram(())
+
+    def render_prometheus(self) -> str:
+        """Exposição no formato texto do Prometheus."""
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+            histograms = {
+                name: {labels: histogram.copy() for labels, histogram in series.items()}
+                for name, series in self._histograms.items()
+            }
+        lines = []
+        for kind, families in (("counter", counters), ("gauge", gauges)):
+            for name, series in sorted(families.items()):
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for name, series in sorted(histograms.items()):
+            lines.append(f"# TYPE {name} histogram")
+            for labels, histogram in sorted(series.items()):
+                for le, total in histogram.cumulative():
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {total}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+@lru_cache
+def get_metrics() -> MetricsRegistry:
+    return MetricsRegistry()
@@ -0,0 +1,174 @@
+"""
+Perfis de requisições sob demanda, por amostragem estatística de pilhas.
+
+Uma thread auxiliar lê a pilha da thread do event loop a intervalos fixos
+(sys._current_frames) e conta as pilhas no formato "folded" (raiz;...;folha),
+que flamegraph.pl e speedscope leem direto. Não há tracing por chamada: o
+custo é o da thread amostradora, e só enquanto a requisição perfilada roda.
+
+Limitações: a amostra vê o que o event loop executa, inclusive outras
+requisições intercaladas; espera por I/O aparece como o loop parado no
+select. O intervalo efetivo sob carga de CPU é limitado pelo switch interval
+do interpretador (5 ms por padrão).
+
+Perfis ficam num buffer circular limitado e só um roda por vez.
+"""
+from __future__ import annotations
+
+import hmac
+import os
+import random
+import sys
+import threading
+import uuid
+from collections import Counter, deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from ..settings import get_settings
+
+# Profundidade máxima das pilhas guardadas (as mais profundas são truncadas na raiz)
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def fold_stack(frame, max_depth: int = MAX_STACK_DEPTH) -> str:
+    """Pilha da raiz até `frame`, no formato folded ("a;b;c")."""
+    labels = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """Thread que amostra a pilha de outra thread a cada `interval` segundos."""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[fold_stack(frame)] += 1
+            # Não prende referências aos frames da outra thread
+            del frame
+
+
+@dataclass
+class Profile:
+    id: str
+    method: str
+    path: str
+    route: str
+    status: int
+    reason: str  # "header" ou "sample"
+    startedAt: datetime
+    durationMs: float
+    intervalMs: float
+    samples: int
+    stacks: Dict[str, int] = field(default_factory=dict)
+
+    def folded(self) -> str:
+        """Uma linha "pilha contagem" por pilha, mais amostradas primeiro."""
+        ordered = sorted(self.stacks.items(), key=lambda entry: -entry[1])
+        return "".join(f"{stack} {count}\n" for stack, count in ordered)
+
+    def summary(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("stacks")
+        return data
+
+
+class Profiler:
+    """
+    Decide quais requisições perfilar (cabeçalho com o token de staff ou
+    amostragem aleatória) e guarda os perfis num buffer circular.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 50,
+        sample_rate: float = 0.0,
+        token: Optional[str] = None,
+        interval: float = 0.005,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.sample_rate = sample_rate
+        self.token = token
+        self.interval = interval
+        self._rng = rng
+        self._profiles: "deque[Profile]" = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._active = False
+
+    def reason_for(self, header: Optional[str]) -> Optional[str]:
+        """Motivo para perfilar a requisição (None: não perfilar)."""
+        if header is not None and self.token and hmac.compare_digest(header.encode(), self.token.encode()):
+            return "header"
+        if self.sample_rate > 0 and self._rng() < self.sample_rate:
+            return "sample"
+        return None
+
+    def acquire(self) -> bool:
+        """Reserva o amostrador; False se outro perfil já está em andamento."""
+        with self._lock:
+            if self._active:
+                return False
+            self._active = True
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._active = False
+
+    def new_id(self) -> str:
+        return uuid.uuid4().hex[:16]
+
+    def record(self, profile: Profile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def profiles(self) -> List[Profile]:
+        """Perfis guardados, mais recentes primeiro."""
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        with self._lock:
+            return next((profile for profile in self._profiles if profile.id == profile_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+
+
+@lru_cache
+def get_profiler() -> Profiler:
+    settings = get_settings()
+    return Profiler(
+        capacity=settings.profile_buffer_size,
+        sample_rate=settings.profile_sample_rate,
+        token=settings.profile_token,
+        interval=settings.profile_interval,
+    )
@@ -0,0 +1,262 @@
+"""
+Hub de pub/sub em processo para entrega de eventos em tempo real.
+
+Cada conexão (WebSocket) assina os eventos de um usuário e recebe uma fila
+limitada. Publicar nunca bloqueia: se o consumidor estiver lento e a fila
+encher, ela é descartada e substituída por um evento "resync", sinalizando ao
+cliente que deve recarregar as mensagens via REST.
+
+A distribuição entre workers passa por um adaptador de broadcast:
+- LocalBroadcast: entrega apenas no próprio processo (padrão)
+- PostgresBroadcast: usa LISTEN/NOTIFY para compartilhar eventos entre workers
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from ..settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+Event = Dict[str, Any]
+DeliverFn = Callable[[List[str], Event], None]
+ListenerFn = Callable[[Event], None]
+
+RESYNC_EVENT: Event = {"type": "resync"}
+
+# O Postgres rejeita payloads de NOTIFY a partir de 8000 bytes
+MAX_NOTIFY_BYTES = 7900
+
+
+class Subscription:
+    """Fila limitada de eventos de uma conexão."""
+
+    def __init__(self, uid: str, max_queue: int):
+        self.uid = uid
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def offer(self, event: Event) -> bool:
+        """
+        Enfileira sem bloquear. Se a fila estiver cheia, descarta os eventos
+        pendentes e deixa apenas um "resync". Retorna False quando houve descarte.
+        """
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.dropped += 1
+        self.queue.put_nowait(RESYNC_EVENT)
+        return False
+
+    async def get(self) -> Event:
+        return await self.queue.get()
+
+
+class LocalBroadcast:
+    """Broadcast restrito ao processo atual."""
+
+    def __init__(self):
+        self._deliver: Optional[DeliverFn] = None
+
+    async def start(self, deliver: DeliverFn) -> None:
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+    async def publish(self, uids: List[str], event: Event) -> None:
+        if self._deliver:
+            self._deliver(uids, event)
+
+
+class PostgresBroadcast:
+    """
+    Broadcast entre workers via LISTEN/NOTIFY do Postgres.
+    Todo evento (inclusive os publicados localmente) volta pelo NOTIFY,
+    então cada worker entrega apenas às suas próprias conexões.
+    """
+
+    def __init__(self, dsn: str, channel: str = "lost_found_events"):
+        self.dsn = dsn
+        self.channel = channel
+        self._deliver: Optional[DeliverFn] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listen_conn = None
+        self._publish_conn = None
+        self._publish_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    async def start(self, deliver: DeliverFn) -> None:
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        self._deliver = deliver
+        self._loop = asyncio.get_running_loop()
+
+        self._listen_conn = psycopg2.connect(self.dsn)
+        self._listen_conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with self._listen_conn.cursor() as cur:
+            cur.execute(f"LISTEN {self.channel}")
+
+        self._publish_conn = psycopg2.connect(self.dsn)
+        self._publish_conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._listen, name="pubsub-listen", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._thread:
+            await asyncio.to_thread(self._thread.join, 2.0)
+        for conn in (self._listen_conn, self._publish_conn):
+            if conn is not None:
+                conn.close()
+        self._listen_conn = self._publish_conn = None
+
+    async def publish(self, uids: List[str], event: Event) -> None:
+        payload = json.dumps({"uids": uids, "event": event}, default=str)
+        if len(payload.encode()) >= MAX_NOTIFY_BYTES:
+            payload = json.dumps({"uids": uids, "event": compact_event(event)}, default=str)
+        await asyncio.to_thread(self._notify, payload)
+
+    def _notify(self, payload: str) -> None:
+        with self._publish_lock, self._publish_conn.cursor() as cur:
+            cur.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+
+    def _listen(self) -> None:
+        conn = self._listen_conn
+        while not self._stopped.is_set():
+            if select.select([conn], [], [], 1.0) == ([], [], []):
+                continue
+            conn.poll()
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                try:
+                    data = json.loads(notify.payload)
+                except ValueError:
+                    logger.warning("Payload de broadcast inválido descartado")
+                    continue
+                self._loop.call_soon_threadsafe(self._deliver, data["uids"], data["event"])
+
+
+class PubSubHub:
+    """Roteia eventos publicados para as assinaturas de cada usuário."""
+
+    def __init__(self, broadcast=None, max_queue: int = 100):
+        self.broadcast = broadcast or LocalBroadcast()
+        self.max_queue = max_queue
+        self._subscriptions: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._listeners: List[ListenerFn] = []
+        self._started = False
+        self._start_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        async with self._start_lock:
+            if not self._started:
+                await self.broadcast.start(self._deliver_local)
+                self._started = True
+
+    async def stop(self) -> None:
+        if self._started:
+            await self.broadcast.stop()
+            self._started = False
+
+    async def subscribe(self, uid: str) -> Subscription:
+        await self.start()
+        subscription = Subscription(uid, self.max_queue)
+        self._subscriptions[uid].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subs = self._subscriptions.get(subscription.uid)
+        if subs is None:
+            return
+        subs.discard(subscription)
+        if not subs:
+            del self._subscriptions[subscription.uid]
+
+    async def publish(self, uids: Iterable[str], event: Event) -> None:
+        """
+        Entrega best-effort: falhas do broadcast são registradas e não
+        propagadas, pois o evento já foi persistido por quem publica.
+        """
+        try:
+            await self.start()
+            await self.broadcast.publish(list(uids), event)
+        except Exception:
+            logger.exception("Falha ao publicar evento %s", event.get("type"))
+
+    def add_listener(self, listener: ListenerFn) -> None:
+        """Recebe todo evento entregue a este processo (ex.: invalidação de cache)."""
+        self._listeners.append(listener)
+
+    def connection_count(self, uid: Optional[str] = None) -> int:
+        if uid is not None:
+            return len(self._subscriptions.get(uid, ()))
+        return sum(len(subs) for subs in self._subscriptions.values())
+
+    def stats(self) -> Dict[str, Any]:
+        subscriptions = [sub for subs in self._subscriptions.values() for sub in subs]
+        depths = [sub.queue.qsize() for sub in subscriptions]
+        return {
+            "broadcast": type(self.broadcast).__name__,
+            "started": self._started,
+            "users": len(self._subscriptions),
+            "connections": len(subscriptions),
+            "queueCapacity": self.max_queue,
+            "queuedEvents": sum(depths),
+            "maxQueueDepth": max(depths, default=0),
+            "dropped": sum(sub.dropped for sub in subscriptions),
+            "listeners": len(self._listeners),
+        }
+
+    def _deliver_local(self, uids: List[str], event: Event) -> None:
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("Listener de eventos falhou")
+        for uid in uids:
+            for subscription in self._subscriptions.get(uid, ()):
+                if not subscription.offer(event):
+                    logger.info("Fila de eventos cheia para %s; enviando resync", uid)
+
+
+def compact_event(event: Event) -> Event:
+    """
+    Versão reduzida de um evento de mensagem (sem o conteúdo), para canais
+    com limite de tamanho; o cliente busca a mensagem via REST.
+    """
+    message = event.get("message") or {}
+    return {
+        "type": event.get("type"),
+        "threadId": event.get("threadId"),
+        "messageId": message.get("id"),
+        "truncated": True,
+    }
+
+
+@lru_cache
+def get_hub() -> PubSubHub:
+    settings = get_settings()
+    url = settings.realtime_broadcast_url
+    if url and url.startswith(("postgres://", "postgresql://")):
+        broadcast = PostgresBroadcast(url)
+    else:
+        broadcast = LocalBroadcast()
+    return PubSubHub(broadcast, max_queue=settings.realtime_queue_size)
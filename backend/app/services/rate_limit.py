@@ -0,0 +1,187 @@
+"""
+Rate limiting por janela deslizante (sliding window counter).
+
+Cada chave guarda apenas o contador da janela atual e o da anterior; a
+estimativa é `anterior * fração_restante + atual`, então cada checagem é O(1)
+e não guarda timestamps por requisição. O estado em memória é dividido em
+shards com locks independentes e chaves ociosas são removidas periodicamente.
+
+Para vários workers, RedisRateLimiter aplica o mesmo algoritmo em um Redis
+compartilhado (configurado via `rate_limit_backend_url`).
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List
+
+from ..settings import get_settings
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    limit: int
+    window: float
+
+    @classmethod
+    def parse(cls, spec: str) -> "RateLimitRule":
+        """Converte "30/minute" (ou "30/60s") em regra."""
+        match = re.fullmatch(r"\s*(\d+)\s*/\s*(\w+)\s*", spec)
+        if not match:
+            raise ValueError(f"Invalid rate limit: {spec!r}")
+        limit, period = int(match.group(1)), match.group(2)
+        if period in _PERIODS:
+            window = _PERIODS[period]
+        elif period.endswith("s") and period[:-1].isdigit():
+            window = int(period[:-1])
+        else:
+            raise ValueError(f"Invalid rate limit period: {period!r}")
+        return cls(limit=limit, window=float(window))
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    remaining: int
+    retry_after: float = 0.0
+
+
+def _estimate(prev: int, curr: int, elapsed_fraction: float) -> float:
+    return prev * (1.0 - elapsed_fraction) + curr
+
+
+def _retry_after(prev: int, curr: int, rule: RateLimitRule, elapsed_fraction: float) -> float:
+    """Tempo até caber mais uma requisição na janela deslizante."""
+    if curr + 1 <= rule.limit and prev > 0:
+        # Ainda nesta janela, quando o peso de `prev` tiver decaído o suficiente
+        needed = 1.0 - (rule.limit - curr - 1) / prev
+        return max(0.0, needed - elapsed_fraction) * rule.window
+    # Na próxima janela `curr` vira `prev` e começa a decair
+    needed = max(0.0, 1.0 - (rule.limit - 1) / curr) if curr else 0.0
+    return (1.0 - elapsed_fraction + needed) * rule.window
+
+
+class _Shard:
+    __slots__ = ("lock", "entries", "next_sweep")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # chave -> [índice da janela, contador anterior, contador atual, último acesso]
+        self.entries: Dict[str, List[float]] = {}
+        self.next_sweep = 0.0
+
+
+class InMemoryRateLimiter:
+    """Contadores de janela deslizante em memória, particionados em shards."""
+
+    def __init__(
+        self,
+        shards: int = 16,
+        idle_ttl: float = 3600.0,
+        sweep_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._shards = [_Shard() for _ in range(shards)]
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+
+    async def hit(self, key: str, rule: RateLimitRule) -> RateLimitDecision:
+        return self.hit_sync(key, rule)
+
+    def hit_sync(self, key: str, rule: RateLimitRule) -> RateLimitDecision:
+        now = self.clock()
+        shard = self._shards[hash(key) % len(self._shards)]
+        window = int(now // rule.window)
+        elapsed = (now % rule.window) / rule.window
+
+        with shard.lock:
+            if now >= shard.next_sweep:
+                self._sweep(shard, now)
+
+            state = shard.entries.get(key)
+            if state is None:
+                state = shard.entries[key] = [window, 0, 0, now]
+            elif state[0] != window:
+                state[1] = state[2] if state[0] == window - 1 else 0
+                state[0], state[2] = window, 0
+            state[3] = now
+
+            prev, curr = int(state[1]), int(state[2])
+            if _estimate(prev, curr, elapsed) + 1 > rule.limit:
+                return RateLimitDecision(False, 0, _retry_after(prev, curr, rule, elapsed))
+
+            state[2] = curr + 1
+            remaining = int(rule.limit - _estimate(prev, curr + 1, elapsed))
+            return RateLimitDecision(True, max(0, remaining))
+
+    def _sweep(self, shard: _Shard, now: float) -> None:
+        cutoff = now - self.idle_ttl
+        idle = [key for key, state in shard.entries.items() if state[3] < cutoff]
+        for key in idle:
+            del shard.entries[key]
+        shard.next_sweep = now + self.sweep_interval
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+
+class RedisRateLimiter:
+    """Mesmo algoritmo sobre Redis, compartilhado entre workers."""
+
+    def __init__(self, url: str, prefix: str = "rl", clock: Callable[[], float] = time.time):
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "rate_limit_backend_url points to Redis but the 'redis' package is not installed"
+            ) from exc
+
+        self._redis = redis.from_url(url)
+        self.prefix = prefix
+        self.clock = clock
+
+    async def hit(self, key: str, rule: RateLimitRule) -> RateLimitDecision:
+        now = self.clock()
+        window = int(now // rule.window)
+        elapsed = (now % rule.window) / rule.window
+        curr_key = f"{self.prefix}:{key}:{window}"
+        prev_key = f"{self.prefix}:{key}:{window - 1}"
+
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.incr(curr_key)
+        pipe.expire(curr_key, int(rule.window * 2) + 1)
+        pipe.get(prev_key)
+        curr, _, prev = await pipe.execute()
+        prev = int(prev or 0)
+
+        if _estimate(prev, curr, elapsed) > rule.limit:
+            await self._redis.decr(curr_key)
+            return RateLimitDecision(False, 0, _retry_after(prev, curr - 1, rule, elapsed))
+
+        remaining = int(rule.limit - _estimate(prev, curr, elapsed))
+        return RateLimitDecision(True, max(0, remaining))
+
+
+@lru_cache
+def rate_limit_rules() -> Dict[str, RateLimitRule]:
+    settings = get_settings()
+    return {
+        "messages": RateLimitRule.parse(settings.rate_limit_messages),
+        "items": RateLimitRule.parse(settings.rate_limit_items),
+        "alerts": RateLimitRule.parse(settings.rate_limit_alerts),
+    }
+
+
+@lru_cache
+def get_rate_limiter():
+    settings = get_settings()
+    url = settings.rate_limit_backend_url
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisRateLimiter(url)
+    return InMemoryRateLimiter()
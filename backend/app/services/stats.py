@@ -0,0 +1,200 @@
+"""
+Registro interno de estatísticas por subsistema e checagens de readiness.
+
+Cada subsistema registra um provedor (síncrono ou async) que devolve um
+dicionário pequeno: tamanhos, taxas de acerto, filas, memória estimada.
+Provedores caros (contagens no store) podem ter TTL. As checagens recebem
+o snapshot coletado e devolvem o motivo de não estar pronto (ou None).
+
+A readiness é uma trava de partida: depois que todas as checagens passam
+uma vez, o worker fica pronto, e a rotatividade normal dos caches não o
+tira do balanceador.
+"""
+from __future__ import annotations
+
+import gc
+import importlib
+import inspect
+import math
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple, Union
+
+from ..settings import get_settings
+from .warmup import resolve
+
+Stats = Dict[str, Any]
+Provider = Callable[[], Union[Stats, Awaitable[Stats]]]
+Check = Callable[[Dict[str, Stats]], Optional[str]]
+
+# Entradas medidas por cache para estimar a memória (média x tamanho)
+MEMORY_SAMPLE = 32
+
+
+def deep_sizeof(obj: Any, _seen: Optional[set] = None) -> int:
+    """Tamanho aproximado (bytes) de obj e do que ele referencia."""
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def estimate_bytes(sample: Iterable[Any], total: int) -> int:
+    """Memória de `total` entradas extrapolada da média de uma amostra."""
+    sizes = [deep_sizeof(item) for item in sample]
+    return int(sum(sizes) / len(sizes) * total) if sizes else 0
+
+
+def process_stats() -> Stats:
+    rss = None
+    try:
+        with open("/proc/self/statm") as statm:
+            rss = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        # ru_maxrss em KiB no Linux
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        peak = None
+    return {
+        "pid": os.getpid(),
+        "rssBytes": rss,
+        "peakRssBytes": peak,
+        "threads": threading.active_count(),
+        "gcCounts": list(gc.get_count()),
+    }
+
+
+@dataclass
+class Readiness:
+    ready: bool
+    failing: Dict[str, str]
+    stats: Dict[str, Stats]
+
+
+class StatsRegistry:
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.ready_since: Optional[float] = None
+        self._providers: Dict[str, Tuple[Provider, Optional[float]]] = {}
+        self._cached: Dict[str, Tuple[float, Stats]] = {}
+        self._checks: Dict[str, Check] = {}
+
+    def register(self, name: str, provider: Provider, ttl: Optional[float] = None) -> None:
+        """Registra (ou substitui) o provedor de um subsistema."""
+        self._providers[name] = (provider, ttl)
+        self._cached.pop(name, None)
+
+    def add_check(self, name: str, check: Check) -> None:
+        self._checks[name] = check
+
+    async def collect(self) -> Dict[str, Stats]:
+        snapshot: Dict[str, Stats] = {}
+        for name, (provider, ttl) in self._providers.items():
+            cached = self._cached.get(name)
+            if cached is not None and self.clock() < cached[0]:
+                snapshot[name] = cached[1]
+                continue
+            try:
+                stats = provider()
+                if inspect.isawaitable(stats):
+                    stats = await stats
+            except Exception as exc:
+                # Um subsistema com defeito não esconde os demais
+                snapshot[name] = {"error": str(exc)}
+                continue
+            if ttl:
+                self._cached[name] = (self.clock() + ttl, stats)
+            snapshot[name] = stats
+        return snapshot
+
+    async def readiness(self) -> Readiness:
+        stats = await self.collect()
+        failing: Dict[str, str] = {}
+        for name, check in self._checks.items():
+            try:
+                reason = check(stats)
+            except Exception as exc:
+                reason = f"check failed: {exc}"
+            if reason:
+                failing[name] = reason
+        if not failing and self.ready_since is None:
+            self.ready_since = self.clock()
+        return Readiness(ready=self.ready_since is not None, failing=failing, stats=stats)
+
+
+def _warmup_check(stats: Dict[str, Stats]) -> Optional[str]:
+    warmup = stats["warmup"]
+    if warmup["status"] == "failed":
+        return f"warmup failed: {warmup['error']}"
+    if warmup["status"] not in ("done", "disabled"):
+        return f"warmup {warmup['status']}"
+    return None
+
+
+def _warm_cache_check(subsystem: str, found_key: str, ratio: float) -> Check:
+    """O cache precisa manter `ratio` do que o warmup encontrou no store."""
+    def check(stats: Dict[str, Stats]) -> Optional[str]:
+        warmup = stats["warmup"]
+        if warmup["status"] != "done":
+            return None
+        needed = math.ceil(warmup[found_key] * ratio)
+        size = stats[subsystem]["size"]
+        if size < needed:
+            return f"{size} entries, needs {needed}"
+        return None
+    return check
+
+
+def register_app_stats(app, registry: StatsRegistry) -> None:
+    """
+    Provedores e checagens dos subsistemas do app (chamado no lifespan).
+    Cada subsistema é resolvido na coleta: registrar não importa os módulos
+    dele (nem os modelos que eles puxam) durante o boot.
+    """
+    def subsystem(module: str, factory: str) -> Callable[[], Any]:
+        return lambda: resolve(app, getattr(importlib.import_module(module, __package__), factory))
+
+    settings = get_settings()
+    routers = getattr(app.state, "routers", None)
+    repository = subsystem("..data", "get_repository")
+    item_cache = subsystem(".item_cache", "get_item_cache")
+    thread_cache = subsystem(".thread_cache", "get_thread_cache")
+    thread_index = subsystem(".thread_index", "get_thread_index")
+    hub = subsystem(".pubsub", "get_hub")
+
+    registry.register("process", process_stats)
+    registry.register("warmup", app.state.warmup.as_dict)
+    if routers is not None:
+        registry.register("routers", lambda: {
+            "loaded": list(routers.loaded),
+            "pending": [router.module for router in routers.pending],
+        })
+    registry.register("store", lambda: repository().store.stats(), ttl=settings.stats_store_ttl)
+    registry.register("item_cache", lambda: item_cache().stats())
+    registry.register("thread_cache", lambda: thread_cache().stats())
+    registry.register("thread_index", lambda: thread_index().stats())
+    registry.register("hub", lambda: hub().stats())
+
+    registry.add_check("warmup", _warmup_check)
+    registry.add_check("item_cache", _warm_cache_check("item_cache", "itemsFound", settings.ready_min_warm_ratio))
+    registry.add_check("thread_cache", _warm_cache_check("thread_cache", "threadsFound", settings.ready_min_warm_ratio))
+
+
+@lru_cache
+def get_stats() -> StatsRegistry:
+    return StatsRegistry()
@@ -0,0 +1,57 @@
+"""
+Cache LRU dos participantes de cada thread.
+
+Participantes e item de uma thread não mudam depois da criação, então a
+verificação de participação em conversas ativas pode dispensar a leitura
+da thread no store.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, NamedTuple, Optional, Sequence
+
+from ..settings import get_settings
+from .lru import LRUCache
+
+
+class ThreadMembers(NamedTuple):
+    itemId: Optional[str]
+    participants: tuple
+
+
+class ThreadParticipantsCache:
+    """LRU limitado: thread_id -> ThreadMembers."""
+
+    def __init__(self, max_size: int = 10_000):
+        self._entries: LRUCache[ThreadMembers] = LRUCache(max_size)
+
+    @property
+    def hits(self) -> int:
+        return self._entries.hits
+
+    @property
+    def misses(self) -> int:
+        return self._entries.misses
+
+    def get(self, thread_id: str) -> Optional[ThreadMembers]:
+        return self._entries.get(thread_id)
+
+    def put(self, thread_id: str, item_id: Optional[str], participants: Sequence[str]) -> ThreadMembers:
+        return self._entries.put(thread_id, ThreadMembers(item_id, tuple(participants)))
+
+    def invalidate(self, thread_id: str) -> None:
+        self._entries.pop(thread_id)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._entries.stats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@lru_cache
+def get_thread_cache() -> ThreadParticipantsCache:
+    return ThreadParticipantsCache(max_size=get_settings().thread_cache_size)
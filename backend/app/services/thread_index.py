@@ -0,0 +1,89 @@
+"""
+Índice em memória para deduplicação de threads em create_thread.
+
+- (itemId, uid) -> Thread: a thread que o usuário já abriu para o item
+- itemId -> ownerUid: dono do item (imutável depois da criação)
+
+Toques repetidos em "falar com o dono" são respondidos sem consultas ao
+store. Criações concorrentes para o mesmo par (itemId, uid) são serializadas
+por um lock por chave, então apenas a primeira consulta/cria a thread.
+"""
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from ..models.threads import Thread
+from ..settings import get_settings
+from .lru import LRUCache
+
+ThreadKey = Tuple[str, str]
+
+
+class ThreadLookupIndex:
+    def __init__(self, max_size: int = 10_000):
+        self.threads: LRUCache[Thread] = LRUCache(max_size)
+        self.owners: LRUCache[str] = LRUCache(max_size)
+        self._keys_by_thread: LRUCache[ThreadKey] = LRUCache(max_size)
+        self._locks: Dict[ThreadKey, List] = {}
+
+    def get_owner(self, item_id: str) -> Optional[str]:
+        return self.owners.get(item_id)
+
+    def put_owner(self, item_id: str, owner_uid: str) -> None:
+        self.owners.put(item_id, owner_uid)
+
+    def get_thread(self, item_id: str, uid: str) -> Optional[Thread]:
+        thread = self.threads.get((item_id, uid))
+        return thread.copy() if thread is not None else None
+
+    def put_thread(self, uid: str, thread: Thread) -> None:
+        key = (thread.itemId, uid)
+        self.threads.put(key, thread.copy())
+        self._keys_by_thread.put(thread.id, key)
+
+    def touch(self, thread_id: str, last_message: str, updated_at: datetime) -> None:
+        """Mantém o snapshot em dia após uma nova mensagem."""
+        key = self._keys_by_thread.get(thread_id)
+        if key is None:
+            return
+        thread = self.threads.get(key)
+        if thread is not None:
+            self.threads.put(key, thread.copy(update={
+                "lastMessage": last_message,
+                "updatedAt": updated_at,
+            }))
+
+    def stats(self) -> Dict[str, Any]:
+        threads, owners = self.threads.stats(), self.owners.stats()
+        return {
+            "threads": threads,
+            "owners": owners,
+            "size": threads["size"] + owners["size"],
+            "bytes": threads["bytes"] + owners["bytes"],
+            "pendingLocks": len(self._locks),
+        }
+
+    @asynccontextmanager
+    async def lock(self, item_id: str, uid: str) -> AsyncIterator[None]:
+        """Serializa criações concorrentes do mesmo par (itemId, uid)."""
+        key = (item_id, uid)
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+
+@lru_cache
+def get_thread_index() -> ThreadLookupIndex:
+    return ThreadLookupIndex(max_size=get_settings().thread_cache_size)
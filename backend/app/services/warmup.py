@@ -0,0 +1,109 @@
+"""
+Aquecimento opcional do worker, em segundo plano após o boot.
+
+Carrega os routers preguiçosos, preenche o cache de itens e o índice de
+donos com os itens mais recentes e o cache de participantes com as threads
+mais ativas. O worker já responde (liveness) enquanto aquece; o estado fica
+em `app.state.warmup`; o /ready (ver stats.py) só passa depois que ele
+termina e os caches atingem os mínimos.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from ..settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def resolve(app, dependency: Callable[[], Any]) -> Any:
+    """Instância de uma dependency singleton, respeitando dependency_overrides."""
+    return app.dependency_overrides.get(dependency, dependency)()
+
+
+@dataclass
+class WarmupState:
+    # "pending", "running", "done", "failed" ou "disabled"
+    status: str = "pending"
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    routers: int = 0
+    # Carregados nos caches x encontrados no store
+    items: int = 0
+    items_found: int = 0
+    threads: int = 0
+    threads_found: int = 0
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed", "disabled")
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def as_dict(self) -> Dict[str, Any]:
+        duration = self.duration
+        return {
+            "status": self.status,
+            "durationMs": round(duration * 1000, 1) if duration is not None else None,
+            "routers": self.routers,
+            "items": self.items,
+            "itemsFound": self.items_found,
+            "threads": self.threads,
+            "threadsFound": self.threads_found,
+            "error": self.error,
+        }
+
+
+async def warm_up(app, state: WarmupState, items: Optional[int] = None, threads: Optional[int] = None) -> None:
+    from ..data import get_repository
+    from .item_cache import get_item_cache
+    from .thread_cache import get_thread_cache
+    from .thread_index import get_thread_index
+
+    settings = get_settings()
+    items = settings.warmup_items if items is None else items
+    threads = settings.warmup_threads if threads is None else threads
+
+    state.status = "running"
+    state.started_at = time.monotonic()
+    try:
+        loader = getattr(app.state, "routers", None)
+        if loader is not None:
+            pending = len(loader.pending)
+            loader.load_all()
+            state.routers = pending
+
+        repo = resolve(app, get_repository)
+        index = resolve(app, get_thread_index)
+        if items:
+            docs = await repo.items.query(limit=items)
+            state.items_found = len(docs)
+            state.items = resolve(app, get_item_cache).preload(docs)
+            for doc in docs:
+                index.put_owner(doc["id"], doc["ownerUid"])
+        if threads:
+            cache = resolve(app, get_thread_cache)
+            docs = await repo.threads.list(limit=threads)
+            state.threads_found = len(docs)
+            for doc in docs:
+                cache.put(doc["id"], doc.get("itemId"), doc["participants"])
+                state.threads += 1
+        state.status = "done"
+    except Exception as exc:
+        logger.exception("Warmup falhou; o worker segue sem caches aquecidos")
+        state.status = "failed"
+        state.error = str(exc)
+    finally:
+        state.finished_at = time.monotonic()
+        logger.info(
+            "Warmup %s em %.2fs: %d routers, %d itens, %d threads",
+            state.status, state.duration, state.routers, state.items, state.threads,
+        )
@@ -1,19 +1,93 @@
 from functools import lru_cache
-from typing import Optional
+from typing import Dict, Optional
 
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
 
+# Orçamentos padrão: o uso medido das rotas quentes. Listas sem limite
+# (threads) têm teto alto só para expor varreduras; o relatório diário lê
+# no máximo 25 buckets por (campus, categoria, tipo), e o de intervalo três
+# consultas (rollups mensais, diários e as horas ainda não compactadas).
+DEFAULT_STORE_BUDGETS: Dict[str, Dict[str, int]] = {
+    "GET /items": {"queries": 1, "reads": 0, "docs_streamed": 100},
+    "GET /items/{item_id}": {"reads": 1, "queries": 0},
+    "POST /items": {"writes": 2, "reads": 0, "queries": 0},
+    "GET /threads": {"queries": 1, "docs_streamed": 200},
+    "GET /threads/inbox": {"queries": 1, "docs_streamed": 100},
+    "GET /threads/{thread_id}/messages": {"reads": 1, "queries": 1, "docs_streamed": 100},
+    "POST /threads/{thread_id}/messages": {"reads": 1, "queries": 0, "writes": 4},
+    "GET /staff/reports/daily": {"queries": 1, "docs_streamed": 2000},
+    "GET /staff/reports/range": {"queries": 3, "docs_streamed": 2000},
+}
+
+
 class Settings(BaseSettings):
     project_name: str = "Lost and Found API"
     environment: str = Field(default="development")
+    # Modo debug: respostas levam o uso do store em cabeçalhos X-Store-*
+    debug: bool = False
     
     # Supabase settings (optional for backend)
     supabase_url: Optional[str] = None
     supabase_service_role_key: Optional[str] = None
     supabase_db_url: Optional[str] = None
 
+    # Armazenamento ("memory", "firestore" ou "sqlite")
+    storage_backend: str = "memory"
+    store_max_workers: int = 8
+    sqlite_path: str = "lost_found.db"
+    sqlite_pool_size: int = 4
+
+    # Tempo real (WebSocket)
+    realtime_queue_size: int = 100
+    realtime_broadcast_url: Optional[str] = None
+    thread_cache_size: int = 10_000
+
+    # Cache de itens (segundos; negative_ttl 0 desativa o cache de 404).
+    # Invalidações chegam aos outros workers só com realtime_broadcast_url;
+    # sem ele, o TTL é o atraso máximo entre workers.
+    item_cache_size: int = 10_000
+    item_cache_ttl: float = 30.0
+    item_cache_negative_ttl: float = 10.0
+
+    # Cadastro em lote no balcão (POST /items/batch)
+    item_batch_max_size: int = 100
+
+    # Orçamento de uso do store por rota ("MÉTODO /template" -> limites de
+    # reads, writes, queries, docs_streamed, round_trips por requisição).
+    # Violações são logadas e contadas em store_budget_violations_total.
+    store_budgets: Dict[str, Dict[str, int]] = Field(default_factory=lambda: dict(DEFAULT_STORE_BUDGETS))
+
+    # Rate limiting ("N/second|minute|hour|day")
+    rate_limit_messages: str = "30/minute"
+    rate_limit_items: str = "20/hour"
+    rate_limit_alerts: str = "20/hour"
+    rate_limit_backend_url: Optional[str] = None
+
+    # Perfis sob demanda: cabeçalho X-Profile com o token (staff) ou
+    # amostragem aleatória (fração; 0 desativa). Intervalo em segundos.
+    profile_token: Optional[str] = None
+    profile_sample_rate: float = 0.0
+    profile_interval: float = 0.005
+    profile_buffer_size: int = 50
+
+    # Cold start: routers importados na primeira requisição sob o prefixo
+    # (false importa todos no create_app). O warmup opcional carrega os
+    # routers e pré-aquece caches em segundo plano após o boot.
+    lazy_routers: bool = True
+    warmup: bool = False
+    warmup_items: int = 1000
+    warmup_threads: int = 1000
+    # /ready: pronto só com o warmup concluído e os caches guardando ao menos
+    # esta fração do que ele encontrou no store. Contagens do store no /ready
+    # são reaproveitadas por stats_store_ttl segundos.
+    ready_min_warm_ratio: float = 0.9
+    stats_store_ttl: float = 30.0
+    # Relatórios: buckets por hora dos últimos N dias ficam sem compactar
+    # (o relatório diário lê as últimas 24h deles)
+    report_keep_hours_days: int = 2
+
     class Config:
         env_file = "../.env"
         env_file_encoding = "utf-8"
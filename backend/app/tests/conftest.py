@@ -0,0 +1,70 @@
+"""
+Fixtures compartilhadas: app com store isolado por teste (memória e SQLite).
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.data import InMemoryStore, Repository, get_repository
+from app.data.sqlite import SQLiteStore
+from app.dependencies.auth import AuthenticatedUser, get_current_user
+from app.main import create_app
+from app.services.item_cache import ItemCache, get_item_cache
+from app.services.metrics import MetricsRegistry, get_metrics
+from app.services.profiling import Profiler, get_profiler
+from app.services.pubsub import PubSubHub, get_hub
+from app.services.rate_limit import InMemoryRateLimiter, get_rate_limiter
+from app.services.stats import StatsRegistry, get_stats
+from app.services.thread_cache import ThreadParticipantsCache, get_thread_cache
+from app.services.thread_index import ThreadLookupIndex, get_thread_index
+
+
+class ApiClient(TestClient):
+    """TestClient que permite trocar o usuário autenticado."""
+
+    def as_user(self, uid: str, role: str = "user") -> "ApiClient":
+        user = AuthenticatedUser(uid=uid, email=f"{uid}@undf.edu.br", role=role)
+        self.app.dependency_overrides[get_current_user] = lambda: user
+        return self
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repo(request, tmp_path):
+    if request.param == "memory":
+        yield Repository(InMemoryStore())
+        return
+    store = SQLiteStore(str(tmp_path / "test.db"), pool_size=2)
+    yield Repository(store)
+    asyncio.run(store.close())
+
+
+@pytest.fixture
+def app(repo):
+    app = create_app()
+    hub = PubSubHub()
+    cache = ThreadParticipantsCache()
+    index = ThreadLookupIndex()
+    limiter = InMemoryRateLimiter()
+    metrics = MetricsRegistry()
+    item_cache = ItemCache()
+    profiler = Profiler()
+    stats = StatsRegistry()
+    app.dependency_overrides.update({
+        get_repository: lambda: repo,
+        get_hub: lambda: hub,
+        get_thread_cache: lambda: cache,
+        get_thread_index: lambda: index,
+        get_rate_limiter: lambda: limiter,
+        get_metrics: lambda: metrics,
+        get_item_cache: lambda: item_cache,
+        get_profiler: lambda: profiler,
+        get_stats: lambda: stats,
+    })
+    return app
+
+
+@pytest.fixture
+def client(app):
+    with ApiClient(app) as client:
+        yield client.as_user("alice")
@@ -0,0 +1,293 @@
+"""
+Testes de ponta a ponta das rotas sobre o store em memória
+"""
+import asyncio
+
+import pytest
+
+ITEM = {
+    "type": "FOUND",
+    "title": "iPhone 13 Pro Azul",
+    "description": "Encontrado na biblioteca",
+    "category": "Eletrônicos",
+    "tags": ["iphone", "apple"],
+    "campusId": "campus-darcy-ribeiro",
+    "buildingId": "bce",
+    "geo": {"lat": -15.7640, "lng": -47.8690},
+}
+
+
+def create_item(client, **overrides):
+    response = client.post("/items", json={**ITEM, **overrides})
+    assert response.status_code == 201
+    return response.json()
+
+
+class TestItems:
+    """Testes para as rotas de itens"""
+
+    def test_create_and_get(self, client):
+        """Item criado deve ter campos de busca e ser recuperável"""
+        item = create_item(client)
+        assert item["ownerUid"] == "alice"
+        assert item["title_n"] == "iphone 13 pro azul"
+        assert item["geo"]["geohash"]
+
+        response = client.get(f"/items/{item['id']}")
+        assert response.status_code == 200
+        assert response.json()["title"] == ITEM["title"]
+
+    def test_get_missing(self, client):
+        assert client.get("/items/nao-existe").status_code == 404
+
+    def test_list_filters_and_search(self, client):
+        """Filtros e busca textual devem restringir a lista"""
+        create_item(client)
+        create_item(client, title="Carteira de Couro", tags=["carteira"], campusId="campus-gama")
+
+        campus = client.get("/items", params={"campusId": "campus-gama"}).json()
+        assert [i["title"] for i in campus] == ["Carteira de Couro"]
+
+        found = client.get("/items", params={"q": "iphone"}).json()
+        assert [i["title"] for i in found] == [ITEM["title"]]
+
+    def test_list_defaults_to_cards(self, client):
+        """Listagem padrão não deve carregar os campos internos de busca"""
+        create_item(client)
+
+        card = client.get("/items").json()[0]
+        assert card["title"] == ITEM["title"]
+        assert not {"ngrams", "title_n", "desc_n", "tags_n"} & set(card)
+
+        full = client.get("/items", params={"fields": "full"}).json()[0]
+        assert full["ngrams"] and full["title_n"] == "iphone 13 pro azul"
+
+    def test_list_sparse_fields(self, client):
+        """fields= deve devolver só os campos pedidos, inclusive com busca"""
+        item = create_item(client)
+
+        listed = client.get("/items", params={"fields": "title,status", "q": "iphone"}).json()
+        assert listed == [{"id": item["id"], "title": ITEM["title"], "status": "OPEN"}]
+
+        assert client.get("/items", params={"fields": "title,senha"}).status_code == 400
+
+    def test_list_schema_in_openapi(self, client):
+        """A resposta sai direto pelo orjson, mas o schema continua documentado"""
+        response = client.get("/openapi.json").json()["paths"]["/items"]["get"]["responses"]["200"]
+
+        schema = response["content"]["application/json"]["schema"]
+        assert schema["type"] == "array"
+        assert schema["items"] == {"$ref": "#/components/schemas/Item"}
+
+    def test_update_requires_owner(self, client):
+        """Apenas o dono pode editar"""
+        item = create_item(client)
+        response = client.as_user("bob").patch(f"/items/{item['id']}", json={"title": "Outro"})
+        assert response.status_code == 403
+
+        response = client.as_user("alice").patch(f"/items/{item['id']}", json={"title": "Outro"})
+        assert response.status_code == 200
+        assert response.json()["title_n"] == "outro"
+
+
+class TestItemBatch:
+    """Testes para o cadastro em lote do balcão"""
+
+    def test_batch_reports_each_item(self, client):
+        """Itens válidos são gravados mesmo com inválidos no mesmo lote"""
+        staff = client.as_user("desk", "staff")
+        response = staff.post("/items/batch", json={"items": [
+            ITEM,
+            {**ITEM, "title": "Carteira Preta", "tags": ["carteira", "apple"]},
+            {**ITEM, "type": "ACHADO"},
+        ]})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["created"], body["failed"]) == (2, 1)
+        assert [r["status"] for r in body["results"]] == [201, 201, 422]
+        assert body["results"][2]["error"].startswith("type:")
+
+        stored = staff.get(f"/items/{body['results'][1]['id']}").json()
+        assert stored["ownerUid"] == "desk"
+        assert stored["tags_n"] == ["carteira", "apple"]
+        assert stored["geo"]["geohash"]
+        assert {"car", "app"} <= set(stored["ngrams"])
+
+    def test_batch_requires_staff_and_limits_size(self, client, monkeypatch):
+        assert client.post("/items/batch", json={"items": [ITEM]}).status_code == 403
+
+        from app.settings import get_settings
+        monkeypatch.setattr(get_settings(), "item_batch_max_size", 2)
+        response = client.as_user("desk", "staff").post("/items/batch", json={"items": [ITEM] * 3})
+        assert response.status_code == 413
+
+    def test_batch_reports_partial_commit(self, client, repo, monkeypatch):
+        """Falha depois do primeiro commit: os itens já gravados seguem 201"""
+        from app.data.base import MAX_COMMIT_WRITES
+        from app.settings import get_settings
+        step = MAX_COMMIT_WRITES // 2
+        monkeypatch.setattr(get_settings(), "item_batch_max_size", step + 10)
+        commit = repo.store.commit
+        calls = []
+
+        async def failing_commit(writes):
+            calls.append(len(writes))
+            if len(calls) > 1:
+                raise ConnectionError("store indisponível")
+            await commit(writes)
+
+        monkeypatch.setattr(repo.store, "commit", failing_commit)
+        body = client.as_user("desk", "staff").post("/items/batch", json={"items": [ITEM] * (step + 10)}).json()
+        monkeypatch.undo()
+
+        assert (body["created"], body["failed"]) == (step, 10)
+        saved = [result["id"] for result in body["results"] if result["status"] == 201]
+        assert all(result["status"] == 503 for result in body["results"][step:])
+        assert len(asyncio.run(repo.items.get_many(saved))) == step
+        assert client.get(f"/items/{saved[0]}").status_code == 200
+
+
+class TestThreads:
+    """Testes para threads, mensagens e inbox"""
+
+    def test_create_thread_is_idempotent(self, client):
+        """Contatar o dono duas vezes deve reutilizar a thread"""
+        item = create_item(client)
+        bob = client.as_user("bob")
+        first = bob.post(f"/threads/items/{item['id']}/threads").json()
+        second = bob.post(f"/threads/items/{item['id']}/threads").json()
+        assert first["id"] == second["id"]
+        assert set(first["participants"]) == {"alice", "bob"}
+
+    def test_cannot_contact_yourself(self, client):
+        item = create_item(client)
+        assert client.post(f"/threads/items/{item['id']}/threads").status_code == 400
+
+    def test_message_flow_updates_inbox(self, client):
+        """Mensagens devem atualizar thread e contadores da inbox"""
+        item = create_item(client)
+        thread = client.as_user("bob").post(f"/threads/items/{item['id']}/threads").json()
+
+        for text in ["Oi, é meu!", "Posso buscar amanhã?"]:
+            response = client.post(f"/threads/{thread['id']}/messages", json={"content": text})
+            assert response.status_code == 201
+
+        messages = client.get(f"/threads/{thread['id']}/messages").json()
+        assert [m["content"] for m in messages] == ["Posso buscar amanhã?", "Oi, é meu!"]
+
+        inbox = client.as_user("alice").get("/threads/inbox").json()
+        assert inbox[0]["threadId"] == thread["id"]
+        assert inbox[0]["unread"] == 2
+        assert inbox[0]["lastMessage"] == "Posso buscar amanhã?"
+
+        sender_inbox = client.as_user("bob").get("/threads/inbox").json()
+        assert sender_inbox[0]["unread"] == 0
+
+        threads = client.as_user("alice").get("/threads").json()
+        assert threads[0]["lastMessage"] == "Posso buscar amanhã?"
+
+    def test_mark_read(self, client):
+        """Marcar como lido deve zerar contador e atualizar mensagens"""
+        item = create_item(client)
+        thread = client.as_user("bob").post(f"/threads/items/{item['id']}/threads").json()
+        client.post(f"/threads/{thread['id']}/messages", json={"content": "Oi"})
+
+        response = client.as_user("alice").post("/threads/read", json={"threadIds": [thread["id"]]})
+        assert response.status_code == 204
+
+        assert client.get("/threads/inbox").json()[0]["unread"] == 0
+        assert all(m["read"] for m in client.get(f"/threads/{thread['id']}/messages").json())
+
+    def test_mark_read_conflict(self, client, monkeypatch):
+        """Conflitos em todas as tentativas viram 409, não 204"""
+        from app.data import MessageRepository, PreconditionFailed
+        item = create_item(client)
+        thread = client.as_user("bob").post(f"/threads/items/{item['id']}/threads").json()
+        client.post(f"/threads/{thread['id']}/messages", json={"content": "Oi"})
+
+        async def contended(self, uid, thread_ids):
+            raise PreconditionFailed("messages")
+
+        monkeypatch.setattr(MessageRepository, "mark_read", contended)
+        response = client.as_user("alice").post("/threads/read", json={"threadIds": [thread["id"]]})
+
+        assert response.status_code == 409
+        assert client.get("/threads/inbox").json()[0]["unread"] == 1
+
+    def test_non_participant_is_rejected(self, client):
+        item = create_item(client)
+        thread = client.as_user("bob").post(f"/threads/items/{item['id']}/threads").json()
+        carol = client.as_user("carol")
+        assert carol.post(f"/threads/{thread['id']}/messages", json={"content": "x"}).status_code == 403
+        assert carol.get(f"/threads/{thread['id']}/messages").status_code == 403
+        assert carol.post("/threads/read", json={"threadIds": [thread["id"]]}).status_code == 403
+
+    def test_websocket_receives_messages(self, client):
+        """Participantes conectados devem receber a mensagem por push"""
+        item = create_item(client)
+        thread = client.as_user("bob").post(f"/threads/items/{item['id']}/threads").json()
+
+        with client.as_user("alice").websocket_connect("/threads/ws") as ws:
+            client.as_user("bob").post(f"/threads/{thread['id']}/messages", json={"content": "Oi"})
+            event = ws.receive_json()
+
+        assert event["type"] == "message"
+        assert event["threadId"] == thread["id"]
+        assert event["message"]["content"] == "Oi"
+
+    def test_send_survives_broadcast_failure(self, app, client):
+        """Mensagem já gravada não deve virar 500 se o broadcast falhar"""
+        from app.services.pubsub import PubSubHub, get_hub
+
+        class FailingBroadcast:
+            async def start(self, deliver):
+                pass
+
+            async def publish(self, uids, event):
+                raise ConnectionError("broadcast indisponível")
+
+        hub = PubSubHub(FailingBroadcast())
+        app.dependency_overrides[get_hub] = lambda: hub
+
+        item = create_item(client)
+        thread = client.as_user("bob").post(f"/threads/items/{item['id']}/threads").json()
+        response = client.post(f"/threads/{thread['id']}/messages", json={"content": "Oi"})
+        assert response.status_code == 201
+        assert len(client.get(f"/threads/{thread['id']}/messages").json()) == 1
+
+
+class TestAlerts:
+    """Testes para as rotas de alertas"""
+
+    def test_crud(self, client):
+        alert = client.post("/alerts", json={"queryText": "iphone"}).json()
+        assert [a["id"] for a in client.get("/alerts").json()] == [alert["id"]]
+
+        updated = client.patch(f"/alerts/{alert['id']}", json={"active": False}).json()
+        assert updated["active"] is False
+
+        assert client.as_user("bob").delete(f"/alerts/{alert['id']}").status_code == 403
+        assert client.as_user("alice").delete(f"/alerts/{alert['id']}").status_code == 204
+        assert client.get("/alerts").json() == []
+
+
+class TestStaff:
+    """Testes para as rotas de staff"""
+
+    def test_requires_staff(self, client):
+        assert client.get("/staff/reports/daily").status_code == 403
+
+    def test_daily_report(self, client):
+        item = create_item(client)
+        client.patch(f"/items/{item['id']}", json={"status": "RESOLVED"})
+        create_item(client)
+
+        report = client.as_user("staff-1", role="staff").get("/staff/reports/daily").json()
+        assert report["total"] == 2
+        assert report["resolved"] == 1
+        assert report["resolutionRate"] == 50.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,123 @@
+"""
+Testes para escritas em lote e cache de participantes
+"""
+import asyncio
+
+import pytest
+from app.data import CommitTooLarge
+from app.data.base import MAX_COMMIT_WRITES, Write
+from app.data.firestore import FirestoreStore
+from app.firebase import BatchWriter, batched_writes
+from app.services.thread_cache import ThreadParticipantsCache
+
+
+class FakeBatch:
+    def __init__(self, log):
+        self.log = log
+        self.ops = []
+
+    def set(self, ref, data, merge=False):
+        self.ops.append(("set", ref, data))
+
+    def update(self, ref, data):
+        self.ops.append(("update", ref, data))
+
+    def delete(self, ref):
+        self.ops.append(("delete", ref))
+
+    def commit(self):
+        self.log.append(self.ops)
+
+
+class FakeDb:
+    def __init__(self):
+        self.commits = []
+
+    def batch(self):
+        return FakeBatch(self.commits)
+
+
+class TestBatchWriter:
+    """Testes para o agrupamento de escritas"""
+
+    def test_single_commit_on_exit(self):
+        """Todas as escritas do bloco devem sair em um único commit"""
+        db = FakeDb()
+        with batched_writes(db) as batch:
+            batch.set("messages/1", {"content": "oi"})
+            batch.update("threads/1", {"lastMessage": "oi"})
+            batch.set("inbox/1", {"unread": 1}, merge=True)
+        assert len(db.commits) == 1
+        assert len(db.commits[0]) == 3
+
+    def test_no_commit_on_error(self):
+        """Exceção dentro do bloco não deve gravar nada"""
+        db = FakeDb()
+        with pytest.raises(RuntimeError):
+            with batched_writes(db) as batch:
+                batch.set("messages/1", {"content": "oi"})
+                raise RuntimeError("falha")
+        assert db.commits == []
+
+    def test_refuses_more_than_max_ops(self):
+        """Acima do limite recusa o bloco inteiro em vez de dividir"""
+        db = FakeDb()
+        with pytest.raises(CommitTooLarge):
+            with batched_writes(db, max_ops=2) as batch:
+                for i in range(3):
+                    batch.delete(f"doc/{i}")
+        assert db.commits == []
+
+        writer = BatchWriter(db, max_ops=2)
+        writer.delete("doc/0")
+        writer.delete("doc/1")
+        writer.commit()
+        assert [len(ops) for ops in db.commits] == [2]
+
+    def test_empty_block_does_not_commit(self):
+        """Bloco vazio não deve gerar round trip"""
+        db = FakeDb()
+        with batched_writes(db):
+            pass
+        assert db.commits == []
+
+
+class TestFirestoreCommitLimit:
+    """FirestoreStore não deve dividir um commit silenciosamente"""
+
+    def test_oversized_commit_is_rejected(self):
+        db = FakeDb()
+        store = FirestoreStore(client=db)
+        writes = [Write("delete", "items", f"i{i}") for i in range(MAX_COMMIT_WRITES + 1)]
+        with pytest.raises(CommitTooLarge):
+            asyncio.run(store.commit(writes))
+        assert db.commits == []
+
+
+class TestThreadParticipantsCache:
+    """Testes para o cache de participantes"""
+
+    def test_hit_and_miss(self):
+        """Deve contar acertos e falhas"""
+        cache = ThreadParticipantsCache(max_size=10)
+        assert cache.get("t1") is None
+        cache.put("t1", "item-1", ["a", "b"])
+        members = cache.get("t1")
+        assert members.participants == ("a", "b")
+        assert members.itemId == "item-1"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_lru_eviction(self):
+        """Deve descartar a thread menos usada recentemente"""
+        cache = ThreadParticipantsCache(max_size=2)
+        cache.put("t1", None, ["a"])
+        cache.put("t2", None, ["b"])
+        cache.get("t1")
+        cache.put("t3", None, ["c"])
+        assert cache.get("t2") is None
+        assert cache.get("t1") is not None
+        assert len(cache) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,50 @@
+"""
+Testes para a suíte de micro-benchmarks (comparação com o baseline)
+"""
+import pytest
+
+from app.benchmarks import CASES, Result, compare, load_baseline
+from app.benchmarks.runner import measure_alloc, measure_ops
+
+
+BASELINE = {"utils.x": {"ops_per_sec": 1000.0, "relative": 2.0, "alloc_peak_bytes": 10_000}}
+
+
+def result(relative=2.0, alloc=10_000):
+    return {"utils.x": Result("utils.x", relative * 500, relative, alloc)}
+
+
+class TestCompare:
+    """Testes para a detecção de regressões"""
+
+    def test_within_threshold(self):
+        assert compare(result(relative=1.7, alloc=12_000), BASELINE, threshold=0.2) == []
+
+    def test_throughput_regression(self):
+        regressions = compare(result(relative=1.5), BASELINE, threshold=0.2)
+        assert [(r.name, r.metric) for r in regressions] == [("utils.x", "relative")]
+
+    def test_allocation_regression(self):
+        regressions = compare(result(alloc=13_000), BASELINE, threshold=0.2)
+        assert [r.metric for r in regressions] == ["alloc_peak_bytes"]
+
+    def test_per_case_threshold_and_missing_baseline(self):
+        assert compare(result(relative=1.5), BASELINE, 0.2, {"utils.x": 0.3}) == []
+        assert compare(result(relative=0.1), {}, 0.2) == []
+
+
+class TestSuite:
+    def test_baseline_covers_all_cases(self):
+        assert set(load_baseline()) == {case.name for case in CASES}
+
+    def test_measurements(self):
+        assert measure_ops(lambda: sum(range(10)), repeat=2, min_time=0.001) > 0
+        assert measure_alloc(lambda: [0] * 10_000) >= 80_000
+
+    @pytest.mark.parametrize("case", [c for c in CASES if c.name.startswith("utils.")], ids=lambda c: c.name)
+    def test_cases_run(self, case):
+        case.setup()()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
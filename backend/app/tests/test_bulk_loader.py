@@ -0,0 +1,146 @@
+"""
+Testes para a carga em massa (scripts/bulk_loader)
+"""
+import asyncio
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from app.data import InMemoryStore
+from app.scripts.bulk_loader import (
+    BulkLoader,
+    BulkLoadError,
+    Checkpoint,
+    Progress,
+    prepare_item,
+    read_csv,
+    with_ids,
+)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def records(count):
+    return with_ids(({"title": f"Item {n}", "tags": ["garrafa"]} for n in range(count)), "teste")
+
+
+def quiet(label="items"):
+    return Progress(label, out=io.StringIO())
+
+
+class FailingStore(InMemoryStore):
+    """Store que falha a partir do N-ésimo commit em lote."""
+
+    def __init__(self, fail_after):
+        super().__init__()
+        self.fail_after = fail_after
+        self.calls = 0
+
+    async def commit(self, writes):
+        self.calls += 1
+        if self.calls > self.fail_after:
+            raise ConnectionError("store indisponível")
+        await super().commit(writes)
+
+
+class TestBulkLoader:
+    """Testes para lotes, workers e checkpoint"""
+
+    def test_loads_all_records_in_batches(self):
+        store = InMemoryStore()
+        loader = BulkLoader(store, "items", batch_size=7, workers=3, progress=quiet(), prepare=prepare_item)
+
+        written = run(loader.load(records(50)))
+
+        assert written == 50
+        assert store.count("items") == 50
+        doc = run(store.query("items", limit=1))[0]
+        assert doc["title_n"].startswith("item ") and "gar" in doc["ngrams"]
+
+    def test_resumes_from_checkpoint(self, tmp_path):
+        """Falha no meio da carga: a nova execução grava só o que faltou"""
+        checkpoint = tmp_path / "items.ckpt"
+        store = FailingStore(fail_after=3)
+        loader = BulkLoader(
+            store, "items", batch_size=10, workers=1, retries=2, backoff=0,
+            checkpoint=checkpoint, progress=quiet(),
+        )
+
+        with pytest.raises(BulkLoadError):
+            run(loader.load(records(100), source="lote.jsonl"))
+        assert json.loads(checkpoint.read_text())["recordsDone"] == 30
+
+        store.fail_after = float("inf")
+        resumed = BulkLoader(store, "items", batch_size=10, workers=4, checkpoint=checkpoint, progress=quiet())
+        assert run(resumed.load(records(100), source="lote.jsonl")) == 70
+        assert store.count("items") == 100
+
+    def test_collection_template(self):
+        """Registros de subcoleções vão para a coleção do próprio documento"""
+        store = InMemoryStore()
+        docs = with_ids(({"threadId": f"t{n % 2}", "content": "oi"} for n in range(5)), "msgs")
+        loader = BulkLoader(store, "threads/{threadId}/messages", batch_size=3, progress=quiet())
+
+        run(loader.load(docs))
+
+        assert store.count("threads/t0/messages") == 3
+        assert store.count("threads/t1/messages") == 2
+
+    def test_checkpoint_from_other_source_is_rejected(self, tmp_path):
+        path = tmp_path / "items.ckpt"
+        Checkpoint(path, "items", "a.jsonl", 500, 2).save()
+        with pytest.raises(ValueError):
+            Checkpoint.open(path, "items", "b.jsonl", 500)
+
+    def test_generated_ids_are_stable(self):
+        """Ids derivados da posição permitem retomar sem duplicar"""
+        assert [doc_id for doc_id, _ in records(3)] == [doc_id for doc_id, _ in records(3)]
+
+
+class TestInputs:
+    def test_read_csv(self, tmp_path):
+        path = tmp_path / "itens.csv"
+        path.write_text(
+            "title,tags,lat,lng,createdAt,spot\n"
+            "Chave,chaves|unb,-15.76,-47.87,2024-05-10T12:00:00,\n",
+            encoding="utf-8",
+        )
+
+        doc = prepare_item(next(read_csv(path)))
+
+        assert doc["tags"] == ["chaves", "unb"]
+        assert doc["geo"]["geohash"]
+        assert doc["createdAt"].year == 2024
+        assert "spot" not in doc
+
+    def test_timestamps_are_naive_utc(self):
+        doc = prepare_item({"title": "Chave", "createdAt": "2024-05-10T12:00:00Z",
+                            "resolvedAt": "2024-05-10T10:30:00-03:00"})
+
+        assert doc["createdAt"] == datetime(2024, 5, 10, 12, 0)
+        assert doc["resolvedAt"] == datetime(2024, 5, 10, 13, 30)
+
+    def test_loaded_items_mix_with_api_items(self, repo):
+        """Itens carregados e criados pela API se comparam nas consultas e relatórios"""
+        loaded = [{"id": f"hist-{n}", "title": "Chave", "campusId": "campus-gama",
+                   "createdAt": f"2024-05-10T1{n}:00:00Z"} for n in range(3)]
+        loader = BulkLoader(repo.store, "items", progress=quiet(), prepare=prepare_item)
+        run(loader.load((doc["id"], doc) for doc in loaded))
+        run(repo.reports.reconcile())
+        run(repo.items.create("novo", {"title": "Garrafa", "campusId": "campus-gama", "createdAt": datetime.utcnow()}))
+
+        newest = run(repo.items.query(campus_id="campus-gama"))
+        recent = run(repo.items.query(created_after=datetime(2024, 5, 10, 11)))
+
+        assert [doc["id"] for doc in newest] == ["novo", "hist-2", "hist-1", "hist-0"]
+        assert {doc["id"] for doc in recent} == {"novo", "hist-1", "hist-2"}
+        assert run(repo.reports.hours(datetime(2024, 5, 10)))
+        assert run(repo.reports.reconcile(fix=False)) == {}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,126 @@
+"""
+Testes para atualizações condicionais (If-Match / 412) de itens e alertas,
+executados sobre os stores em memória e SQLite
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+ITEM = {
+    "type": "LOST",
+    "title": "Mochila Cinza",
+    "description": "Esquecida no RU",
+    "category": "Acessórios",
+    "campusId": "campus-darcy-ribeiro",
+    "buildingId": "ru",
+}
+
+
+@pytest.fixture
+def item(client):
+    return client.post("/items", json=ITEM).json()
+
+
+class TestItemIfMatch:
+    """Testes de If-Match em PATCH /items/{id}"""
+
+    def test_matching_version(self, client, item):
+        """If-Match com a versão atual aplica a edição e incrementa a versão"""
+        assert item["version"] == 1
+        response = client.patch(f"/items/{item['id']}", json={"title": "Mochila"}, headers={"If-Match": '"1"'})
+        assert response.status_code == 200
+        assert response.json()["version"] == 2
+        assert response.json()["description"] == ITEM["description"]
+        assert response.headers["ETag"] == '"2"'
+
+    def test_stale_version(self, client, item):
+        """If-Match antigo recebe 412 e não altera o item"""
+        client.patch(f"/items/{item['id']}", json={"title": "A"}, headers={"If-Match": '"1"'})
+        response = client.patch(f"/items/{item['id']}", json={"title": "B"}, headers={"If-Match": '"1"'})
+        assert response.status_code == 412
+        assert client.get(f"/items/{item['id']}").json()["title"] == "A"
+
+    @pytest.mark.parametrize("header", ['W/"1"', "1", '"abc"', '"1", "2"'])
+    def test_malformed_header(self, client, item, header):
+        response = client.patch(f"/items/{item['id']}", json={"title": "B"}, headers={"If-Match": header})
+        assert response.status_code == 412
+
+    def test_without_if_match(self, client, item):
+        """Sem If-Match a edição é aplicada sobre a versão mais recente"""
+        client.patch(f"/items/{item['id']}", json={"title": "A"})
+        assert client.patch(f"/items/{item['id']}", json={"spot": "Mesa 3"}).json()["version"] == 3
+
+    def test_concurrent_patches(self, client, item):
+        """Dois PATCHes com a mesma versão: um aplica, o outro recebe 412"""
+        def patch(title):
+            return client.patch(
+                f"/items/{item['id']}", json={"title": title}, headers={"If-Match": '"1"'}
+            ).status_code
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            codes = sorted(pool.map(patch, ["A", "B"]))
+
+        assert codes == [200, 412]
+        assert client.get(f"/items/{item['id']}").json()["version"] == 2
+
+    def test_external_write_is_not_overwritten(self, client, repo, item):
+        """Escrita de outra instância invalida a versão em cache"""
+        client.get(f"/items/{item['id']}")
+        client.portal.call(repo.items.update, item["id"], {"title": "Externo", "version": 2})
+
+        assert client.patch(
+            f"/items/{item['id']}", json={"spot": "Balcão"}, headers={"If-Match": '"1"'}
+        ).status_code == 412
+        response = client.patch(f"/items/{item['id']}", json={"spot": "Balcão"}, headers={"If-Match": '"2"'})
+        assert response.status_code == 200
+        assert response.json()["title"] == "Externo"
+
+    def test_desk_receive_bumps_version(self, client, item):
+        """Recebimento no balcão invalida If-Match obtido antes dele"""
+        staff = client.as_user("staff-1", role="staff")
+        assert staff.post(f"/staff/items/{item['id']}/receive").status_code == 200
+
+        response = client.as_user("alice").patch(
+            f"/items/{item['id']}", json={"title": "B"}, headers={"If-Match": '"1"'}
+        )
+        assert response.status_code == 412
+        assert client.get(f"/items/{item['id']}").json()["version"] == 2
+
+
+class TestAlertIfMatch:
+    """Testes de If-Match em PATCH /alerts/{id}"""
+
+    def test_matching_and_stale(self, client):
+        alert = client.post("/alerts", json={"queryText": "mochila"}).json()
+        assert alert["version"] == 1
+
+        response = client.patch(f"/alerts/{alert['id']}", json={"active": False}, headers={"If-Match": '"1"'})
+        assert response.status_code == 200
+        assert response.json()["version"] == 2
+        assert response.json()["queryText"] == "mochila"
+        assert response.headers["ETag"] == '"2"'
+
+        stale = client.patch(f"/alerts/{alert['id']}", json={"active": True}, headers={"If-Match": '"1"'})
+        assert stale.status_code == 412
+
+    def test_malformed_header(self, client):
+        alert = client.post("/alerts", json={"queryText": "mochila"}).json()
+        response = client.patch(f"/alerts/{alert['id']}", json={"active": False}, headers={"If-Match": "x"})
+        assert response.status_code == 412
+
+    def test_concurrent_patches(self, client):
+        alert = client.post("/alerts", json={"queryText": "mochila"}).json()
+
+        def patch(active):
+            return client.patch(
+                f"/alerts/{alert['id']}", json={"active": active}, headers={"If-Match": '"1"'}
+            ).status_code
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            codes = sorted(pool.map(patch, [False, True]))
+
+        assert codes == [200, 412]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,108 @@
+"""
+Testes para o store de documentos em memória
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from app.data import CommitTooLarge, DocumentNotFound, InMemoryStore, Increment
+from app.data.base import MAX_COMMIT_WRITES
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestInMemoryStore:
+    """Testes para leitura, escrita e consultas"""
+
+    def test_add_and_get(self):
+        """Documento lido deve trazer o id"""
+        async def scenario():
+            store = InMemoryStore()
+            doc_id = await store.add("items", {"title": "iPhone"})
+            return doc_id, await store.get("items", doc_id)
+
+        doc_id, doc = run(scenario())
+        assert doc == {"title": "iPhone", "id": doc_id}
+
+    def test_reads_are_copies(self):
+        """Alterar o retorno não deve alterar o store"""
+        async def scenario():
+            store = InMemoryStore()
+            await store.set("items", "a", {"tags": ["x"]})
+            doc = await store.get("items", "a")
+            doc["tags"].append("y")
+            return await store.get("items", "a")
+
+        assert run(scenario())["tags"] == ["x"]
+
+    def test_query_filters_order_and_limit(self):
+        """Consultas devem filtrar, ordenar e limitar"""
+        now = datetime.utcnow()
+
+        async def scenario():
+            store = InMemoryStore()
+            for i in range(5):
+                await store.set("items", f"i{i}", {
+                    "campusId": "c1" if i % 2 == 0 else "c2",
+                    "createdAt": now - timedelta(hours=i),
+                    "tags": [f"t{i}"],
+                })
+            newest = await store.query(
+                "items", [("campusId", "==", "c1")], order_by="createdAt", descending=True, limit=2
+            )
+            tagged = await store.query("items", [("tags", "array_contains", "t3")])
+            recent = await store.query("items", [("createdAt", ">=", now - timedelta(hours=1, minutes=30))])
+            return newest, tagged, recent
+
+        newest, tagged, recent = run(scenario())
+        assert [d["id"] for d in newest] == ["i0", "i2"]
+        assert [d["id"] for d in tagged] == ["i3"]
+        assert {d["id"] for d in recent} == {"i0", "i1"}
+
+    def test_increment_and_merge(self):
+        """Increment deve somar ao valor atual e merge preservar campos"""
+        async def scenario():
+            store = InMemoryStore()
+            await store.set("inbox", "t1", {"unread": 0, "lastMessage": "a"})
+            await store.set("inbox", "t1", {"unread": Increment(1)}, merge=True)
+            await store.set("inbox", "t1", {"unread": Increment(2)}, merge=True)
+            await store.set("inbox", "t2", {"unread": Increment(1)}, merge=True)
+            return await store.get("inbox", "t1"), await store.get("inbox", "t2")
+
+        t1, t2 = run(scenario())
+        assert t1["unread"] == 3
+        assert t1["lastMessage"] == "a"
+        assert t2["unread"] == 1
+
+    def test_batch_is_all_or_nothing(self):
+        """Falha em uma escrita do batch não deve aplicar as demais"""
+        async def scenario():
+            store = InMemoryStore()
+            batch = store.batch()
+            batch.set("messages", "m1", {"content": "oi"})
+            batch.update("threads", "nao-existe", {"lastMessage": "oi"})
+            with pytest.raises(DocumentNotFound):
+                await batch.commit()
+            return await store.get("messages", "m1")
+
+        assert run(scenario()) is None
+
+    def test_oversized_commit_is_rejected(self):
+        """Commit acima do limite falha inteiro em vez de ser dividido"""
+        async def scenario():
+            store = InMemoryStore()
+            batch = store.batch()
+            for i in range(MAX_COMMIT_WRITES + 1):
+                batch.set("items", f"i{i}", {"n": i})
+            with pytest.raises(CommitTooLarge):
+                await batch.commit()
+            await store.set_many("bulk", {f"b{i}": {"n": i} for i in range(MAX_COMMIT_WRITES * 2 + 1)})
+            return store.count("items"), store.count("bulk")
+
+        assert run(scenario()) == (0, MAX_COMMIT_WRITES * 2 + 1)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,242 @@
+"""
+Testes para o DataLoader por requisição
+"""
+import asyncio
+import logging
+
+import pytest
+from app.data import InMemoryStore
+from app.data.loader import LoadingStore, StoreUsage
+from app.dependencies.repository import record_store_usage
+from app.services.metrics import MetricsRegistry, get_metrics
+from app.settings import get_settings
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class CountingStore(InMemoryStore):
+    """Store em memória que registra as chamadas de get_many."""
+
+    def __init__(self):
+        super().__init__()
+        self.get_many_calls = []
+
+    async def get_many(self, collection, doc_ids):
+        self.get_many_calls.append((collection, list(doc_ids)))
+        return await super().get_many(collection, doc_ids)
+
+
+class TestDataLoader:
+    """Testes de agrupamento, deduplicação e memo"""
+
+    def test_concurrent_loads_are_batched_and_deduplicated(self):
+        """Leituras na mesma volta do loop viram um get_many por coleção"""
+        async def scenario():
+            inner = CountingStore()
+            for doc_id in ("a", "b"):
+                await inner.set("items", doc_id, {"title": doc_id})
+            await inner.set("threads", "t", {"itemId": "a"})
+            store = LoadingStore(inner)
+            docs = await asyncio.gather(
+                store.get("items", "a"),
+                store.get("items", "b"),
+                store.get("items", "a"),
+                store.get("items", "missing"),
+                store.get("threads", "t"),
+            )
+            return inner, store, docs
+
+        inner, store, docs = run(scenario())
+        assert [d and d["id"] for d in docs] == ["a", "b", "a", None, "t"]
+        assert sorted(inner.get_many_calls) == [("items", ["a", "b", "missing"]), ("threads", ["t"])]
+        assert store.round_trips == 2
+        assert store.loader.memo_hits == 1
+
+    def test_memo_and_writes(self):
+        """Leituras repetidas usam o memo; escritas refletem o novo estado"""
+        async def scenario():
+            inner = CountingStore()
+            await inner.set("items", "a", {"title": "velho", "views": 1})
+            store = LoadingStore(inner)
+            await store.get("items", "a")
+            await store.update("items", "a", {"title": "novo"})
+            after_update = await store.get("items", "a")
+            await store.set("items", "b", {"title": "b"})
+            created = await store.get("items", "b")
+            return inner, after_update, created
+
+        inner, after_update, created = run(scenario())
+        assert after_update == {"title": "novo", "views": 1, "id": "a"}
+        assert created == {"title": "b", "id": "b"}
+        assert len(inner.get_many_calls) == 1
+
+    def test_query_primes_memo(self):
+        """Documentos vindos de query não são relidos"""
+        async def scenario():
+            inner = CountingStore()
+            await inner.set("items", "a", {"title": "a"})
+            store = LoadingStore(inner)
+            await store.query("items")
+            return inner, await store.get("items", "a")
+
+        inner, doc = run(scenario())
+        assert doc["title"] == "a"
+        assert inner.get_many_calls == []
+
+    def test_pending_fetches_are_referenced(self):
+        """Tasks de busca ficam referenciadas até terminar"""
+        class SlowStore(InMemoryStore):
+            def __init__(self):
+                super().__init__()
+                self.release = asyncio.Event()
+
+            async def get_many(self, collection, doc_ids):
+                await self.release.wait()
+                return await super().get_many(collection, doc_ids)
+
+        async def scenario():
+            inner = SlowStore()
+            await inner.set("items", "a", {"title": "a"})
+            store = LoadingStore(inner)
+            pending = asyncio.ensure_future(store.get("items", "a"))
+            for _ in range(3):
+                await asyncio.sleep(0)
+            tracked = len(store.loader._tasks)
+            inner.release.set()
+            doc = await pending
+            await asyncio.sleep(0)
+            return tracked, len(store.loader._tasks), doc
+
+        tracked, remaining, doc = run(scenario())
+        assert (tracked, remaining, doc["title"]) == (1, 0, "a")
+
+    def test_loads_return_copies(self):
+        async def scenario():
+            inner = InMemoryStore()
+            await inner.set("items", "a", {"title": "a"})
+            store = LoadingStore(inner)
+            first = await store.get("items", "a")
+            first["title"] = "alterado"
+            return await store.get("items", "a")
+
+        assert run(scenario())["title"] == "a"
+
+
+class TestRequestMetrics:
+    """Idas ao store por requisição devem aparecer nas métricas"""
+
+    def test_round_trips_are_recorded(self, app, client):
+        metrics = app.dependency_overrides[get_metrics]()
+        item = client.post("/items", json={
+            "type": "FOUND",
+            "title": "Carteira",
+            "description": "Encontrada no RU",
+            "category": "Documentos",
+            "campusId": "campus-darcy-ribeiro",
+            "buildingId": "ru",
+        }).json()
+        before = metrics.value("store_round_trips_total")
+
+        response = client.patch(f"/items/{item['id']}", json={"title": "Carteira preta"})
+        assert response.status_code == 200
+        assert response.json()["title"] == "Carteira preta"
+
+        # item recém-criado já está no cache: só o update condicional vai ao
+        # store e o resultado é montado sem releitura
+        assert metrics.value("store_round_trips_total") - before == 1
+        assert metrics.value("requests_with_store_total") >= 2
+
+    def test_metrics_are_exported(self, client):
+        client.get("/items")
+        body = client.get("/metrics").text
+        assert "# TYPE store_round_trips_total counter" in body
+        assert "store_round_trips_total 1" in body
+
+
+
+ITEM = {
+    "type": "FOUND",
+    "title": "Carteira",
+    "description": "Encontrada no RU",
+    "category": "Documentos",
+    "campusId": "campus-darcy-ribeiro",
+}
+
+
+class TestStoreUsage:
+    """Contagem de leituras, escritas, queries e documentos por requisição"""
+
+    def test_loading_store_counts_usage(self):
+        async def scenario():
+            inner = InMemoryStore()
+            for doc_id in ("a", "b", "c"):
+                await inner.set("items", doc_id, {"title": doc_id})
+            store = LoadingStore(inner)
+            await asyncio.gather(store.get("items", "a"), store.get("items", "b"), store.get("items", "a"))
+            await store.query("items")
+            # Já no memo pela query: não conta leitura
+            await store.get("items", "c")
+            await store.set("items", "d", {"title": "d"})
+            return store.usage
+
+        usage = run(scenario())
+        assert usage == StoreUsage(reads=2, writes=1, queries=1, docs_streamed=3, round_trips=3)
+
+    def test_debug_headers(self, client, monkeypatch):
+        item = client.post("/items", json=ITEM).json()
+        assert "X-Store-Reads" not in client.get("/items").headers
+
+        monkeypatch.setattr(get_settings(), "debug", True)
+        listing = client.get("/items")
+        detail = client.get(f"/items/{item['id']}")
+        created = client.post("/items", json=ITEM)
+
+        assert listing.headers["X-Store-Queries"] == "1"
+        assert listing.headers["X-Store-Docs-Streamed"] == "1"
+        # Detalhe vem do cache de itens
+        assert detail.headers["X-Store-Reads"] == "0"
+        # Item + bucket de relatório, no mesmo commit
+        assert created.headers["X-Store-Writes"] == "2"
+        assert "X-Store-Reads" not in client.get("/health").headers
+
+    def test_per_route_metrics(self, app, client):
+        client.post("/items", json=ITEM)
+        client.get("/items")
+        client.get("/items")
+
+        metrics = app.dependency_overrides[get_metrics]()
+        assert metrics.value("store_queries_total", method="GET", route="/items") == 2
+        assert metrics.value("store_docs_streamed_total", method="GET", route="/items") == 2
+        assert metrics.value("store_writes_total", method="POST", route="/items") == 2
+
+    def test_budget_violations_are_logged(self, caplog):
+        metrics = MetricsRegistry()
+        scope = {"type": "http", "method": "GET", "route": None}
+        budgets = {"GET unmatched": {"docs_streamed": 10, "queries": 1}}
+
+        with caplog.at_level(logging.WARNING):
+            record_store_usage(metrics, scope, StoreUsage(queries=1, docs_streamed=50), budgets)
+
+        assert metrics.value("store_budget_violations_total", method="GET", route="unmatched",
+                             kind="docs_streamed") == 1
+        assert metrics.value("store_budget_violations_total", method="GET", route="unmatched",
+                             kind="queries") == 0
+        assert "docs_streamed=50" in caplog.text
+
+    def test_full_scan_regression_is_flagged(self, app, client, monkeypatch):
+        """Rota que passa a ler mais documentos que o orçamento é apontada"""
+        monkeypatch.setattr(get_settings(), "store_budgets", {"GET /items": {"docs_streamed": 1}})
+        client.post("/items", json=ITEM)
+        client.get("/items")
+        client.post("/items", json=ITEM)
+        client.get("/items")
+
+        metrics = app.dependency_overrides[get_metrics]()
+        assert metrics.value("store_budget_violations_total", method="GET", route="/items",
+                             kind="docs_streamed") == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
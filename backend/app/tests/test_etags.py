@@ -0,0 +1,92 @@
+"""
+Testes para ETags e GET condicional (If-None-Match / 304) de itens
+"""
+import pytest
+from app.services.metrics import get_metrics
+
+ITEM = {
+    "type": "FOUND",
+    "title": "Garrafa Térmica",
+    "description": "Deixada no auditório",
+    "category": "Utensílios",
+    "campusId": "campus-darcy-ribeiro",
+    "buildingId": "ft",
+}
+
+
+def round_trips(app):
+    return app.dependency_overrides[get_metrics]().value("store_round_trips_total")
+
+
+class TestItemDetailETag:
+    """Testes de ETag em GET /items/{id}"""
+
+    def test_etag_follows_version(self, client):
+        item = client.post("/items", json=ITEM).json()
+        response = client.get(f"/items/{item['id']}")
+        assert response.headers["ETag"] == '"1"'
+
+        client.patch(f"/items/{item['id']}", json={"title": "Garrafa"})
+        assert client.get(f"/items/{item['id']}").headers["ETag"] == '"2"'
+
+    def test_not_modified_without_store(self, app, client):
+        """Item em cache com ETag igual responde 304 sem ir ao store"""
+        item = client.post("/items", json=ITEM).json()
+        etag = client.get(f"/items/{item['id']}").headers["ETag"]
+
+        before = round_trips(app)
+        response = client.get(f"/items/{item['id']}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+        assert round_trips(app) == before
+
+    def test_changed_item_returns_200(self, client):
+        item = client.post("/items", json=ITEM).json()
+        etag = client.get(f"/items/{item['id']}").headers["ETag"]
+        client.patch(f"/items/{item['id']}", json={"status": "RESOLVED"})
+
+        response = client.get(f"/items/{item['id']}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["status"] == "RESOLVED"
+
+    def test_weak_and_list_forms(self, client):
+        item = client.post("/items", json=ITEM).json()
+        for header in ['W/"1"', '"9", "1"', "*"]:
+            response = client.get(f"/items/{item['id']}", headers={"If-None-Match": header})
+            assert response.status_code == 304
+
+
+class TestItemListETag:
+    """Testes de ETag em GET /items"""
+
+    def test_unchanged_feed_is_not_modified(self, app, client):
+        client.post("/items", json=ITEM)
+        etag = client.get("/items").headers["ETag"]
+
+        before = round_trips(app)
+        response = client.get("/items", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert round_trips(app) == before
+
+    def test_writes_change_feed_etag(self, client):
+        item = client.post("/items", json=ITEM).json()
+        etag = client.get("/items").headers["ETag"]
+
+        client.post("/items", json={**ITEM, "title": "Outra"})
+        created = client.get("/items", headers={"If-None-Match": etag})
+        assert created.status_code == 200
+        assert len(created.json()) == 2
+
+        client.as_user("staff-1", role="staff").post(f"/staff/items/{item['id']}/receive")
+        received = client.get("/items", headers={"If-None-Match": created.headers["ETag"]})
+        assert received.status_code == 200
+
+    def test_params_are_part_of_etag(self, client):
+        client.post("/items", json=ITEM)
+        etag = client.get("/items").headers["ETag"]
+        assert client.get("/items", params={"campusId": "outro"}).headers["ETag"] != etag
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,78 @@
+"""
+Testes para o gerador de catálogos sintéticos
+"""
+import asyncio
+import io
+from itertools import islice
+
+import pytest
+
+from app.data import InMemoryStore
+from app.models import Alert, Item, Message, Thread
+from app.scripts.generate_dataset import CatalogGenerator, DatasetSpec, load_into
+
+
+def generator(**overrides):
+    return CatalogGenerator(DatasetSpec(**{"items": 300, **overrides}))
+
+
+class TestCatalogGenerator:
+    """Testes para determinismo e consistência dos corpora"""
+
+    def test_same_seed_same_dataset(self):
+        assert list(generator().items()) == list(generator().items())
+        assert list(generator().messages()) == list(generator().messages())
+        assert list(islice(generator(seed=7).items(), 5)) != list(islice(generator().items(), 5))
+
+    def test_documents_match_models(self):
+        gen = generator()
+        for doc in islice(gen.items(), 50):
+            Item(**doc)
+            assert doc["ngrams"] and doc["geo"]["geohash"]
+        for doc in islice(gen.threads(), 20):
+            Thread(**doc)
+        for doc in islice(gen.messages(), 20):
+            Message(**doc)
+        for doc in gen.alerts():
+            Alert(**doc)
+
+    def test_conversations_are_consistent(self):
+        """Mensagens e inbox devem referenciar threads e itens existentes"""
+        gen = generator()
+        items = {doc["id"]: doc for doc in gen.items()}
+        threads = {doc["id"]: doc for doc in gen.threads()}
+        messages = list(gen.messages())
+
+        assert threads and all(t["itemId"] in items for t in threads.values())
+        assert all(items[t["itemId"]]["ownerUid"] in t["participants"] for t in threads.values())
+        assert {m["threadId"] for m in messages} == set(threads)
+        for entry in gen.inbox():
+            unread = [
+                m for m in messages
+                if m["threadId"] == entry["threadId"] and not m["read"] and m["senderUid"] != entry["uid"]
+            ]
+            assert entry["unread"] == len(unread)
+
+    def test_skewed_timestamps(self):
+        """Itens recentes devem predominar"""
+        spec = DatasetSpec(items=2000, days=365)
+        ages = [(spec.now - doc["createdAt"]).days for doc in CatalogGenerator(spec).items()]
+        assert sum(age < 90 for age in ages) > len(ages) / 2
+        assert max(ages) <= 365
+
+    def test_load_into_store(self, monkeypatch):
+        monkeypatch.setattr("sys.stderr", io.StringIO())
+        store = InMemoryStore()
+        gen = generator(items=100)
+
+        counts = asyncio.run(load_into(store, gen, workers=2))
+
+        assert store.count("items") == counts["items"] == 100
+        assert store.count("threads") == counts["threads"]
+        thread = next(gen.threads())
+        assert store.count(f"threads/{thread['id']}/messages") > 0
+        assert store.count(f"users/{thread['participants'][0]}/inbox") > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
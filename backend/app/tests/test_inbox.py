@@ -0,0 +1,138 @@
+"""
+Testes para a inbox materializada e contadores de não lidas
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+from app.data import InMemoryStore, PreconditionFailed, Repository
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def open_thread(repo, thread_id="t1"):
+    await repo.threads.create(thread_id, {
+        "itemId": "i1",
+        "participants": ["alice", "bob"],
+        "createdAt": datetime.utcnow(),
+        "updatedAt": datetime.utcnow(),
+    })
+
+
+async def send(repo, text, sender="bob", thread_id="t1"):
+    message_id = repo.messages.new_id()
+    await repo.messages.send(
+        thread_id,
+        message_id,
+        {"threadId": thread_id, "senderUid": sender, "content": text,
+         "createdAt": datetime.utcnow(), "read": False},
+        item_id="i1",
+        participants=["alice", "bob"],
+        preview=text,
+    )
+
+
+async def unread_state(repo, uid="alice", thread_id="t1"):
+    entry = (await repo.store.get(f"users/{uid}/inbox", thread_id)) or {}
+    messages = await repo.store.query(f"threads/{thread_id}/messages", [("read", "==", False)])
+    pending = [m for m in messages if m["senderUid"] != uid]
+    return entry.get("unread"), len(pending)
+
+
+class RacingStore(InMemoryStore):
+    """Entrega uma mensagem nova logo após a consulta de não lidas."""
+
+    def __init__(self):
+        super().__init__()
+        self.on_unread_query = None
+
+    async def query(self, collection, where=(), *args, **kwargs):
+        docs = await super().query(collection, where, *args, **kwargs)
+        if self.on_unread_query and collection.endswith("/messages") and where:
+            hook, self.on_unread_query = self.on_unread_query, None
+            await hook()
+        return docs
+
+
+class TestMarkRead:
+    """Testes para MessageRepository.mark_read"""
+
+    def test_counter_matches_messages(self):
+        async def scenario():
+            repo = Repository(InMemoryStore())
+            await open_thread(repo)
+            for text in ("a", "b", "c"):
+                await send(repo, text)
+            await send(repo, "minha", sender="alice")
+            await repo.messages.mark_read("alice", ["t1"])
+            return await unread_state(repo)
+
+        assert run(scenario()) == (0, 0)
+
+    def test_message_arriving_during_mark_read_stays_counted(self):
+        """Mensagem que chega entre a consulta e o commit continua não lida e contada"""
+        async def scenario():
+            store = RacingStore()
+            repo = Repository(store)
+            await open_thread(repo)
+            await send(repo, "a")
+            store.on_unread_query = lambda: send(repo, "b")
+            await repo.messages.mark_read("alice", ["t1"])
+            return await unread_state(repo)
+
+        assert run(scenario()) == (1, 1)
+
+    def test_concurrent_mark_read_does_not_double_count(self):
+        """Outra chamada marca as mesmas mensagens antes do commit: sem desconto duplo"""
+        async def scenario():
+            store = RacingStore()
+            repo = Repository(store)
+            await open_thread(repo)
+            for text in ("a", "b"):
+                await send(repo, text)
+            store.on_unread_query = lambda: repo.messages.mark_read("alice", ["t1"])
+            await repo.messages.mark_read("alice", ["t1"])
+            return await unread_state(repo)
+
+        assert run(scenario()) == (0, 0)
+
+    def test_persistent_contention_is_reported(self):
+        """Conflito em todas as tentativas: levanta em vez de fingir sucesso"""
+        class ContendedStore(InMemoryStore):
+            """Outro leitor marca uma das mensagens lidas logo após cada consulta."""
+
+            async def query(self, collection, where=(), *args, **kwargs):
+                docs = await super().query(collection, where, *args, **kwargs)
+                if collection.endswith("/messages") and where and docs:
+                    await self.update(collection, docs[0]["id"], {"read": True})
+                return docs
+
+        async def scenario():
+            repo = Repository(ContendedStore())
+            await open_thread(repo)
+            for text in ("a", "b", "c", "d"):
+                await send(repo, text)
+            with pytest.raises(PreconditionFailed):
+                await repo.messages.mark_read("alice", ["t1"])
+            return await unread_state(repo)
+
+        # Nenhum commit passou: o contador não foi descontado
+        assert run(scenario()) == (4, 1)
+
+    def test_large_threads_commit_in_chunks(self):
+        """Mais mensagens que o limite de um commit: cada lote desconta o seu"""
+        async def scenario():
+            repo = Repository(InMemoryStore())
+            await open_thread(repo)
+            for i in range(620):
+                await send(repo, str(i))
+            await repo.messages.mark_read("alice", ["t1"])
+            return await unread_state(repo)
+
+        assert run(scenario()) == (0, 0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,191 @@
+"""
+Testes para o cache read-through de itens
+"""
+import asyncio
+
+import pytest
+from app.services.item_cache import ItemCache
+from app.services.metrics import get_metrics
+from app.services.pubsub import PubSubHub
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Loader:
+    """Fonte de dados falsa que conta leituras."""
+
+    def __init__(self, doc=None):
+        self.doc = doc
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.doc
+
+
+class TestItemCache:
+    """Testes de read-through, TTL, cache negativo e versões"""
+
+    def test_read_through_and_ttl(self):
+        clock = FakeClock()
+        cache = ItemCache(ttl=60, clock=clock)
+        load = Loader({"id": "a", "title": "Carteira"})
+
+        assert run(cache.get_or_load("a", load))["title"] == "Carteira"
+        assert run(cache.get_or_load("a", load))["title"] == "Carteira"
+        assert load.calls == 1
+
+        clock.now = 61
+        run(cache.get_or_load("a", load))
+        assert load.calls == 2
+
+    def test_returns_copies(self):
+        cache = ItemCache()
+        load = Loader({"id": "a", "title": "Carteira"})
+        run(cache.get_or_load("a", load))["title"] = "alterado"
+        assert run(cache.get_or_load("a", load))["title"] == "Carteira"
+
+    def test_negative_caching(self):
+        """404 deve ser cacheado pelo TTL negativo"""
+        clock = FakeClock()
+        cache = ItemCache(ttl=60, negative_ttl=5, clock=clock)
+        load = Loader(None)
+
+        assert run(cache.get_or_load("x", load)) is None
+        assert run(cache.get_or_load("x", load)) is None
+        assert load.calls == 1
+        assert cache.negative_hits == 1
+
+        clock.now = 6
+        run(cache.get_or_load("x", load))
+        assert load.calls == 2
+
+    def test_negative_caching_disabled(self):
+        cache = ItemCache(negative_ttl=0)
+        load = Loader(None)
+        run(cache.get_or_load("x", load))
+        run(cache.get_or_load("x", load))
+        assert load.calls == 2
+
+    def test_stale_fill_is_discarded(self):
+        """Leitura iniciada antes de uma escrita não repovoa o cache"""
+        cache = ItemCache()
+
+        async def slow_load():
+            cache.put("a", {"id": "a", "title": "novo"})
+            return {"id": "a", "title": "velho"}
+
+        assert run(cache.get_or_load("a", slow_load))["title"] == "velho"
+        assert run(cache.get_or_load("a", Loader()))["title"] == "novo"
+
+    def test_invalidate_bumps_version(self):
+        cache = ItemCache()
+        load = Loader({"id": "a"})
+        run(cache.get_or_load("a", load))
+        cache.invalidate("a")
+        assert cache.version("a") == 1
+        run(cache.get_or_load("a", load))
+        assert load.calls == 2
+
+    def test_put_many(self):
+        """put em lote deve aquecer todas as entradas e avançar a marca d'água"""
+        cache = ItemCache()
+        cache.put_many({"a": {"id": "a"}, "b": {"id": "b"}})
+
+        assert cache.high_water == 2
+        assert cache.version("a") == cache.version("b") == 1
+        assert run(cache.get_or_load("b", Loader())) == {"id": "b"}
+
+    def test_invalidations_reach_other_workers(self):
+        """Escrita em um worker invalida a entrada dos outros pelo broadcast"""
+        class SharedBroadcast:
+            """Broadcast que entrega a todos os hubs conectados (como o NOTIFY)."""
+
+            def __init__(self):
+                self.targets = []
+
+            def for_worker(self):
+                outer = self
+
+                class Adapter:
+                    async def start(self, deliver):
+                        outer.targets.append(deliver)
+
+                    async def stop(self):
+                        pass
+
+                    async def publish(self, uids, event):
+                        for deliver in outer.targets:
+                            deliver(uids, event)
+
+                return Adapter()
+
+        async def scenario():
+            shared = SharedBroadcast()
+            hubs = [PubSubHub(shared.for_worker()) for _ in range(2)]
+            caches = [ItemCache() for _ in range(2)]
+            for hub, cache in zip(hubs, caches):
+                cache.bind(hub)
+                await hub.start()
+
+            load = Loader({"id": "a", "title": "velho"})
+            await caches[1].get_or_load("a", load)
+            caches[0].put("a", {"id": "a", "title": "novo"})
+            await asyncio.sleep(0)
+
+            load.doc = {"id": "a", "title": "novo"}
+            other = await caches[1].get_or_load("a", load)
+            own = await caches[0].get_or_load("a", Loader())
+            return other, own, load.calls
+
+        other, own, calls = run(scenario())
+        assert other["title"] == "novo"
+        assert own["title"] == "novo"
+        assert calls == 2
+
+
+class TestItemCacheRoutes:
+    """Rotas de itens e staff devem usar e invalidar o cache"""
+
+    ITEM = {
+        "type": "FOUND",
+        "title": "Guarda-chuva",
+        "description": "Preto",
+        "category": "Acessórios",
+        "campusId": "campus-darcy-ribeiro",
+        "buildingId": "bce",
+    }
+
+    def test_hot_reads_skip_store(self, app, client):
+        metrics = app.dependency_overrides[get_metrics]()
+        item = client.post("/items", json=self.ITEM).json()
+
+        client.get(f"/items/{item['id']}")
+        before = metrics.value("store_round_trips_total")
+        assert client.get(f"/items/{item['id']}").status_code == 200
+        assert metrics.value("store_round_trips_total") == before
+
+    def test_writes_invalidate(self, client):
+        item = client.post("/items", json=self.ITEM).json()
+        client.get(f"/items/{item['id']}")
+
+        client.patch(f"/items/{item['id']}", json={"status": "RESOLVED"})
+        assert client.get(f"/items/{item['id']}").json()["status"] == "RESOLVED"
+
+        client.as_user("staff-1", role="staff").post(f"/staff/items/{item['id']}/receive")
+        detail = client.get(f"/items/{item['id']}").json()
+        assert detail["moderation"]["receivedBy"] == "staff-1"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
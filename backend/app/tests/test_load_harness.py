@@ -0,0 +1,78 @@
+"""
+Testes para o harness de carga via ASGI
+"""
+import asyncio
+import io
+import json
+
+import pytest
+
+from app.benchmarks.load import Fixtures, LoadConfig, Sample, Workload, main, parse_mix, percentile, run, summarize
+from app.scripts.generate_dataset import CatalogGenerator, DatasetSpec
+
+
+@pytest.fixture(autouse=True)
+def quiet_progress(monkeypatch):
+    monkeypatch.setattr("sys.stderr", io.StringIO())
+
+
+class TestLoadHarness:
+    """Testes para execução, modos e relatório"""
+
+    @pytest.mark.parametrize("backend", ["memory", "sqlite"])
+    def test_closed_loop_runs_every_scenario(self, backend):
+        report = asyncio.run(run(LoadConfig(backend=backend, items=100, requests=120, warmup=5, concurrency=4)))
+
+        assert report["total"]["requests"] == 120
+        assert report["total"]["errors"] == {}
+        assert set(report["scenarios"]) == {"search", "detail", "create", "message", "report"}
+        search = report["scenarios"]["search"]
+        assert search["store_calls_per_request"]["queries"] == 1
+        assert 0 < search["latency_ms"]["p50"] <= search["latency_ms"]["p99"] <= search["latency_ms"]["max"]
+        assert report["scenarios"]["create"]["store_calls_per_request"]["commits"] == 1
+
+    def test_open_loop_fixed_rate(self):
+        config = LoadConfig(items=100, rate=200, requests=40, warmup=0, mix={"detail": 1})
+        report = asyncio.run(run(config))
+
+        assert report["total"]["requests"] == 40
+        # 40 chegadas a 200/s levam ao menos ~0,2 s
+        assert report["elapsed_s"] >= 0.19
+
+    def test_workload_is_deterministic(self):
+        fixtures = Fixtures.from_generator(CatalogGenerator(DatasetSpec(items=50)))
+
+        def calls():
+            workload = Workload(fixtures, {"search": 1, "message": 1}, seed=3)
+            return [workload.next() for _ in range(20)]
+
+        assert calls() == calls()
+        assert {name for name, _ in calls()} == {"search", "message"}
+        with pytest.raises(ValueError):
+            Workload(fixtures, {"upload": 1})
+
+    def test_summary_percentiles(self):
+        samples = [Sample("detail", 200, ms / 1000, {"reads": 1}) for ms in range(1, 101)]
+        samples.append(Sample("detail", 404, 0.001, {}))
+
+        stats = summarize(samples, elapsed=2.0)["scenarios"]["detail"]
+
+        assert stats["latency_ms"]["p50"] == 50
+        assert stats["latency_ms"]["p99"] == 99
+        assert stats["errors"] == {"404": 1}
+        assert stats["throughput_rps"] == 50.5
+        assert percentile([], 95) == 0.0
+
+    def test_cli_writes_json(self, tmp_path, capsys):
+        out = tmp_path / "load.json"
+        assert main(["--items", "60", "--requests", "20", "--warmup", "0", "--mix", "search=1,report=1",
+                     "--out", str(out)]) == 0
+
+        report = json.loads(out.read_text())
+        assert report["config"]["mix"] == {"search": 1.0, "report": 1.0}
+        assert set(report["scenarios"]) <= {"search", "report"}
+        assert parse_mix("detail=3")["detail"] == 3.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,115 @@
+"""
+Testes para histogramas, gauges e o middleware de tempos
+"""
+import pytest
+
+from app.middleware import route_template
+from app.services.metrics import SIZE_BUCKETS, MetricsRegistry, get_metrics
+
+
+def registry_of(app) -> MetricsRegistry:
+    return app.dependency_overrides[get_metrics]()
+
+
+class TestMetricsRegistry:
+    """Testes para o registro de métricas"""
+
+    def test_histogram_buckets(self):
+        metrics = MetricsRegistry()
+        for value in (0.0005, 0.001, 0.02, 0.02, 30):
+            metrics.observe("latency", value, route="/a")
+
+        histogram = metrics.histogram("latency", route="/a")
+
+        assert histogram.count == 5
+        assert histogram.sum == pytest.approx(30.0415)
+        cumulative = dict(histogram.cumulative())
+        # Limites inclusivos (le): 0.001 cai no bucket de 1 ms
+        assert cumulative["0.001"] == 2
+        assert cumulative["0.025"] == 4
+        assert cumulative["10"] == 4
+        assert cumulative["+Inf"] == 5
+
+    def test_label_order_does_not_split_series(self):
+        metrics = MetricsRegistry()
+        metrics.observe("size", 10, SIZE_BUCKETS, method="GET", route="/a")
+        metrics.observe("size", 20, SIZE_BUCKETS, route="/a", method="GET")
+        metrics.inc("hits", route="/a", status=200)
+        metrics.inc("hits", status="200", route="/a")
+
+        assert metrics.histogram("size", route="/a", method="GET").count == 2
+        assert metrics.value("hits", route="/a", status="200") == 2
+
+    def test_prometheus_rendering(self):
+        metrics = MetricsRegistry()
+        metrics.inc("requests_total", route="/a")
+        metrics.add_gauge("in_flight", 2)
+        metrics.add_gauge("in_flight", -1)
+        metrics.observe("latency", 0.2, buckets=(0.1, 1.0), route="/a")
+
+        body = metrics.render_prometheus()
+
+        assert "# TYPE requests_total counter" in body
+        assert "# TYPE in_flight gauge\nin_flight 1" in body
+        assert "# TYPE latency histogram" in body
+        assert 'latency_bucket{route="/a",le="0.1"} 0' in body
+        assert 'latency_bucket{route="/a",le="1"} 1' in body
+        assert 'latency_bucket{route="/a",le="+Inf"} 1' in body
+        assert 'latency_count{route="/a"} 1' in body
+
+
+class TestTimingMiddleware:
+    """Testes para as métricas por rota do middleware"""
+
+    def test_records_route_template_and_status(self, client, app):
+        item = client.post("/items", json={
+            "type": "FOUND", "title": "Chave", "description": "Chave com chaveiro",
+            "category": "Chaves", "campusId": "campus-1",
+        }).json()
+        client.get(f"/items/{item['id']}")
+        client.get("/items/nao-existe")
+
+        metrics = registry_of(app)
+        ok = metrics.histogram("http_request_duration_seconds", method="GET", route="/items/{item_id}", status="200")
+        missing = metrics.histogram(
+            "http_request_duration_seconds", method="GET", route="/items/{item_id}", status="404"
+        )
+        created = metrics.histogram("http_request_duration_seconds", method="POST", route="/items", status="201")
+        assert (ok.count, missing.count, created.count) == (1, 1, 1)
+        assert metrics.gauge("http_requests_in_flight", method="GET") == 0
+
+    def test_records_sizes(self, client, app):
+        payload = {"type": "FOUND", "title": "Caderno", "description": "Azul", "category": "Livros",
+                   "campusId": "campus-1"}
+        response = client.post("/items", json=payload)
+
+        metrics = registry_of(app)
+        request_size = metrics.histogram("http_request_size_bytes", method="POST", route="/items")
+        response_size = metrics.histogram("http_response_size_bytes", method="POST", route="/items")
+        assert request_size.sum == len(response.request.content)
+        assert response_size.sum == len(response.content)
+
+    def test_unmatched_routes_share_one_series(self, client, app):
+        client.get("/nada/1")
+        client.get("/nada/2")
+
+        metrics = registry_of(app)
+        assert metrics.histogram(
+            "http_request_duration_seconds", method="GET", route="unmatched", status="404"
+        ).count == 2
+
+    def test_exported_on_metrics_endpoint(self, client):
+        client.get("/health")
+
+        body = client.get("/metrics").text
+
+        assert "# TYPE http_request_duration_seconds histogram" in body
+        assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"} 1' in body
+        assert "# TYPE http_requests_in_flight gauge" in body
+
+    def test_route_template_without_match(self):
+        assert route_template({"type": "http"}) == "unmatched"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,173 @@
+"""
+Testes para perfis de requisição sob demanda
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import httpx
+import pytest
+
+from app.services.profiling import Profile, Profiler, StackSampler, fold_stack, get_profiler
+
+TOKEN = "segredo-de-staff"
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def make_profile(profile_id, stacks=None):
+    return Profile(
+        id=profile_id, method="GET", path="/items", route="/items", status=200, reason="sample",
+        startedAt=datetime.utcnow(), durationMs=1.0, intervalMs=5.0, samples=0, stacks=stacks or {},
+    )
+
+
+@pytest.fixture
+def profiler(app):
+    profiler = Profiler(capacity=10, token=TOKEN, interval=0.001)
+    app.dependency_overrides[get_profiler] = lambda: profiler
+    return profiler
+
+
+class TestSampling:
+    """Testes para o amostrador de pilhas"""
+
+    def test_fold_stack_goes_from_root_to_leaf(self):
+        def inner():
+            import sys
+            return fold_stack(sys._getframe())
+
+        folded = inner().split(";")
+
+        assert "inner" in folded[-1]
+        assert any("test_fold_stack_goes_from_root_to_leaf" in frame for frame in folded[:-1])
+
+    def test_sampler_sees_busy_function(self):
+        sampler = StackSampler(threading.get_ident(), interval=0.001)
+        sampler.start()
+        busy_loop(0.1)
+        stacks = sampler.stop()
+
+        assert sum(stacks.values()) > 0
+        assert any("busy_loop" in stack for stack in stacks)
+
+    def test_folded_output(self):
+        profile = make_profile("p1", {"a;b": 2, "a;c": 5})
+        assert profile.folded() == "a;c 5\na;b 2\n"
+        assert "stacks" not in profile.summary()
+
+
+class TestProfiler:
+    """Testes para decisão, exclusividade e buffer circular"""
+
+    def test_header_requires_matching_token(self):
+        assert Profiler(token=TOKEN).reason_for(TOKEN) == "header"
+        assert Profiler(token=TOKEN).reason_for("errado") is None
+        # Sem token configurado o cabeçalho não habilita nada
+        assert Profiler().reason_for("") is None
+
+    def test_sample_rate(self):
+        assert Profiler(sample_rate=0.1, rng=lambda: 0.05).reason_for(None) == "sample"
+        assert Profiler(sample_rate=0.1, rng=lambda: 0.5).reason_for(None) is None
+        assert Profiler(sample_rate=0.0, rng=lambda: 0.0).reason_for(None) is None
+
+    def test_one_profile_at_a_time(self):
+        profiler = Profiler()
+        assert profiler.acquire()
+        assert not profiler.acquire()
+        profiler.release()
+        assert profiler.acquire()
+
+    def test_ring_buffer_keeps_latest(self):
+        profiler = Profiler(capacity=3)
+        for n in range(5):
+            profiler.record(make_profile(f"p{n}"))
+
+        assert [profile.id for profile in profiler.profiles()] == ["p4", "p3", "p2"]
+        assert profiler.get("p0") is None
+
+
+class TestProfilingApi:
+    """Testes para o middleware e as rotas de staff"""
+
+    def test_header_profiles_request(self, client, profiler):
+        response = client.get("/items", params={"q": "garrafa"}, headers={"X-Profile": TOKEN})
+
+        profile_id = response.headers["X-Profile-Id"]
+        profile = profiler.get(profile_id)
+        assert profile.route == "/items"
+        assert profile.status == 200
+        assert profile.reason == "header"
+        assert profile.samples == sum(profile.stacks.values())
+
+    def test_requests_without_trigger_are_not_profiled(self, client, profiler):
+        response = client.get("/items", headers={"X-Profile": "errado"})
+
+        assert "X-Profile-Id" not in response.headers
+        assert profiler.profiles() == []
+
+    def test_sampled_requests(self, client, app):
+        profiler = Profiler(sample_rate=1.0, interval=0.001)
+        app.dependency_overrides[get_profiler] = lambda: profiler
+
+        response = client.get("/health")
+
+        assert "X-Profile-Id" not in response.headers
+        assert [profile.reason for profile in profiler.profiles()] == ["sample"]
+
+    def test_stopping_sampler_does_not_block_loop(self, app):
+        """O fim do perfil espera o sampler fora do event loop"""
+        profiler = Profiler(token=TOKEN, interval=0.3)
+        app.dependency_overrides[get_profiler] = lambda: profiler
+
+        async def scenario():
+            gaps = []
+
+            async def ticker(done):
+                last = time.perf_counter()
+                while not done.is_set():
+                    await asyncio.sleep(0.01)
+                    now = time.perf_counter()
+                    gaps.append(now - last)
+                    last = now
+
+            done = asyncio.Event()
+            task = asyncio.create_task(ticker(done))
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                response = await http.get("/health", headers={"X-Profile": TOKEN})
+            done.set()
+            await task
+            return response, max(gaps)
+
+        response, longest_gap = asyncio.run(scenario())
+
+        assert response.status_code == 200
+        assert len(profiler.profiles()) == 1
+        assert longest_gap < 0.2
+
+    def test_staff_endpoints(self, client, profiler):
+        profile_id = client.get("/items", headers={"X-Profile": TOKEN}).headers["X-Profile-Id"]
+        profiler.get(profile_id).stacks = {"main;list_items": 3}
+
+        assert client.get("/staff/profiles").status_code == 403
+
+        client.as_user("staff-1", role="staff")
+        listing = client.get("/staff/profiles").json()
+        assert [entry["id"] for entry in listing] == [profile_id]
+        assert "stacks" not in listing[0]
+
+        detail = client.get(f"/staff/profiles/{profile_id}").json()
+        assert detail["stacks"] == {"main;list_items": 3}
+        folded = client.get(f"/staff/profiles/{profile_id}", params={"format": "folded"})
+        assert folded.text == "main;list_items 3\n"
+        assert client.get("/staff/profiles/nao-existe").status_code == 404
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
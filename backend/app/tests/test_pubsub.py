@@ -0,0 +1,129 @@
+"""
+Testes para o hub de pub/sub em tempo real
+"""
+import asyncio
+import json
+
+import pytest
+
+from app.services.pubsub import MAX_NOTIFY_BYTES, PostgresBroadcast, PubSubHub, RESYNC_EVENT, Subscription
+
+
+class FailingBroadcast:
+    async def start(self, deliver):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, uids, event):
+        raise ConnectionError("broadcast indisponível")
+
+
+class TestSubscription:
+    """Testes para a fila de eventos por conexão"""
+
+    def test_offer_within_capacity(self):
+        """Deve enfileirar enquanto houver espaço"""
+        async def scenario():
+            sub = Subscription("u1", max_queue=3)
+            assert sub.offer({"n": 1})
+            assert sub.offer({"n": 2})
+            return [await sub.get(), await sub.get()]
+
+        assert asyncio.run(scenario()) == [{"n": 1}, {"n": 2}]
+
+    def test_overflow_replaces_queue_with_resync(self):
+        """Consumidor lento deve receber apenas um resync"""
+        async def scenario():
+            sub = Subscription("u1", max_queue=2)
+            sub.offer({"n": 1})
+            sub.offer({"n": 2})
+            assert not sub.offer({"n": 3})
+            return sub, await sub.get()
+
+        sub, event = asyncio.run(scenario())
+        assert event == RESYNC_EVENT
+        assert sub.queue.empty()
+        assert sub.dropped == 3
+
+
+class TestPubSubHub:
+    """Testes para roteamento de eventos"""
+
+    def test_publish_reaches_only_target_users(self):
+        """Eventos devem chegar apenas aos usuários destinatários"""
+        async def scenario():
+            hub = PubSubHub(max_queue=10)
+            alice = await hub.subscribe("alice")
+            bob = await hub.subscribe("bob")
+            await hub.publish(["alice"], {"type": "message"})
+            return alice.queue.qsize(), bob.queue.qsize()
+
+        assert asyncio.run(scenario()) == (1, 0)
+
+    def test_multiple_connections_per_user(self):
+        """Todas as conexões do usuário devem receber o evento"""
+        async def scenario():
+            hub = PubSubHub(max_queue=10)
+            web = await hub.subscribe("alice")
+            mobile = await hub.subscribe("alice")
+            await hub.publish(["alice"], {"type": "message"})
+            return web.queue.qsize(), mobile.queue.qsize(), hub.connection_count("alice")
+
+        assert asyncio.run(scenario()) == (1, 1, 2)
+
+    def test_unsubscribe(self):
+        """Conexões encerradas não devem receber eventos"""
+        async def scenario():
+            hub = PubSubHub(max_queue=10)
+            sub = await hub.subscribe("alice")
+            hub.unsubscribe(sub)
+            await hub.publish(["alice"], {"type": "message"})
+            return sub.queue.qsize(), hub.connection_count()
+
+        assert asyncio.run(scenario()) == (0, 0)
+
+    def test_broadcast_failure_is_not_raised(self):
+        """Falha no broadcast não deve propagar para quem publica"""
+        async def scenario():
+            hub = PubSubHub(FailingBroadcast())
+            await hub.publish(["alice"], {"type": "message"})
+
+        asyncio.run(scenario())
+
+
+class TestPostgresBroadcast:
+    """Testes para o limite de payload do NOTIFY"""
+
+    def test_large_events_are_compacted(self):
+        """Mensagens grandes seguem sem o conteúdo, abaixo do limite do Postgres"""
+        broadcast = PostgresBroadcast("postgresql://localhost/test")
+        sent = []
+        broadcast._notify = sent.append
+        event = {
+            "type": "message",
+            "threadId": "t1",
+            "message": {"id": "m1", "content": "é" * 10_000},
+        }
+
+        asyncio.run(broadcast.publish(["alice", "bob"], event))
+
+        assert len(sent[0].encode()) < MAX_NOTIFY_BYTES
+        assert json.loads(sent[0])["event"] == {
+            "type": "message", "threadId": "t1", "messageId": "m1", "truncated": True
+        }
+
+    def test_small_events_are_sent_whole(self):
+        broadcast = PostgresBroadcast("postgresql://localhost/test")
+        sent = []
+        broadcast._notify = sent.append
+        event = {"type": "message", "threadId": "t1", "message": {"id": "m1", "content": "oi"}}
+
+        asyncio.run(broadcast.publish(["alice"], event))
+
+        assert json.loads(sent[0])["event"] == event
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
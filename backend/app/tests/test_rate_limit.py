@@ -0,0 +1,131 @@
+"""
+Testes para o rate limiter de janela deslizante
+"""
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.dependencies.rate_limit import rate_limit
+from app.services.rate_limit import InMemoryRateLimiter, RateLimitRule, get_rate_limiter
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRateLimitRule:
+    """Testes para o parsing de regras"""
+
+    def test_parse_named_period(self):
+        assert RateLimitRule.parse("30/minute") == RateLimitRule(30, 60.0)
+
+    def test_parse_seconds(self):
+        assert RateLimitRule.parse("5/10s") == RateLimitRule(5, 10.0)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            RateLimitRule.parse("muitos")
+
+
+class TestInMemoryRateLimiter:
+    """Testes para os contadores em memória"""
+
+    def test_blocks_after_limit(self):
+        """Deve bloquear a requisição além do limite"""
+        limiter = InMemoryRateLimiter(clock=FakeClock(0.0))
+        rule = RateLimitRule(3, 60.0)
+        results = [limiter.hit_sync("u1", rule).allowed for _ in range(4)]
+        assert results == [True, True, True, False]
+
+    def test_keys_are_independent(self):
+        """Cada usuário tem seu próprio contador"""
+        limiter = InMemoryRateLimiter(clock=FakeClock(0.0))
+        rule = RateLimitRule(1, 60.0)
+        assert limiter.hit_sync("u1", rule).allowed
+        assert limiter.hit_sync("u2", rule).allowed
+        assert not limiter.hit_sync("u1", rule).allowed
+
+    def test_sliding_window_decay(self):
+        """Contagem da janela anterior deve decair proporcionalmente"""
+        clock = FakeClock(0.0)
+        limiter = InMemoryRateLimiter(clock=clock)
+        rule = RateLimitRule(4, 60.0)
+        for _ in range(4):
+            assert limiter.hit_sync("u1", rule).allowed
+
+        # Início da próxima janela: ainda pesa quase tudo da anterior
+        clock.now = 61.0
+        assert not limiter.hit_sync("u1", rule).allowed
+
+        # Metade da janela: peso da anterior cai para 2
+        clock.now = 90.0
+        assert limiter.hit_sync("u1", rule).allowed
+        assert limiter.hit_sync("u1", rule).allowed
+        assert not limiter.hit_sync("u1", rule).allowed
+
+    def test_retry_after(self):
+        """Retry-After deve apontar para quando a requisição caberia"""
+        clock = FakeClock(0.0)
+        limiter = InMemoryRateLimiter(clock=clock)
+        rule = RateLimitRule(2, 60.0)
+        limiter.hit_sync("u1", rule)
+        limiter.hit_sync("u1", rule)
+        decision = limiter.hit_sync("u1", rule)
+        assert not decision.allowed
+
+        clock.now = decision.retry_after + 0.01
+        assert limiter.hit_sync("u1", rule).allowed
+
+    def test_idle_keys_are_evicted(self):
+        """Chaves ociosas devem ser removidas na varredura"""
+        clock = FakeClock(0.0)
+        limiter = InMemoryRateLimiter(shards=1, idle_ttl=100.0, sweep_interval=10.0, clock=clock)
+        rule = RateLimitRule(10, 60.0)
+        limiter.hit_sync("u1", rule)
+        limiter.hit_sync("u2", rule)
+        assert len(limiter) == 2
+
+        clock.now = 200.0
+        limiter.hit_sync("u3", rule)
+        assert len(limiter) == 1
+
+
+class TestRateLimitDependency:
+    """Testes para a dependency de rate limit"""
+
+    def test_returns_429_with_retry_after(self):
+        app = FastAPI()
+
+        @app.post("/send", dependencies=[Depends(rate_limit("messages"))])
+        async def send():
+            return {"ok": True}
+
+        limiter = InMemoryRateLimiter(clock=FakeClock(0.0))
+        app.dependency_overrides[get_rate_limiter] = lambda: limiter
+        client = TestClient(app)
+
+        statuses = [client.post("/send").status_code for _ in range(31)]
+        assert statuses[:30] == [200] * 30
+        assert statuses[30] == 429
+
+        response = client.post("/send")
+        assert int(response.headers["Retry-After"]) >= 1
+
+
+class TestRetryAfterHeader:
+    """Retry-After nunca deve apontar para antes do prazo"""
+
+    def test_rounds_up(self):
+        from app.dependencies.rate_limit import retry_after_header
+
+        assert retry_after_header(1.4) == 2
+        assert retry_after_header(2.0) == 2
+        assert retry_after_header(0.1) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
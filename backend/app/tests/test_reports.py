@@ -0,0 +1,447 @@
+"""
+Testes para os agregados de relatório mantidos na escrita
+"""
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.data import Increment, PreconditionFailed
+from app.data.base import Write
+from app.data.reports import (
+    REPORT_COLLECTION,
+    REPORT_COUNTERS,
+    ReportTotals,
+    hour_of,
+    item_contribution,
+    recompute,
+    report_writes,
+)
+from app.data.rollups import DAY_COLLECTION, MONTH_COLLECTION, Rollup, day_of, period_key
+from app.models import ItemType
+from app.scripts.reconcile_reports import main as reconcile_main
+from app.tests.test_api import ITEM, create_item
+
+CAMPUSES = ("campus-darcy-ribeiro", "campus-gama")
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def item_doc(hours_ago=1.0, campus="campus-gama", status="OPEN", resolved_after=None, now=None):
+    now = now or datetime(2024, 5, 10, 12, 30)
+    created = now - timedelta(hours=hours_ago)
+    doc = {"createdAt": created, "campusId": campus, "status": status}
+    if resolved_after is not None:
+        doc["resolvedAt"] = created + timedelta(hours=resolved_after)
+    return doc
+
+
+def scan_report(docs, since, campus_id=None):
+    """O cálculo antigo de get_daily_report, por varredura dos itens."""
+    docs = [doc for doc in docs if doc["createdAt"] >= since and (not campus_id or doc["campusId"] == campus_id)]
+    resolved = [doc for doc in docs if doc.get("status") == "RESOLVED"]
+    times = [
+        (doc["resolvedAt"] - doc["createdAt"]).total_seconds() / 3600
+        for doc in resolved if doc.get("resolvedAt")
+    ]
+    return {
+        "total": len(docs),
+        "resolved": len(resolved),
+        "resolutionRate": len(resolved) / len(docs) * 100 if docs else 0,
+        "avgResolutionHours": round(sum(times) / len(times), 2) if times else 0,
+    }
+
+
+class TestContributions:
+    """Testes para o cálculo dos buckets"""
+
+    def test_open_item(self):
+        doc = {**item_doc(hours_ago=0.25), "category": "Chaves/Cartões", "type": ItemType.LOST}
+        key, fields, counts = item_contribution(doc)
+
+        assert key == "2024051012|campus-gama|Chaves%2FCart%C3%B5es|LOST"
+        assert fields == {
+            "hour": datetime(2024, 5, 10, 12), "campusId": "campus-gama", "category": "Chaves/Cartões", "type": "LOST",
+        }
+        assert counts == {"created": 1, "resolved": 0, "resolutionMicros": 0, "resolutionCount": 0}
+
+    def test_resolved_item(self):
+        _, _, counts = item_contribution(item_doc(status="RESOLVED", resolved_after=1.5))
+
+        assert counts["resolved"] == 1
+        assert counts["resolutionMicros"] == 5_400_000_000
+        assert counts["resolutionCount"] == 1
+
+    def test_update_writes_only_the_difference(self):
+        before = item_doc()
+        after = {**before, "status": "RESOLVED", "resolvedAt": before["createdAt"] + timedelta(hours=2)}
+
+        [write] = report_writes([(before, after)])
+
+        assert write.merge
+        assert {name: value.amount for name, value in write.data.items() if hasattr(value, "amount")} == {
+            "resolved": 1, "resolutionMicros": 7_200_000_000, "resolutionCount": 1,
+        }
+
+    def test_unrelated_update_writes_nothing(self):
+        before = item_doc()
+        assert report_writes([(before, {**before, "title": "novo"})]) == []
+
+    def test_batch_merges_buckets(self):
+        writes = report_writes([(None, item_doc(hours_ago=0.1)), (None, item_doc(hours_ago=0.2))])
+
+        assert len(writes) == 1
+        assert writes[0].data["created"].amount == 2
+
+    def test_totals(self):
+        totals = ReportTotals.from_buckets(recompute([
+            item_doc(status="RESOLVED", resolved_after=1),
+            item_doc(status="RESOLVED", resolved_after=2, campus="campus-darcy-ribeiro"),
+            item_doc(),
+        ]).values())
+
+        assert (totals.created, totals.resolved) == (3, 2)
+        assert totals.avg_resolution_hours == 1.5
+
+
+class TestMaintainedAggregates:
+    """Testes para os agregados gravados junto com os itens"""
+
+    def test_random_history_matches_recompute(self, repo):
+        rng = random.Random(7)
+        now = datetime(2024, 5, 10, 12, 30)
+
+        async def scenario():
+            ids = []
+            for n in range(60):
+                action = rng.random()
+                if not ids or action < 0.4:
+                    item_id = f"item-{n}"
+                    await repo.items.create(item_id, {
+                        **item_doc(hours_ago=rng.uniform(0, 40), campus=rng.choice(CAMPUSES), now=now),
+                        "version": 1,
+                    })
+                    ids.append(item_id)
+                elif action < 0.7:
+                    docs = {
+                        f"batch-{n}-{k}": item_doc(hours_ago=rng.uniform(0, 40), campus=rng.choice(CAMPUSES), now=now)
+                        for k in range(3)
+                    }
+                    await repo.items.create_many(docs)
+                else:
+                    item_id = rng.choice(ids)
+                    current = await repo.items.get(item_id)
+                    status = rng.choice(["RESOLVED", "RESOLVED", "OPEN"])
+                    changes = {"status": status, "version": current["version"] + 1}
+                    if status == "RESOLVED":
+                        changes["resolvedAt"] = current["createdAt"] + timedelta(minutes=rng.randint(1, 600))
+                    await repo.items.update(
+                        item_id, changes, precondition={"version": current["version"]}, current=current
+                    )
+            return await repo.items.query(), await repo.reports.hours()
+
+        items, buckets = run(scenario())
+        since = hour_of(now - timedelta(days=1))
+
+        for campus_id in (None, *CAMPUSES):
+            in_window = [bucket for bucket in buckets if bucket["hour"] >= since
+                         and (not campus_id or bucket["campusId"] == campus_id)]
+            totals = ReportTotals.from_buckets(in_window)
+            expected = scan_report(items, since, campus_id)
+            assert (totals.created, totals.resolved) == (expected["total"], expected["resolved"])
+            assert round(totals.avg_resolution_hours, 2) == expected["avgResolutionHours"]
+        assert run(repo.reports.reconcile(fix=False)) == {}
+
+    def test_reconcile_repairs_direct_loads(self, repo):
+        now = datetime.utcnow()
+        run(repo.store.set_many("items", {
+            "direto-1": item_doc(now=now),
+            "direto-2": item_doc(now=now, status="RESOLVED", resolved_after=3),
+        }))
+        run(repo.items.create("normal", item_doc(now=now, hours_ago=30)))
+
+        diffs = run(repo.reports.reconcile(fix=False))
+        assert len(diffs) == 1
+        [diff] = diffs.values()
+        assert diff["stored"]["created"] == 0
+        assert diff["expected"] == {"created": 2, "resolved": 1, "resolutionMicros": 10_800_000_000,
+                                    "resolutionCount": 1}
+
+        assert run(repo.reports.reconcile()) == diffs
+        assert run(repo.reports.reconcile()) == {}
+
+    def test_reconcile_window(self, repo):
+        now = datetime.utcnow()
+        run(repo.store.set_many("items", {"antigo": item_doc(now=now, hours_ago=72)}))
+
+        assert run(repo.reports.reconcile(now - timedelta(hours=24))) == {}
+        assert len(run(repo.reports.reconcile())) == 1
+
+
+class TestDailyReport:
+    """Testes para o relatório diário sobre os agregados"""
+
+    def test_report_from_api_writes(self, client, repo):
+        first = create_item(client)
+        create_item(client, campusId="campus-gama")
+        client.patch(f"/items/{first['id']}", json={"status": "RESOLVED"})
+        # Resolver de novo troca o resolvedAt: o bucket acompanha
+        client.patch(f"/items/{first['id']}", json={"status": "RESOLVED"})
+        client.as_user("staff-1", role="staff")
+        batch = client.post("/items/batch", json={"items": [ITEM, ITEM]})
+        assert batch.json()["created"] == 2
+
+        report = client.get("/staff/reports/daily").json()
+        campus = client.get("/staff/reports/daily", params={"campusId": "campus-gama"}).json()
+
+        items = run(repo.items.query())
+        since = datetime.fromisoformat(report["since"])
+        for body, campus_id in ((report, None), (campus, "campus-gama")):
+            expected = scan_report(items, since, campus_id)
+            assert {key: body[key] for key in expected} == expected
+        assert (report["total"], report["resolved"]) == (4, 1)
+        assert campus["total"] == 1
+        assert run(repo.reports.reconcile(fix=False)) == {}
+
+    def test_reopening_item(self, client):
+        item = create_item(client)
+        client.patch(f"/items/{item['id']}", json={"status": "RESOLVED"})
+        client.patch(f"/items/{item['id']}", json={"status": "OPEN"})
+
+        report = client.as_user("staff-1", role="staff").get("/staff/reports/daily").json()
+
+        assert (report["total"], report["resolved"], report["avgResolutionHours"]) == (1, 0, 0)
+
+    def test_reconcile_script(self, tmp_path, capsys):
+        path = str(tmp_path / "reports.db")
+
+        with pytest.raises(SystemExit) as exit_info:
+            reconcile_main(["--backend", "sqlite", "--sqlite-path", path, "--check"])
+
+        assert exit_info.value.code == 0
+        assert "0 diferenças" in capsys.readouterr().out
+
+
+def scan_range(docs, start, end, keys=()):
+    """Relatório por intervalo calculado dos itens, como referência."""
+    rows = {}
+    for doc in docs:
+        if not start <= doc["createdAt"] < end:
+            continue
+        fields = {"campus": doc["campusId"], "category": doc["category"], "type": doc["type"],
+                  "day": period_key(day_of(doc["createdAt"]), "day"),
+                  "week": period_key(day_of(doc["createdAt"]), "week"),
+                  "month": period_key(doc["createdAt"], "month")}
+        row = rows.setdefault(tuple(fields[key] for key in keys), [0, 0])
+        row[0] += 1
+        row[1] += doc["status"] == "RESOLVED"
+    return rows
+
+
+def range_rows(report):
+    return {key: [totals.created, totals.resolved] for key, totals in report.result()}
+
+
+class TestRollups:
+    """Testes para os rollups compactos e a compactação"""
+
+    NOW = datetime(2024, 5, 10, 12, 30)
+
+    def random_items(self, repo, count=300, days=420, seed=3):
+        rng = random.Random(seed)
+        docs = {}
+        for n in range(count):
+            doc = item_doc(hours_ago=rng.uniform(0, days * 24), campus=rng.choice(CAMPUSES), now=self.NOW)
+            doc.update(category=rng.choice(["Eletrônicos", "Chaves/Cartões", "Roupas"]), type=rng.choice(["FOUND", "LOST"]))
+            if rng.random() < 0.4:
+                doc.update(status="RESOLVED", resolvedAt=doc["createdAt"] + timedelta(minutes=rng.randint(1, 900)))
+            docs[f"item-{n}"] = doc
+        run(repo.items.create_many(docs))
+        return docs
+
+    def test_layout(self):
+        month = Rollup.for_month(datetime(2024, 2, 1), "campus-gama")
+        month.add(3, ("Roupas", "LOST"), [1, 0, 0, 0])
+        month.add(28, ("Roupas", "LOST"), [2, 1, 60, 1])
+        day = Rollup.for_day(datetime(2024, 2, 10), "campus-gama")
+        day.add(0, ("Chaves", "FOUND"), [5, 5, 10, 5])
+        month.merge(day)
+
+        assert month.days == 29
+        assert len(month.values) == 2 * len(REPORT_COUNTERS) * 29
+        assert dict(month.sums(0, 29)) == {("Roupas", "LOST"): [3, 1, 60, 1], ("Chaves", "FOUND"): [5, 5, 10, 5]}
+        assert dict(month.sums(4, 29))[("Roupas", "LOST")] == [2, 1, 60, 1]
+        assert month.counts(1, 9) == [5, 5, 10, 5]
+        assert Rollup.from_doc(month.to_doc()).to_doc() == month.to_doc()
+
+    def test_compaction_preserves_reports(self, repo):
+        docs = self.random_items(repo)
+        items = list(docs.values())
+        start, end = datetime(2023, 4, 1), datetime(2024, 5, 11)
+        groupings = [(), ("campus",), ("category", "type", "month"), ("campus", "week"), ("type", "day")]
+        before = {keys: range_rows(run(repo.reports.range(start, end, keys))) for keys in groupings}
+
+        result = run(repo.reports.compact(now=self.NOW))
+
+        assert result["conflicts"] == 0
+        assert result["hours"] > 0
+        remaining = run(repo.reports.hours())
+        assert all(bucket["hour"] >= datetime(2024, 5, 8) for bucket in remaining)
+        for keys in groupings:
+            expected = scan_range(items, start, end, keys)
+            assert before[keys] == expected
+            assert range_rows(run(repo.reports.range(start, end, keys))) == expected
+        # Recorte no meio de um mês compactado
+        partial = (datetime(2024, 2, 10), datetime(2024, 3, 20))
+        assert range_rows(run(repo.reports.range(*partial, ("campus",)))) == scan_range(items, *partial, ("campus",))
+        assert run(repo.reports.reconcile(fix=False)) == {}
+
+    def test_days_fold_into_months(self, repo):
+        docs = self.random_items(repo, count=60, days=40)
+        run(repo.reports.compact(now=self.NOW))
+        assert run(repo.store.query(DAY_COLLECTION, [("start", "<", datetime(2024, 5, 1))])) == []
+
+        # Um mês depois, os dias de maio também fecham
+        result = run(repo.reports.compact(now=datetime(2024, 6, 10)))
+
+        assert result["days"] > 0
+        assert run(repo.store.query(DAY_COLLECTION)) == []
+        months = run(repo.store.query(MONTH_COLLECTION))
+        assert {doc["start"] for doc in months} == {datetime(2024, 3, 1), datetime(2024, 4, 1), datetime(2024, 5, 1)}
+        start, end = datetime(2024, 1, 1), datetime(2024, 6, 1)
+        assert range_rows(run(repo.reports.range(start, end, ("campus",)))) == scan_range(docs.values(), start, end, ("campus",))
+
+    def test_late_update_after_compaction(self, repo):
+        docs = self.random_items(repo, count=80)
+        run(repo.reports.compact(now=self.NOW))
+        item_id, current = next((key, doc) for key, doc in docs.items() if doc["status"] == "OPEN")
+        current = run(repo.items.get(item_id))
+
+        changes = {"status": "RESOLVED", "resolvedAt": current["createdAt"] + timedelta(hours=5)}
+        run(repo.items.update(item_id, changes, current=current))
+        docs[item_id].update(changes)
+
+        start, end = datetime(2023, 1, 1), datetime(2024, 6, 1)
+        for _ in range(2):
+            assert range_rows(run(repo.reports.range(start, end))) == scan_range(docs.values(), start, end)
+            assert run(repo.reports.reconcile(fix=False)) == {}
+            run(repo.reports.compact(now=self.NOW))
+        assert all(bucket["hour"] >= datetime(2024, 5, 8) for bucket in run(repo.reports.hours()))
+
+    def test_concurrent_increment_defers_compaction(self, repo, monkeypatch):
+        run(repo.items.create("antigo", {**item_doc(hours_ago=24 * 5, now=self.NOW), "category": "Roupas", "type": "LOST"}))
+        query = repo.store.query
+
+        async def racing_query(collection, *args, **kwargs):
+            docs = await query(collection, *args, **kwargs)
+            if collection == REPORT_COLLECTION and docs:
+                # Outra escrita cai no bucket entre a leitura e o commit
+                await repo.store.set(collection, docs[0]["id"], {"created": Increment(1)}, merge=True)
+            return docs
+
+        monkeypatch.setattr(repo.store, "query", racing_query)
+        result = run(repo.reports.compact(now=self.NOW))
+        monkeypatch.undo()
+
+        assert result["conflicts"] == 1
+        assert run(repo.store.query(DAY_COLLECTION)) == []
+        [bucket] = run(repo.reports.hours())
+        assert bucket["created"] == 2
+
+        assert run(repo.reports.compact(now=self.NOW))["hours"] == 1
+        assert range_rows(run(repo.reports.range(datetime(2024, 5, 1), datetime(2024, 5, 10)))) == {(): [2, 0]}
+
+    def test_conditional_delete(self, repo):
+        run(repo.store.set("contadores", "a", {"n": 2}))
+
+        with pytest.raises(PreconditionFailed):
+            run(repo.store.commit([Write("delete", "contadores", "a", precondition={"n": 1})]))
+        assert run(repo.store.get("contadores", "a"))["n"] == 2
+
+        run(repo.store.commit([Write("delete", "contadores", "a", precondition={"n": 2})]))
+        assert run(repo.store.get("contadores", "a")) is None
+
+    def test_reconcile_compacted_days(self, repo):
+        self.random_items(repo, count=40)
+        run(repo.reports.compact(now=self.NOW))
+        # Carga direta em dias e meses já compactados
+        late = {
+            "direto-1": {**item_doc(hours_ago=24 * 20, now=self.NOW), "category": "Roupas", "type": "LOST"},
+            "direto-2": {**item_doc(hours_ago=24 * 90, now=self.NOW, status="RESOLVED", resolved_after=2),
+                         "category": "Roupas", "type": "FOUND"},
+        }
+        run(repo.store.set_many("items", late))
+
+        diffs = run(repo.reports.reconcile())
+
+        assert len(diffs) == 2
+        assert run(repo.reports.reconcile(fix=False)) == {}
+        items = run(repo.items.query())
+        start, end = datetime(2023, 1, 1), datetime(2024, 6, 1)
+        assert range_rows(run(repo.reports.range(start, end, ("type",)))) == scan_range(items, start, end, ("type",))
+        run(repo.reports.compact(now=self.NOW))
+        assert run(repo.reports.reconcile(fix=False)) == {}
+
+
+class TestRangeReport:
+    """Testes para GET /staff/reports/range"""
+
+    def test_grouped_report(self, client):
+        for overrides in ({}, {"campusId": "campus-gama"}, {"campusId": "campus-gama", "type": "LOST"}):
+            create_item(client, **overrides)
+        today = datetime.utcnow().date()
+        client.as_user("staff-1", role="staff")
+
+        response = client.get("/staff/reports/range", params={
+            "from": (today - timedelta(days=365)).isoformat(), "to": today.isoformat(), "groupBy": "campus,type,month",
+        })
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total"] == 3
+        assert body["groupBy"] == ["campusId", "type", "month"]
+        month = f"{today:%Y-%m}"
+        assert [(row["campusId"], row["type"], row["month"], row["total"]) for row in body["groups"]] == [
+            ("campus-darcy-ribeiro", "FOUND", month, 1),
+            ("campus-gama", "FOUND", month, 1),
+            ("campus-gama", "LOST", month, 1),
+        ]
+
+    def test_campus_filter_and_bounds(self, client):
+        create_item(client, campusId="campus-gama")
+        create_item(client)
+        today = datetime.utcnow().date()
+        client.as_user("staff-1", role="staff")
+
+        same_day = client.get("/staff/reports/range", params={
+            "from": today.isoformat(), "to": today.isoformat(), "campusId": "campus-gama",
+        }).json()
+        before = client.get("/staff/reports/range", params={
+            "from": "2020-01-01", "to": (today - timedelta(days=1)).isoformat(),
+        }).json()
+
+        assert (same_day["total"], same_day["groups"]) == (1, [{"total": 1, "resolved": 0, "resolutionRate": 0,
+                                                                "avgResolutionHours": 0}])
+        assert (before["total"], before["groups"]) == (0, [])
+
+    @pytest.mark.parametrize("params", [
+        {"from": "2024-01-01", "to": "2024-02-01", "groupBy": "building"},
+        {"from": "2024-01-01", "to": "2024-02-01", "groupBy": "day,month"},
+        {"from": "2024-02-01", "to": "2024-01-01"},
+    ])
+    def test_invalid_parameters(self, client, params):
+        response = client.as_user("staff-1", role="staff").get("/staff/reports/range", params=params)
+
+        assert response.status_code == 400
+
+    def test_requires_staff(self, client):
+        response = client.get("/staff/reports/range", params={"from": "2024-01-01", "to": "2024-02-01"})
+
+        assert response.status_code == 403
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
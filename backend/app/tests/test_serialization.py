@@ -0,0 +1,67 @@
+"""
+Testes para o caminho rápido de serialização das listagens
+"""
+import json
+from datetime import datetime
+
+import pytest
+
+from app.models import Item, Message
+from app.utils.serialization import FastJSONResponse, dumps, model_shaper
+
+
+DOC = {
+    "id": "m1",
+    "threadId": "t1",
+    "senderUid": "alice",
+    "content": "oi",
+    "createdAt": datetime(2024, 5, 10, 12, 0, 30, 5),
+    "read": False,
+}
+
+
+class TestModelShaper:
+    """Testes para o recorte de documentos no formato do modelo"""
+
+    def test_matches_pydantic_output(self):
+        """Documento completo deve sair igual ao modelo serializado"""
+        shaped = json.loads(dumps(model_shaper(Message)(DOC)))
+        assert shaped == json.loads(Message(**DOC).model_dump_json())
+
+    def test_fills_defaults_and_drops_unknown_fields(self):
+        shape = model_shaper(Item)
+        doc = {"id": "i1", "ownerUid": "u", "type": "LOST", "title": "t", "extra": 1}
+
+        shaped = shape(doc)
+
+        assert "extra" not in shaped
+        assert shaped["tags"] == [] and shaped["status"] == "OPEN"
+        assert shaped["buildingId"] is None
+        assert list(shaped) == list(Item.model_fields)
+
+
+class TestFastJSONResponse:
+    def test_encodes_datetimes(self):
+        response = FastJSONResponse([{"at": datetime(2024, 5, 10, 12, 0)}])
+        assert json.loads(response.body) == [{"at": "2024-05-10T12:00:00"}]
+
+
+class TestListSchemas:
+    """Listagens pelo caminho rápido continuam com o schema no OpenAPI"""
+
+    @pytest.mark.parametrize("path, model", [
+        ("/threads", "Thread"),
+        ("/threads/inbox", "InboxEntry"),
+        ("/threads/{thread_id}/messages", "Message"),
+        ("/alerts", "Alert"),
+    ])
+    def test_response_schema(self, client, path, model):
+        paths = client.get("/openapi.json").json()["paths"]
+
+        schema = paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+
+        assert schema["items"] == {"$ref": f"#/components/schemas/{model}"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,240 @@
+"""
+Testes para o store em SQLite
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from app.data import DocumentNotFound, InMemoryStore, Increment, Repository
+from app.data.sqlite import SQLiteStore, encode_document
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "store.db")
+
+
+def scenario_with_store(db_path, body):
+    async def scenario():
+        store = SQLiteStore(db_path, pool_size=2)
+        try:
+            return await body(store)
+        finally:
+            await store.close()
+    return run(scenario())
+
+
+class TestSQLiteStore:
+    """Testes para leitura, escrita e consultas no SQLite"""
+
+    def test_roundtrip_preserves_types(self, db_path):
+        """Datas, listas e aninhados devem voltar com os mesmos tipos"""
+        now = datetime(2024, 3, 1, 12, 30)
+
+        async def body(store):
+            await store.set("items", "a", {"createdAt": now, "tags": ["x"], "geo": {"lat": -15.7}})
+            return await store.get("items", "a")
+
+        doc = scenario_with_store(db_path, body)
+        assert doc == {"createdAt": now, "tags": ["x"], "geo": {"lat": -15.7}, "id": "a"}
+
+    def test_query_filters_order_and_limit(self, db_path):
+        """Consultas devem filtrar por colunas, JSON e arrays"""
+        now = datetime.utcnow()
+
+        async def body(store):
+            await store.set_many("items", {
+                f"i{i}": {
+                    "campusId": "c1" if i % 2 == 0 else "c2",
+                    "createdAt": now - timedelta(hours=i),
+                    "tags": [f"t{i}"],
+                    "color": "azul" if i < 2 else "preto",
+                }
+                for i in range(5)
+            })
+            newest = await store.query(
+                "items", [("campusId", "==", "c1")], order_by="createdAt", descending=True, limit=2
+            )
+            tagged = await store.query("items", [("tags", "array_contains", "t3")])
+            recent = await store.query("items", [("createdAt", ">=", now - timedelta(hours=1, minutes=30))])
+            colors = await store.query("items", [("color", "in", ["azul"])])
+            return newest, tagged, recent, colors
+
+        newest, tagged, recent, colors = scenario_with_store(db_path, body)
+        assert [d["id"] for d in newest] == ["i0", "i2"]
+        assert [d["id"] for d in tagged] == ["i3"]
+        assert {d["id"] for d in recent} == {"i0", "i1"}
+        assert {d["id"] for d in colors} == {"i0", "i1"}
+
+    def test_subcollections_are_scoped_by_parent(self, db_path):
+        """Mensagens de uma thread não devem aparecer em outra"""
+        async def body(store):
+            await store.set("threads/t1/messages", "m1", {"content": "a", "read": False})
+            await store.set("threads/t2/messages", "m1", {"content": "b", "read": False})
+            await store.update("threads/t1/messages", "m1", {"read": True})
+            return (
+                await store.query("threads/t1/messages", [("read", "==", False)]),
+                await store.query("threads/t2/messages", [("read", "==", False)]),
+            )
+
+        t1, t2 = scenario_with_store(db_path, body)
+        assert t1 == []
+        assert [d["content"] for d in t2] == ["b"]
+
+    def test_increment_and_merge(self, db_path):
+        """Increment deve somar ao valor atual e merge preservar campos"""
+        async def body(store):
+            inbox = "users/u1/inbox"
+            await store.set(inbox, "t1", {"unread": 0, "lastMessage": "a"})
+            await store.set(inbox, "t1", {"unread": Increment(1)}, merge=True)
+            await store.set(inbox, "t1", {"unread": Increment(2)}, merge=True)
+            return await store.get(inbox, "t1")
+
+        t1 = scenario_with_store(db_path, body)
+        assert t1["unread"] == 3
+        assert t1["lastMessage"] == "a"
+
+    def test_batch_is_all_or_nothing(self, db_path):
+        """Falha em uma escrita do batch não deve aplicar as demais"""
+        async def body(store):
+            batch = store.batch()
+            batch.set("threads/t1/messages", "m1", {"content": "oi"})
+            batch.update("threads", "nao-existe", {"lastMessage": "oi"})
+            with pytest.raises(DocumentNotFound):
+                await batch.commit()
+            return await store.get("threads/t1/messages", "m1")
+
+        assert scenario_with_store(db_path, body) is None
+
+    def test_data_persists_across_connections(self, db_path):
+        """Reabrir o arquivo deve recuperar os documentos e coleções genéricas"""
+        async def write(store):
+            await store.set("campuses", "darcy", {"name": "Darcy Ribeiro"})
+
+        async def read(store):
+            return await store.get_many("campuses", ["darcy", "gama"])
+
+        scenario_with_store(db_path, write)
+        assert scenario_with_store(db_path, read) == {"darcy": {"name": "Darcy Ribeiro", "id": "darcy"}}
+
+    def test_uses_wal(self, db_path):
+        async def body(store):
+            with store._connection() as conn:
+                return conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+        assert scenario_with_store(db_path, body) == "wal"
+
+
+class TestStoreParity:
+    """Consultas sobre campos sem coluna própria devem coincidir com o store em memória"""
+
+    NOW = datetime(2024, 5, 10, 12, 0)
+
+    async def populate(self, store):
+        await store.set("items", "old", {"resolvedAt": self.NOW - timedelta(days=2), "color": "azul"})
+        await store.set("items", "new", {"resolvedAt": self.NOW + timedelta(hours=1), "color": "preto"})
+        await store.set("items", "open", {"resolvedAt": None, "color": "azul"})
+
+    async def queries(self, store):
+        await self.populate(store)
+        ids = lambda docs: [d["id"] for d in docs]  # noqa: E731
+        return {
+            "lt": ids(await store.query("items", [("resolvedAt", "<", self.NOW)])),
+            "gte": ids(await store.query("items", [("resolvedAt", ">=", self.NOW)])),
+            "eq": ids(await store.query("items", [("resolvedAt", "==", self.NOW + timedelta(hours=1))])),
+            "order": ids(await store.query("items", order_by="resolvedAt", descending=True)),
+            "color": sorted(ids(await store.query("items", [("color", "==", "azul")]))),
+        }
+
+    def test_datetime_fields_in_json(self, db_path):
+        expected = run(self.queries(InMemoryStore()))
+        actual = scenario_with_store(db_path, self.queries)
+        assert actual == expected
+        assert expected["lt"] == ["old"]
+        assert expected["gte"] == ["new"]
+        assert expected["order"] == ["new", "old"]
+
+    async def projected(self, store):
+        await self.populate(store)
+        return await store.query("items", order_by="resolvedAt", select=["id", "resolvedAt"])
+
+    def test_select_projects_fields(self, db_path):
+        """Projeção deve devolver só os campos pedidos, com datas decodificadas"""
+        expected = run(self.projected(InMemoryStore()))
+        actual = scenario_with_store(db_path, self.projected)
+        assert actual == expected
+        assert expected[0] == {"id": "old", "resolvedAt": self.NOW - timedelta(days=2)}
+
+
+async def query_plans(store, body):
+    """Planos (EXPLAIN QUERY PLAN) dos SELECTs que body faz no store."""
+    statements = []
+    for conn in store._connections:
+        conn.set_trace_callback(lambda sql: statements.append(sql) if sql.lstrip().startswith("SELECT") else None)
+    await body()
+    for conn in store._connections:
+        conn.set_trace_callback(None)
+    with store._connection() as conn:
+        return [
+            " / ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+            for sql in statements
+        ]
+
+
+class TestReportTables:
+    """Testes para as tabelas próprias dos agregados de relatório"""
+
+    def test_hour_buckets_are_read_by_index(self, db_path):
+        async def body(store):
+            repo = Repository(store)
+            await repo.items.create("i1", {"createdAt": datetime(2024, 5, 10, 12), "campusId": "campus-gama"})
+            since = datetime(2024, 5, 9, 12)
+            return await query_plans(store, lambda: repo.reports.hours(since, campus_id="campus-gama"))
+
+        [plan] = scenario_with_store(db_path, body)
+        assert "USING INDEX idx_report_hours" in plan
+        assert "documents" not in plan
+
+    def test_range_report_reads_rollups_by_index(self, db_path):
+        async def body(store):
+            repo = Repository(store)
+            for day in range(1, 60, 7):
+                await repo.items.create(f"i{day}", {
+                    "createdAt": datetime(2024, 3, 1) + timedelta(days=day), "campusId": "campus-gama",
+                })
+            await repo.reports.compact(now=datetime(2024, 5, 10))
+            start, end = datetime(2024, 3, 1), datetime(2024, 5, 1)
+            plans = await query_plans(store, lambda: repo.reports.range(start, end, campus_id="campus-gama"))
+            return plans, (await repo.reports.range(start, end)).totals().created
+
+        plans, created = scenario_with_store(db_path, body)
+        assert created == 9
+        assert len(plans) == 3
+        assert all("USING INDEX idx_report_" in plan and "documents" not in plan for plan in plans)
+
+    def test_generic_report_documents_are_moved(self, db_path):
+        bucket = {"hour": datetime(2024, 5, 10, 12), "campusId": "campus-gama", "created": 2}
+
+        async def legacy(store):
+            # Banco anterior à tabela: o bucket ficou na tabela genérica
+            with store._connection() as conn:
+                conn.execute(
+                    "INSERT INTO documents (collection, id, data) VALUES ('report_hours', 'b1', ?)",
+                    [encode_document(bucket)],
+                )
+
+        async def read(store):
+            with store._connection() as conn:
+                generic = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            return generic, await store.query("report_hours", [("hour", ">=", datetime(2024, 5, 10))])
+
+        scenario_with_store(db_path, legacy)
+        assert scenario_with_store(db_path, read) == (0, [{**bucket, "id": "b1"}])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,187 @@
+"""
+Testes para o cold start: routers preguiçosos, warmup e orçamento de importação
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.main import create_app
+from app.routes import ROUTERS, RouterLoader
+from app.scripts.startup_report import by_package, measure, parse_importtime
+from app.services.item_cache import get_item_cache
+from app.services.thread_cache import get_thread_cache
+from app.services.thread_index import get_thread_index
+from app.services.warmup import WarmupState, resolve, warm_up
+from app.settings import get_settings
+
+# Tempo próprio dos módulos do app até a primeira resposta de /health (fastapi e
+# pydantic ficam de fora). Medido em ~25 ms; o teto é folgado para máquinas lentas.
+APP_IMPORT_BUDGET_MS = 150
+# Módulos que só podem ser importados na primeira requisição que os usa
+DEFERRED_MODULES = ("app.routes.items", "app.routes.threads", "app.routes.staff", "app.models.users", "app.utils")
+
+
+def route_paths(app):
+    # Os routers incluídos não são copiados para app.routes; o schema os lista
+    return set(app.openapi()["paths"])
+
+
+async def seed(repo, items=3, threads=2):
+    now = datetime(2024, 5, 10, 12, 0)
+    for n in range(items):
+        await repo.items.create(f"item-{n}", {
+            "ownerUid": f"dono-{n}", "title": f"Item {n}", "status": "OPEN",
+            "createdAt": now - timedelta(minutes=n), "updatedAt": now,
+        })
+    for n in range(threads):
+        await repo.threads.create(f"thread-{n}", {
+            "itemId": f"item-{n}", "participants": [f"dono-{n}", "alice"],
+            "createdAt": now, "updatedAt": now - timedelta(minutes=n),
+        })
+
+
+class TestLazyRouters:
+    """Testes para a montagem preguiçosa dos routers"""
+
+    def test_create_app_mounts_nothing(self, app):
+        loader = app.state.routers
+        assert loader.loaded == []
+        assert len(loader.pending) == len(ROUTERS)
+        assert "/items" not in route_paths(app)
+
+    def test_first_request_loads_only_its_router(self, client, app):
+        assert client.get("/items").status_code == 200
+
+        assert app.state.routers.loaded == ["items"]
+        assert "/threads" not in route_paths(app)
+
+    def test_unknown_path_loads_nothing(self, client, app):
+        assert client.get("/nao-existe").status_code == 404
+        assert app.state.routers.loaded == []
+
+    def test_openapi_loads_everything(self, client, app):
+        schema = client.get("/openapi.json").json()
+
+        assert app.state.routers.complete
+        assert "/items" in schema["paths"]
+        assert "/staff/reports/daily" in schema["paths"]
+
+    def test_prefix_match_is_per_segment(self):
+        router = ROUTERS[2]
+        assert router.matches("/items") and router.matches("/items/abc")
+        assert not router.matches("/itemsx")
+
+    def test_eager_mode(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "lazy_routers", False)
+        app = create_app()
+
+        assert app.state.routers.complete
+        assert "/items" in route_paths(app)
+
+    def test_loading_twice_does_not_duplicate_routes(self, app):
+        loader: RouterLoader = app.state.routers
+        loader.load_for_path("/alerts")
+        count = len(app.routes)
+        loader.load_for_path("/alerts")
+        loader.load_all()
+        loader.load_all()
+
+        assert loader.loaded.count("alerts") == 1
+        assert len(app.routes) == count + len(ROUTERS) - 1
+
+
+class TestWarmup:
+    """Testes para o aquecimento em segundo plano"""
+
+    def test_preloads_caches_and_index(self, app, repo):
+        asyncio.run(seed(repo))
+        state = WarmupState()
+
+        asyncio.run(warm_up(app, state, items=10, threads=10))
+
+        assert state.status == "done" and state.finished
+        assert (state.items, state.threads) == (3, 2)
+        assert state.routers == len(ROUTERS)
+        assert len(resolve(app, get_item_cache)) == 3
+        assert resolve(app, get_thread_cache).get("thread-1").participants == ("dono-1", "alice")
+        assert resolve(app, get_thread_index).get_owner("item-2") == "dono-2"
+
+    def test_limits(self, app, repo):
+        asyncio.run(seed(repo))
+        state = WarmupState()
+
+        asyncio.run(warm_up(app, state, items=1, threads=0))
+
+        assert (state.items, state.threads) == (1, 0)
+        assert resolve(app, get_thread_cache).get("thread-0") is None
+
+    def test_preload_skips_items_written_since_boot(self, app, repo):
+        asyncio.run(seed(repo))
+        cache = resolve(app, get_item_cache)
+        cache.invalidate("item-0")
+
+        asyncio.run(warm_up(app, WarmupState(), items=10, threads=0))
+
+        assert len(cache) == 2
+
+    def test_failure_is_recorded(self, app):
+        app.dependency_overrides[get_item_cache] = lambda: None
+        state = WarmupState()
+
+        asyncio.run(warm_up(app, state, items=10, threads=0))
+
+        assert state.status == "failed" and state.finished
+        assert state.error
+
+    def test_lifespan(self, app, repo, monkeypatch):
+        from app.tests.conftest import ApiClient
+
+        with ApiClient(app):
+            assert app.state.warmup.status == "disabled"
+            assert app.state.warmup.finished
+
+        asyncio.run(seed(repo))
+        monkeypatch.setattr(get_settings(), "warmup", True)
+        with ApiClient(app):
+            deadline = time.monotonic() + 5
+            while not app.state.warmup.finished and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert app.state.warmup.status == "done"
+            assert app.state.warmup.items == 3
+
+
+class TestImportBudget:
+    """Testes para o custo de importação do app (processo novo)"""
+
+    @pytest.fixture(scope="class")
+    def report(self):
+        return measure("/health")
+
+    def test_first_request_succeeds(self, report):
+        assert report["status"] == 200
+
+    def test_heavy_modules_are_deferred(self, report):
+        loaded = set(report["modulesAfterImport"])
+        assert "app.routes.loader" in loaded
+        assert not loaded.intersection(DEFERRED_MODULES)
+
+    def test_app_import_budget(self, report):
+        assert report["appSelfMs"] < APP_IMPORT_BUDGET_MS
+
+    def test_parse_importtime(self):
+        lines = [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |     app.utils",
+            "import time:       300 |        420 |   app.routes.items",
+            "import time:        50 |         50 | orjson",
+        ]
+        entries = parse_importtime(lines)
+
+        assert entries[1] == {"module": "app.routes.items", "self": 300, "cumulative": 420}
+        assert by_package(entries) == {"app.routes": 300, "app.utils": 120, "orjson": 50}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
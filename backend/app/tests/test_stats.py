@@ -0,0 +1,201 @@
+"""
+Testes para o registro de estatísticas e o endpoint /ready
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.services.item_cache import get_item_cache
+from app.services.lru import LRUCache
+from app.services.pubsub import PubSubHub
+from app.services.stats import StatsRegistry, deep_sizeof, estimate_bytes, get_stats
+from app.services.warmup import resolve
+from app.settings import get_settings
+from app.tests.conftest import ApiClient
+from app.tests.test_startup import seed
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def collect(registry):
+    return asyncio.run(registry.collect())
+
+
+def readiness(registry):
+    return asyncio.run(registry.readiness())
+
+
+class TestStatsRegistry:
+    """Testes para coleta, TTL e checagens"""
+
+    def test_collects_sync_and_async_providers(self):
+        registry = StatsRegistry()
+
+        async def store_stats():
+            return {"documents": 3}
+
+        registry.register("cache", lambda: {"size": 1})
+        registry.register("store", store_stats)
+
+        assert collect(registry) == {"cache": {"size": 1}, "store": {"documents": 3}}
+
+    def test_failing_provider_is_isolated(self):
+        registry = StatsRegistry()
+        registry.register("broken", lambda: 1 / 0)
+        registry.register("cache", lambda: {"size": 1})
+
+        snapshot = collect(registry)
+
+        assert "division by zero" in snapshot["broken"]["error"]
+        assert snapshot["cache"] == {"size": 1}
+
+    def test_ttl_reuses_snapshot(self):
+        clock = FakeClock()
+        registry = StatsRegistry(clock=clock)
+        calls = []
+        registry.register("store", lambda: {"call": len(calls.append(1) or calls)}, ttl=30)
+
+        assert collect(registry)["store"] == {"call": 1}
+        clock.now = 29
+        assert collect(registry)["store"] == {"call": 1}
+        clock.now = 31
+        assert collect(registry)["store"] == {"call": 2}
+
+    def test_readiness_latches(self):
+        registry = StatsRegistry()
+        state = {"size": 0}
+        registry.register("cache", lambda: dict(state))
+        registry.add_check("cache", lambda stats: None if stats["cache"]["size"] >= 2 else "cold")
+
+        result = readiness(registry)
+        assert not result.ready
+        assert result.failing == {"cache": "cold"}
+
+        state["size"] = 2
+        assert readiness(registry).ready
+
+        # Rotatividade do cache depois de pronto não tira o worker do ar
+        state["size"] = 0
+        result = readiness(registry)
+        assert result.ready
+        assert result.failing == {"cache": "cold"}
+
+    def test_broken_check_is_failing(self):
+        registry = StatsRegistry()
+        registry.add_check("cache", lambda stats: stats["cache"]["size"])
+
+        result = readiness(registry)
+
+        assert not result.ready
+        assert "check failed" in result.failing["cache"]
+
+
+class TestSubsystemStats:
+    """Testes para as estatísticas de cada subsistema"""
+
+    def test_memory_estimate(self):
+        small, large = {"id": "a"}, {"id": "a", "description": "x" * 1000}
+        assert deep_sizeof(large) > deep_sizeof(small) + 1000
+        assert estimate_bytes([small, small], 10) == deep_sizeof(small) * 10
+        assert estimate_bytes([], 10) == 0
+
+    def test_lru_stats(self):
+        cache = LRUCache(10)
+        cache.put("a", {"title": "garrafa"})
+        cache.get("a")
+        cache.get("b")
+
+        stats = cache.stats()
+
+        assert (stats["size"], stats["maxSize"], stats["hits"], stats["misses"]) == (1, 10, 1, 1)
+        assert stats["hitRatio"] == 0.5
+        assert stats["bytes"] > 0
+
+    def test_hub_queue_depths(self):
+        async def scenario():
+            hub = PubSubHub(max_queue=5)
+            await hub.subscribe("alice")
+            await hub.subscribe("bob")
+            for _ in range(3):
+                await hub.publish(["alice"], {"type": "message"})
+            return hub.stats()
+
+        stats = asyncio.run(scenario())
+
+        assert (stats["users"], stats["connections"]) == (2, 2)
+        assert (stats["queuedEvents"], stats["maxQueueDepth"], stats["queueCapacity"]) == (3, 3, 5)
+
+    def test_store_document_counts(self, repo):
+        asyncio.run(seed(repo, items=3, threads=2))
+
+        stats = asyncio.run(repo.store.stats())
+
+        assert stats["documents"]["items"] == 3
+        assert stats["documents"]["threads"] == 2
+        assert stats["documents"]["users/*/inbox"] == 4
+
+
+class TestReadyEndpoint:
+    """Testes para GET /ready"""
+
+    def test_ready_without_warmup(self, client):
+        response = client.get("/ready")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "ready"
+        assert body["subsystems"]["warmup"]["status"] == "disabled"
+        assert {"process", "store", "item_cache", "thread_cache", "thread_index", "hub"} <= set(body["subsystems"])
+
+    def test_warming_until_warmup_finishes(self, client, app):
+        app.state.warmup.status = "running"
+
+        response = client.get("/ready")
+
+        assert response.status_code == 503
+        assert response.json()["failing"] == {"warmup": "warmup running"}
+
+    def test_failed_warmup_is_not_ready(self, client, app):
+        app.state.warmup.status = "failed"
+        app.state.warmup.error = "store fora do ar"
+
+        response = client.get("/ready")
+
+        assert response.status_code == 503
+        assert "store fora do ar" in response.json()["failing"]["warmup"]
+
+    def test_ready_after_warmup_thresholds(self, app, repo, monkeypatch):
+        asyncio.run(seed(repo, items=4, threads=2))
+        monkeypatch.setattr(get_settings(), "warmup", True)
+
+        with ApiClient(app) as client:
+            # Aguarda o warmup em segundo plano
+            for _ in range(500):
+                if app.state.warmup.finished:
+                    break
+                time.sleep(0.01)
+            cache = resolve(app, get_item_cache)
+            cache.clear()
+
+            cold = client.get("/ready")
+            assert cold.status_code == 503
+            assert cold.json()["failing"] == {"item_cache": "0 entries, needs 4"}
+
+            cache.preload([{"id": f"item-{n}"} for n in range(4)])
+
+            warm = client.get("/ready").json()
+            assert warm["status"] == "ready"
+            assert warm["subsystems"]["warmup"]["itemsFound"] == 4
+            assert warm["subsystems"]["thread_cache"]["size"] == 2
+            assert resolve(app, get_stats).ready_since is not None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
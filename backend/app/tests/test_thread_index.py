@@ -0,0 +1,89 @@
+"""
+Testes para o índice de deduplicação de threads
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+from app.models.threads import Thread
+from app.services.lru import LRUCache
+from app.services.thread_index import ThreadLookupIndex
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLRUCache:
+    """Testes para o cache LRU genérico"""
+
+    def test_ttl_expiration(self):
+        """Entradas expiradas devem contar como falha"""
+        clock = FakeClock()
+        cache = LRUCache(max_size=10, ttl=5.0, clock=clock)
+        cache.put("a", 1)
+        assert cache.get("a") == 1
+        clock.now = 6.0
+        assert cache.get("a") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+
+class TestThreadLookupIndex:
+    """Testes para o índice (itemId, uid) -> thread"""
+
+    def make_thread(self) -> Thread:
+        return Thread(id="t1", itemId="item-1", participants=["owner", "alice"])
+
+    def test_lookup_by_item_and_user(self):
+        """Deve encontrar a thread apenas para o par indexado"""
+        index = ThreadLookupIndex()
+        index.put_thread("alice", self.make_thread())
+        assert index.get_thread("item-1", "alice").id == "t1"
+        assert index.get_thread("item-1", "bob") is None
+
+    def test_returns_copies(self):
+        """Alterar o retorno não deve afetar o índice"""
+        index = ThreadLookupIndex()
+        index.put_thread("alice", self.make_thread())
+        index.get_thread("item-1", "alice").lastMessage = "alterado"
+        assert index.get_thread("item-1", "alice").lastMessage is None
+
+    def test_touch_updates_snapshot(self):
+        """Nova mensagem deve atualizar lastMessage do snapshot"""
+        index = ThreadLookupIndex()
+        index.put_thread("alice", self.make_thread())
+        now = datetime.utcnow()
+        index.touch("t1", "oi", now)
+        thread = index.get_thread("item-1", "alice")
+        assert thread.lastMessage == "oi"
+        assert thread.updatedAt == now
+
+    def test_concurrent_creates_are_serialized(self):
+        """Apenas uma criação concorrente deve chegar ao store"""
+        index = ThreadLookupIndex()
+        created = []
+
+        async def create():
+            async with index.lock("item-1", "alice"):
+                thread = index.get_thread("item-1", "alice")
+                if thread is None:
+                    await asyncio.sleep(0.01)  # simula I/O do store
+                    thread = self.make_thread()
+                    created.append(thread)
+                    index.put_thread("alice", thread)
+                return thread.id
+
+        async def scenario():
+            return await asyncio.gather(*[create() for _ in range(10)])
+
+        assert asyncio.run(scenario()) == ["t1"] * 10
+        assert len(created) == 1
+        assert index._locks == {}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,6 +1,8 @@
 from .normalization import normalize_text, generate_ngrams
 from .geohash import encode_geohash, get_geohash_neighbors
-from .search import calculate_search_score
+from .search import calculate_search_score, rank_items
+from .etag import digest_etag, etag_matches, format_etag, parse_if_match
+from .serialization import FastJSONResponse, model_shaper
 
 __all__ = [
     "normalize_text",
@@ -8,4 +10,11 @@ __all__ = [
     "encode_geohash",
     "get_geohash_neighbors",
     "calculate_search_score",
+    "rank_items",
+    "digest_etag",
+    "etag_matches",
+    "format_etag",
+    "parse_if_match",
+    "FastJSONResponse",
+    "model_shaper",
 ]
@@ -0,0 +1,47 @@
+"""
+ETags fortes a partir do número de versão dos documentos.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable, Optional
+
+
+def format_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def parse_if_match(value: Optional[str]) -> Optional[int]:
+    """
+    Versão exigida por um cabeçalho If-Match (None quando ausente ou "*").
+    ETags fracas ou malformadas nunca casam: ValueError.
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    if value == "*":
+        return None
+    if len(value) < 3 or value[0] != '"' or value[-1] != '"' or not value[1:-1].isdigit():
+        raise ValueError(f"Invalid If-Match: {value}")
+    return int(value[1:-1])
+
+
+def digest_etag(parts: Iterable[object]) -> str:
+    """ETag forte para respostas compostas (ex.: listas), a partir das partes que as determinam."""
+    digest = hashlib.blake2b("\x1f".join(map(str, parts)).encode(), digest_size=12)
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparação fraca do If-None-Match (lista de ETags ou "*")."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
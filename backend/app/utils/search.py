@@ -2,9 +2,10 @@
 Utilitários para cálculo de score de busca.
 """
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Iterable, List, Optional
 
 from .geohash import haversine_distance
+from .normalization import generate_ngrams
 
 
 def calculate_search_score(
@@ -78,3 +79,19 @@ def calculate_search_score(
                 score += 1.0
     
     return score
+
+
+def rank_items(items: Iterable[dict], query: str) -> List[dict]:
+    """
+    Ordena os candidatos por score decrescente, descartando os sem score.
+    """
+    query_ngrams = set(generate_ngrams(query))
+    scored_items = []
+    
+    for item in items:
+        score = calculate_search_score(item, query_ngrams)
+        if score > 0:
+            scored_items.append((score, item))
+    
+    scored_items.sort(key=lambda x: x[0], reverse=True)
+    return [item for _, item in scored_items]
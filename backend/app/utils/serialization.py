@@ -0,0 +1,70 @@
+"""
+Serialização rápida para listagens.
+
+Documentos do store já foram validados na escrita: na leitura eles vão
+direto para o orjson, sem montar modelos pydantic e sem o segundo passe de
+validação do response_model. model_shaper completa os campos ausentes com
+os defaults do modelo para manter o formato da resposta.
+"""
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Type
+
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fallback para a stdlib
+    orjson = None
+
+Doc = Dict[str, Any]
+
+
+def _default(value: Any) -> Any:
+    # datetime entra aqui só em subclasses (ex.: DatetimeWithNanoseconds do Firestore)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse codificada com orjson, sem jsonable_encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def model_shaper(model: Type[BaseModel]) -> Callable[[Doc], Doc]:
+    """
+    Função que recorta um documento nos campos de primeiro nível do modelo,
+    na ordem do modelo, preenchendo ausentes com o default (sem validar).
+    """
+    fields = [(name, info.default_factory, info.default) for name, info in model.model_fields.items()]
+
+    def shape(doc: Doc) -> Doc:
+        shaped = {}
+        for name, factory, default in fields:
+            if name in doc:
+                shaped[name] = doc[name]
+            elif factory is not None:
+                shaped[name] = factory()
+            else:
+                shaped[name] = None if default is PydanticUndefined else default
+        return shaped
+
+    return shape